@@ -0,0 +1,146 @@
+from collections import deque
+from PySide6.QtCore import QThread, Signal
+import threading
+import numpy as np
+
+from .cat_map import ArnoldCatMap
+
+
+class FrameRing:
+    """线程安全的定长帧环形缓冲
+
+    生产者在缓冲满时等待消费者；seek 时清空并递增代号，
+    清空前已开始计算的旧帧按代号丢弃，不会混入新的播放序列。
+    """
+
+    def __init__(self, capacity: int = 32):
+        self._frames = deque()
+        self._capacity = capacity
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._closed = False
+
+    @property
+    def generation(self) -> int:
+        with self._cond:
+            return self._generation
+
+    def put(self, frame, generation: int) -> bool:
+        """放入一帧，缓冲满时等待；代号已过期或缓冲已关闭时丢弃并返回 False"""
+        with self._cond:
+            while (len(self._frames) >= self._capacity
+                   and generation == self._generation and not self._closed):
+                self._cond.wait()
+            if generation != self._generation or self._closed:
+                return False
+            self._frames.append(frame)
+            return True
+
+    def get(self):
+        """取出最早的一帧，没有帧时返回 None"""
+        with self._cond:
+            if not self._frames:
+                return None
+            frame = self._frames.popleft()
+            self._cond.notify_all()
+            return frame
+
+    def clear(self) -> int:
+        with self._cond:
+            self._frames.clear()
+            self._generation += 1
+            self._cond.notify_all()
+            return self._generation
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._frames)
+
+
+class AnimationThread(QThread):
+    """后台生成动画帧
+
+    保持一份全分辨率的当前状态，逐步迭代时复用缓存的置换（或逆置换），
+    直接跳转时用置换幂从原图一步算出；写入缓冲的是按显示分辨率最近邻降采样后的帧。
+    帧为 (迭代次数, 显示数组)，由界面线程按固定帧率取出播放。
+    """
+    error_signal = Signal(str)  # 错误信号
+
+    def __init__(self, transformer: ArnoldCatMap, image: np.ndarray, to_rgb,
+                 display_size: int = 512, capacity: int = 32):
+        super().__init__()
+        self.transformer = transformer
+        self.original = image
+        self.to_rgb = to_rgb
+        self.ring = FrameRing(capacity)
+
+        self._state = image
+        self._iteration = 0
+        self._target = 0
+        self._animate = False
+        self._pending = False
+        self._generation = self.ring.generation
+        self._stopped = False
+        self._cond = threading.Condition()
+
+        # 最近邻降采样的行列索引，只计算一次
+        height, width = image.shape[:2]
+        scale = min(1.0, display_size / max(height, width))
+        self._rows = np.linspace(0, height - 1, max(1, round(height * scale))).round().astype(np.intp)
+        self._cols = np.linspace(0, width - 1, max(1, round(width * scale))).round().astype(np.intp)
+
+    def seek(self, target: int, animate: bool = False):
+        """跳到目标迭代次数；animate 为 True 时逐帧播放过去，否则只生成目标帧"""
+        with self._cond:
+            self._target = target
+            self._animate = animate
+            self._pending = True
+            self._generation = self.ring.clear()
+            self._cond.notify_all()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self.ring.close()
+
+    def display_frame(self, image: np.ndarray) -> np.ndarray:
+        """降采样到显示分辨率并转换为RGB"""
+        return np.ascontiguousarray(self.to_rgb(image[self._rows[:, None], self._cols[None, :]]))
+
+    def run(self):
+        shape = self.original.shape[:2]
+        try:
+            while True:
+                with self._cond:
+                    while (not self._stopped and not self._pending
+                           and self._target == self._iteration):
+                        self._cond.wait()
+                    if self._stopped:
+                        return
+                    target = self._target
+                    animate = self._animate
+                    generation = self._generation
+                    self._pending = False
+
+                # 目标就是当前状态时不计算，只重新送出一帧
+                if target != self._iteration and animate:
+                    # 逐帧：复用一次迭代的置换或其逆置换
+                    forward = target > self._iteration
+                    perm = (self.transformer.permutation(shape) if forward
+                            else self.transformer.inverse_permutation(shape))
+                    self._state = ArnoldCatMap.apply(self._state, perm)
+                    self._iteration += 1 if forward else -1
+                elif target != self._iteration:
+                    # 直接跳转：从原图计算 P^target
+                    self._state = self.transformer.transform(self.original, target)
+                    self._iteration = target
+
+                self.ring.put((self._iteration, self.display_frame(self._state)), generation)
+        except Exception as e:
+            self.error_signal.emit(str(e))
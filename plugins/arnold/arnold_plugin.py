@@ -1,123 +1,183 @@
 from .. import Plugin
 from PySide6.QtWidgets import (QWidget, QLabel, QVBoxLayout, QHBoxLayout, 
-                              QSpinBox, QSlider, QPushButton, QFileDialog, QGroupBox, QMessageBox)
-from PySide6.QtCore import Qt, QTimer
+                              QSpinBox, QSlider, QPushButton, QFileDialog, QGroupBox, QMessageBox,
+                              QComboBox, QCheckBox, QProgressBar)
+from PySide6.QtCore import Qt, QTimer, QThread, Signal
 from PySide6.QtGui import QImage, QPixmap, QFont
-import numpy as np
-from PIL import Image
 import style
 from style import FONTS
 import io
+from .cat_map import ArnoldCatMap, pad_to_square, unpad
+from .brute_force import BruteForceDialog
+from .animation import AnimationThread
+from . import image_io
+
+class ArnoldBatchThread(QThread):
+    progress_signal = Signal(int, int)  # 进度信号 (已完成, 总数)
+    finished_signal = Signal(object)  # 完成信号，传递清单行
+    error_signal = Signal(str)  # 错误信号
+
+    def __init__(self, batch_transform, *args, **kwargs):
+        super().__init__()
+        self.batch_transform = batch_transform
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            rows = self.batch_transform(*self.args, progress=self.progress_signal.emit, **self.kwargs)
+            self.finished_signal.emit(rows)
+        except Exception as e:
+            self.error_signal.emit(str(e))
+
+class PeriodThread(QThread):
+    finished_signal = Signal(object)  # 完成信号，传递周期
+    error_signal = Signal(str)  # 错误信号
+
+    def __init__(self, transformer, size):
+        super().__init__()
+        self.transformer = transformer
+        self.size = size
+
+    def run(self):
+        try:
+            # 大图的环标记需要数秒，结果按尺寸缓存在 transformer 中
+            self.finished_signal.emit(self.transformer.period(self.size))
+        except Exception as e:
+            self.error_signal.emit(str(e))
 
-class ArnoldCatMap:
-    """Arnold's Cat Map 变换实现"""
-    def __init__(self):
-        pass
-        
-    def transform(self, image: np.ndarray, iterations: int = 1) -> np.ndarray:
-        """
-        使用Arnold's Cat Map进行图像变换
-        
-        Args:
-            image: 输入图像（numpy数组）
-            iterations: 迭代次数
-            
-        Returns:
-            变换后的图像
-        """
-        N = image.shape[0]
-        if N != image.shape[1]:
-            raise ValueError("图像必须是正方形")
-            
-        # 创建结果图像和临时图像
-        result = np.copy(image)
-        temp = np.empty_like(image)
-        
-        # 迭代应用变换
-        for _ in range(iterations):
-            # 对每个像素计算新位置
-            for y in range(N):
-                for x in range(N):
-                    # 计算新坐标
-                    xNew = (2 * x + y) % N
-                    yNew = (x + y) % N
-                    # 复制像素到新位置
-                    temp[yNew, xNew] = result[y, x]
-            
-            # 交换结果和临时图像
-            result, temp = temp, result
-        
-        return result
 
 class ArnoldCatMapPlugin(Plugin):
     name = "Arnold's Cat Map"
     category = "图像变换"
     description = "使用Arnold's Cat Map进行图像混沌变换"
     
+    # 拖动差值不超过该值时逐帧播放，否则直接跳转
+    JUMP_THRESHOLD = 50
+    # 显示帧的最大边长
+    DISPLAY_SIZE = 512
+    # 迭代范围上限（矩形分块变换的周期可能非常大）
+    MAX_RANGE = 100000
+    # 矩形图像处理方式
+    RECT_MODES = {"分块": 'block', "补齐为正方形": 'pad'}
+    
     def __init__(self):
         super().__init__()
         self.image_label = None
         self.iteration_slider = None
         self.iteration_spinbox = None
-        self.current_image = None
+        self.period_label = None
+        self.scrambled_spinbox = None
+        self.play_btn = None
+        self.fps_spinbox = None
+        self.rect_combo = None
+        self.crop_check = None
+        self.batch_progress = None
+        self.batch_buttons = []
+        self.batch_thread = None
         self.transformer = ArnoldCatMap()
+        self.period = None             # 当前原图的周期，后台计算完成前为 None
+        self.period_thread = None      # 当前原图的周期计算线程
+        self.period_threads = []       # 仍在运行的周期计算线程（含已被新图像取代的）
+        
+        # 加载的图像数据（保留原始模式、位深、Alpha和调色板）
+        self.source_image = None       # 文件中的原始数组
+        self.image_meta = None         # 模式、调色板等元数据
+        self.pad_size = None           # 补齐为正方形前的 (宽, 高)
         
         # 动画相关
-        self.current_iterations = 0  # 当前迭代次数
-        self.target_iterations = 0   # 目标迭代次数
-        self.original_image = None   # 原始图像
-        self.temp_image = None       # 临时图像
-        self.animation_timer = None  # 动画定时器
-        
-    def _setup_animation_timer(self):
-        """设置动画定时器"""
-        if self.animation_timer is None:
-            self.animation_timer = QTimer()
-            self.animation_timer.timeout.connect(self._update_animation)
-            self.animation_timer.setInterval(1)  # 1ms更新一次
-        
-    def _update_animation(self):
-        """更新动画帧"""
-        if self.current_image is None:
-            return
+        self.current_iterations = 0    # 当前显示的迭代次数
+        self.target_iterations = 0     # 目标迭代次数
+        self.original_image = None     # 原始图像（全分辨率）
+        self.animation_thread = None   # 后台生成帧的线程
+        self.playback_timer = None     # 固定帧率播放定时器
+        self.playing = False           # 是否正在连续播放
+        
+    def _start_animation_thread(self):
+        """为当前原图启动后台帧生成线程"""
+        self._stop_animation_thread()
+        self.animation_thread = AnimationThread(self.transformer, self.original_image,
+                                                self._to_display_rgb, self.DISPLAY_SIZE)
+        self.animation_thread.error_signal.connect(self._on_animation_error)
+        self.animation_thread.start()
+        
+        if self.playback_timer is None:
+            self.playback_timer = QTimer()
+            self.playback_timer.timeout.connect(self._on_playback_tick)
+        self.playback_timer.start(int(1000 / self.fps_spinbox.value()))
+        
+    def _stop_animation_thread(self):
+        if self.animation_thread is not None:
+            self.animation_thread.stop()
+            self.animation_thread.wait()
+            self.animation_thread = None
             
-        # 计算当前迭代次数与目标次数的差值
-        diff = self.target_iterations - self.current_iterations
+    def cleanup(self):
+        """切换插件时停止后台线程"""
+        if self.playback_timer is not None:
+            self.playback_timer.stop()
+        self._stop_animation_thread()
+        for thread in self.period_threads:
+            thread.wait()
+        if self.batch_thread is not None:
+            self.batch_thread.wait()
+        
+    def _seek(self, target):
+        """跳到目标迭代次数：差值较小时逐帧播放，否则用置换幂直接跳转"""
+        self.target_iterations = target
+        if self.animation_thread is None:
+            return
+        animate = abs(target - self.current_iterations) <= self.JUMP_THRESHOLD
+        self.animation_thread.seek(target, animate)
         
-        if diff == 0:
-            self.animation_timer.stop()
+    def _on_playback_tick(self):
+        """按固定帧率从缓冲中取出一帧显示"""
+        frame = self.animation_thread.ring.get() if self.animation_thread is not None else None
+        if frame is None:
             return
-            
-        # 确定迭代方向
-        step = 1 if diff > 0 else -1
-        self.current_iterations += step
+        self.current_iterations, image = frame
+        self._display_image(image)
+        
+        if self.playing:
+            # 连续播放时让滑动条跟随，不触发跳转
+            for widget in (self.iteration_slider, self.iteration_spinbox):
+                widget.blockSignals(True)
+                widget.setValue(self.current_iterations)
+                widget.blockSignals(False)
+            if self.current_iterations == self.target_iterations:
+                self._set_playing(False)
+                
+    def _on_animation_error(self, message):
+        QMessageBox.warning(None, "错误", f"图像处理失败: {message}")
         
-        try:
-            # 对每个像素计算新位置
-            N = self.current_image.shape[0]
-            temp = np.empty_like(self.temp_image)
-            
-            for y in range(N):
-                for x in range(N):
-                    # 计算新坐标
-                    xNew = (2 * x + y) % N
-                    yNew = (x + y) % N
-                    # 根据迭代方向复制像素
-                    if step > 0:
-                        temp[yNew, xNew] = self.current_image[y, x]
-                    else:
-                        temp[y, x] = self.current_image[yNew, xNew]
-            
-            # 交换图像
-            self.current_image, self.temp_image = temp, self.current_image
+    def _toggle_playback(self):
+        """播放/暂停：从当前帧逐帧播放到滑动条末端"""
+        if self.original_image is None:
+            return
+        if self.playing:
+            self._set_playing(False)
+            # 停在当前显示的帧，丢弃已预先生成的帧
+            self.target_iterations = self.current_iterations
+            self.animation_thread.seek(self.current_iterations, False)
+            for widget in (self.iteration_slider, self.iteration_spinbox):
+                widget.blockSignals(True)
+                widget.setValue(self.current_iterations)
+                widget.blockSignals(False)
+        else:
+            end = self.iteration_slider.maximum()
+            if self.current_iterations >= end:
+                return
+            self._set_playing(True)
+            self.target_iterations = end
+            self.animation_thread.seek(end, True)
             
-            # 只在差值较小或是10的倍数时更新显示
-            if abs(diff) < 10 or abs(diff) % 10 == 0:
-                self._display_image(self.current_image)
-                
-        except Exception as e:
-            self.animation_timer.stop()
-            QMessageBox.warning(None, "错误", f"图像处理失败: {str(e)}")
+    def _set_playing(self, playing):
+        self.playing = playing
+        self.play_btn.setText("暂停" if playing else "播放")
+        
+    def _on_fps_changed(self, fps):
+        if self.playback_timer is not None and self.playback_timer.isActive():
+            self.playback_timer.setInterval(int(1000 / fps))
     
     def _display_image(self, image):
         """显示图像"""
@@ -145,74 +205,144 @@ class ArnoldCatMapPlugin(Plugin):
     
     def _on_slider_changed(self):
         """滑动条改变时的处理函数"""
-        self.target_iterations = self.iteration_slider.value()
-        self.iteration_spinbox.setValue(self.target_iterations)
-        
-        # 确保动画定时器已设置
-        self._setup_animation_timer()
-        
-        # 如果定时器没有运行，启动它
-        if not self.animation_timer.isActive():
-            self.animation_timer.start()
+        self._set_playing(False)
+        self.iteration_spinbox.setValue(self.iteration_slider.value())
+        self._seek(self.iteration_slider.value())
     
     def _on_spinbox_changed(self):
         """输入框改变时的处理函数"""
-        self.target_iterations = self.iteration_spinbox.value()
-        self.iteration_slider.setValue(self.target_iterations)
-        
-        # 确保动画定时器已设置
-        self._setup_animation_timer()
-        
-        # 如果定时器没有运行，启动它
-        if not self.animation_timer.isActive():
-            self.animation_timer.start()
+        self._set_playing(False)
+        self.iteration_slider.setValue(self.iteration_spinbox.value())
+        self._seek(self.iteration_spinbox.value())
             
+    def _start_period(self):
+        """在后台计算当前原图的周期，完成后更新迭代范围"""
+        self.period = None
+        self.period_label.setText("周期: 计算中…")
+        self.period_label.setToolTip("")
+        thread = PeriodThread(self.transformer, self.original_image.shape[:2])
+        thread.finished_signal.connect(lambda period: self._on_period(thread, period))
+        thread.error_signal.connect(lambda message: self._on_period_error(thread, message))
+        self.period_thread = thread
+        self.period_threads.append(thread)
+        thread.start()
+
+    def _current_period_thread(self, thread):
+        """移除已结束的线程，返回它是否对应当前的原图"""
+        self.period_threads.remove(thread)
+        if thread is not self.period_thread:
+            return False
+        self.period_thread = None
+        return True
+
+    def _on_period_error(self, thread, message):
+        if self._current_period_thread(thread):
+            self.period_label.setText("周期: -")
+            QMessageBox.warning(None, "错误", f"计算周期失败: {message}")
+
+    def _on_period(self, thread, period):
+        if self._current_period_thread(thread):
+            self._update_period(period)
+
+    def _update_period(self, period):
+        """让迭代范围覆盖一个完整周期
+
+        周期超出范围上限时（常见于矩形分块变换）改为正负双向范围，负数表示逆变换。
+        """
+        self.period = period
+        text = str(period) if period < 10 ** 12 else f"{float(period):.3e}"
+        self.period_label.setText(f"周期: {text}")
+        self.period_label.setToolTip(str(period))
+        if period <= self.MAX_RANGE:
+            low, high = 0, period
+        else:
+            low, high = -self.MAX_RANGE, self.MAX_RANGE
+        self.iteration_slider.setRange(low, high)
+        self.iteration_spinbox.setRange(low, high)
+        self.scrambled_spinbox.setRange(0, min(period, self.MAX_RANGE))
+
+    def _period_ready(self):
+        """周期已知时返回 True，否则提示"""
+        if self.original_image is None:
+            QMessageBox.warning(None, "警告", "请先加载图像")
+            return False
+        if self.period is None:
+            QMessageBox.information(None, "提示", "正在计算周期，请稍候")
+            return False
+        return True
+    
+    def _restore_image(self):
+        """图像已被置乱k次时，再迭代 周期-k 次（或逆变换k次）即可还原"""
+        if not self._period_ready():
+            return
+        
+        period = self.period
+        k = self.scrambled_spinbox.value() % period
+        if period <= self.MAX_RANGE:
+            self.iteration_spinbox.setValue((period - k) % period)
+        else:
+            self.iteration_spinbox.setValue(-k)
+    
+    def _to_display_rgb(self, image):
+        return image_io.to_display_rgb(image, self.image_meta)
+    
+    def _set_base_image(self, image):
+        """设置新的原图：重置迭代计数并重启后台帧生成"""
+        self._set_playing(False)
+        self.original_image = image
+        
+        # 周期在后台计算，完成后调整迭代范围
+        self._start_period()
+        
+        # 重置迭代计数
+        self.current_iterations = 0
+        self.target_iterations = 0
+        for widget in (self.iteration_slider, self.iteration_spinbox):
+            widget.blockSignals(True)
+            widget.setValue(0)
+            widget.blockSignals(False)
+        
+        self._start_animation_thread()
+        self._display_image(self.animation_thread.display_frame(self.original_image))
+    
+    def _prepare_image(self):
+        """按矩形处理方式准备变换用的数组，不缩放、不裁剪"""
+        if self.source_image is None:
+            return
+        image = self.source_image
+        height, width = image.shape[:2]
+        
+        if self.image_meta['original_size'] is not None:
+            # 之前补齐置乱后保存的图像，还原后可按记录的尺寸裁剪
+            self.pad_size = self.image_meta['original_size']
+            crop = True
+        elif self.RECT_MODES[self.rect_combo.currentText()] == 'pad' and height != width:
+            self.pad_size = (width, height)
+            image = pad_to_square(image)
+            crop = False
+        else:
+            self.pad_size = None
+            crop = False
+        
+        self.crop_check.setEnabled(self.pad_size is not None)
+        self.crop_check.setChecked(crop)
+        if self.pad_size is not None:
+            self.crop_check.setText(f"保存时裁剪到 {self.pad_size[0]}×{self.pad_size[1]}")
+        else:
+            self.crop_check.setText("保存时裁剪到原尺寸")
+        self._set_base_image(image)
+    
     def _load_image(self):
         """加载图像文件"""
         file_path, _ = QFileDialog.getOpenFileName(
-            None, "选择图像", "", "图像文件 (*.png *.jpg *.jpeg *.bmp)"
+            None, "选择图像", "", "图像文件 (*.png *.bmp *.gif *.tif *.tiff *.webp *.jpg *.jpeg)"
         )
         
         if file_path:
             try:
-                # 使用PIL打开图像
-                image = Image.open(file_path)
-                
-                # 确保图像是RGB模式
-                if image.mode != 'RGB':
-                    image = image.convert('RGB')
-                
-                # 获取原始尺寸
-                original_size = image.size
-                
-                # 如果图像太小，将其放大到标准尺寸
-                MIN_SIZE = 128  # 降低最小标准尺寸
-                if original_size[0] < MIN_SIZE or original_size[1] < MIN_SIZE:
-                    # 计算缩放比例
-                    ratio = MIN_SIZE / min(original_size)
-                    new_size = tuple(int(dim * ratio) for dim in original_size)
-                    # 使用LANCZOS重采样方法进行高质量放大
-                    image = image.resize(new_size, Image.Resampling.LANCZOS)
-                
-                # 确保图像是正方形
-                width, height = image.size
-                size = min(width, height)
-                left = (width - size) // 2
-                top = (height - size) // 2
-                image = image.crop((left, top, left + size, top + size))
-                
-                # 转换为numpy数组，确保是uint8类型
-                self.current_image = np.array(image, dtype=np.uint8)
-                self.temp_image = np.empty_like(self.current_image)
-                
-                # 重置迭代计数
-                self.current_iterations = 0
-                self.target_iterations = 0
-                self.iteration_slider.setValue(0)
-                self.iteration_spinbox.setValue(0)
-                
-                # 更新显示
-                self._display_image(self.current_image)
+                # 保留原始模式、位深和Alpha，矩形图像不再裁剪
+                self.source_image, self.image_meta = image_io.load_image(file_path)
+                self._prepare_image()
                 
             except Exception as e:
                 QMessageBox.warning(None, "错误", f"加载图像失败: {str(e)}")
@@ -262,6 +392,80 @@ class ArnoldCatMapPlugin(Plugin):
         # 添加迭代控制到主容器
         params_container.addLayout(iteration_layout)
         
+        # 周期与还原
+        period_layout = QHBoxLayout()
+        period_layout.setSpacing(5)
+        
+        self.period_label = QLabel("周期: -", parent)
+        self.period_label.setFont(QFont(FONTS['body']))
+        
+        scrambled_label = QLabel("已置乱:", parent)
+        scrambled_label.setFont(QFont(FONTS['body']))
+        
+        self.scrambled_spinbox = QSpinBox(parent)
+        self.scrambled_spinbox.setRange(0, 2000)
+        self.scrambled_spinbox.setFixedWidth(80)
+        self.scrambled_spinbox.setToolTip("图像已被置乱的次数k，还原时跳到 周期-k 次迭代")
+        
+        restore_btn = QPushButton("还原", parent)
+        restore_btn.setFont(QFont(FONTS['body']))
+        restore_btn.setStyleSheet(style.get_button_style())
+        restore_btn.setFixedWidth(60)
+        restore_btn.clicked.connect(self._restore_image)
+        
+        period_layout.addWidget(self.period_label)
+        period_layout.addWidget(scrambled_label)
+        period_layout.addWidget(self.scrambled_spinbox)
+        period_layout.addWidget(restore_btn)
+        
+        params_container.addLayout(period_layout)
+        
+        # 播放控制
+        playback_layout = QHBoxLayout()
+        playback_layout.setSpacing(5)
+        
+        self.play_btn = QPushButton("播放", parent)
+        self.play_btn.setFont(QFont(FONTS['body']))
+        self.play_btn.setStyleSheet(style.get_button_style())
+        self.play_btn.setFixedWidth(60)
+        self.play_btn.clicked.connect(self._toggle_playback)
+        
+        fps_label = QLabel("帧率:", parent)
+        fps_label.setFont(QFont(FONTS['body']))
+        
+        self.fps_spinbox = QSpinBox(parent)
+        self.fps_spinbox.setRange(1, 60)
+        self.fps_spinbox.setValue(30)
+        self.fps_spinbox.setFixedWidth(60)
+        self.fps_spinbox.valueChanged.connect(self._on_fps_changed)
+        
+        playback_layout.addWidget(self.play_btn)
+        playback_layout.addWidget(fps_label)
+        playback_layout.addWidget(self.fps_spinbox)
+        
+        params_container.addLayout(playback_layout)
+        
+        # 矩形图像处理
+        rect_layout = QHBoxLayout()
+        rect_layout.setSpacing(5)
+        
+        rect_label = QLabel("矩形:", parent)
+        rect_label.setFont(QFont(FONTS['body']))
+        
+        self.rect_combo = QComboBox(parent)
+        self.rect_combo.addItems(self.RECT_MODES.keys())
+        self.rect_combo.setToolTip("分块：沿长边按正方形块变换，尺寸不变；补齐：补零为正方形，保存时可精确裁回原尺寸")
+        self.rect_combo.currentTextChanged.connect(self._prepare_image)
+        
+        self.crop_check = QCheckBox("保存时裁剪到原尺寸", parent)
+        self.crop_check.setEnabled(False)
+        
+        rect_layout.addWidget(rect_label)
+        rect_layout.addWidget(self.rect_combo)
+        rect_layout.addWidget(self.crop_check)
+        
+        params_container.addLayout(rect_layout)
+        
         # 按钮布局
         button_layout = QHBoxLayout()
         button_layout.setSpacing(10)
@@ -278,8 +482,32 @@ class ArnoldCatMapPlugin(Plugin):
         save_btn.setFixedWidth(60)
         save_btn.clicked.connect(self._save_image)
         
+        brute_btn = QPushButton("破解", parent)
+        brute_btn.setFont(QFont(FONTS['body']))
+        brute_btn.setStyleSheet(style.get_button_style())
+        brute_btn.setFixedWidth(60)
+        brute_btn.setToolTip("暴力搜索广义猫映射 [[1,a],[b,ab+1]] 的参数和迭代次数")
+        brute_btn.clicked.connect(self._show_brute_force_dialog)
+        
         button_layout.addWidget(load_btn)
         button_layout.addWidget(save_btn)
+        button_layout.addWidget(brute_btn)
+        
+        # 批量处理：使用当前迭代次数和矩形处理方式
+        self.batch_buttons = []
+        for text, scramble in (("批量置乱", True), ("批量还原", False)):
+            batch_btn = QPushButton(text, parent)
+            batch_btn.setFont(QFont(FONTS['body']))
+            batch_btn.setStyleSheet(style.get_button_style())
+            batch_btn.setToolTip("对目录中的所有图片按当前迭代次数并行处理，输出PNG并写出清单")
+            batch_btn.clicked.connect(lambda checked=False, scramble=scramble: self._start_batch(scramble))
+            button_layout.addWidget(batch_btn)
+            self.batch_buttons.append(batch_btn)
+        
+        self.batch_progress = QProgressBar(parent)
+        self.batch_progress.setFixedWidth(120)
+        self.batch_progress.setVisible(False)
+        button_layout.addWidget(self.batch_progress)
         
         # 添加按钮到主容器
         params_container.addLayout(button_layout)
@@ -307,9 +535,24 @@ class ArnoldCatMapPlugin(Plugin):
         # 添加到插件布局
         layout.addWidget(container)
 
+    def _show_brute_force_dialog(self):
+        """打开参数暴力破解对话框"""
+        if not self._period_ready():
+            return
+        
+        dialog = BruteForceDialog(self._to_display_rgb(self.original_image),
+                                  min(self.period, self.MAX_RANGE), self.image_label)
+        dialog.candidate_selected.connect(self._apply_candidate)
+        dialog.exec()
+    
+    def _apply_candidate(self, candidate):
+        """以选中的破解结果作为新的原图（对原始数据变换，保留模式和位深）"""
+        cat_map = ArnoldCatMap.generalized(candidate['a'], candidate['b'])
+        self._set_base_image(cat_map.transform(self.original_image, candidate['iterations']))
+    
     def _save_image(self):
         """保存图像"""
-        if self.current_image is None:
+        if self.original_image is None:
             QMessageBox.warning(None, "警告", "没有可保存的图像")
             return
             
@@ -317,19 +560,70 @@ class ArnoldCatMapPlugin(Plugin):
             None,
             "保存图像",
             "",
-            "PNG图像 (*.png);;JPEG图像 (*.jpg *.jpeg);;BMP图像 (*.bmp)"
+            "PNG图像 (*.png);;BMP图像 (*.bmp);;TIFF图像 (*.tif *.tiff)"
         )
         
         if file_path:
             try:
-                # 获取当前显示的图像
-                pixmap = self.image_label.pixmap()
-                if pixmap:
-                    # 保存为文件
-                    pixmap.save(file_path)
+                # 保存当前迭代次数对应的全分辨率图像，而不是缩放后的预览
+                result = self.transformer.transform(self.original_image, self.current_iterations)
+                if self.pad_size is not None and self.crop_check.isChecked():
+                    image_io.save_image(file_path, unpad(result, self.pad_size), self.image_meta)
+                else:
+                    # 补齐后的图像记录原尺寸，还原时可精确裁剪
+                    image_io.save_image(file_path, result, self.image_meta, self.pad_size)
             except Exception as e:
                 QMessageBox.warning(None, "错误", f"保存图像失败: {str(e)}")
 
+    def _start_batch(self, scramble):
+        """选择输入目录和输出目录，按当前迭代次数并行置乱或还原"""
+        if self.batch_thread is not None:
+            return
+        # batch 也作为 python -m 的入口运行，插件加载时不导入，避免 runpy 警告模块已被导入
+        from .batch import batch_transform
+        image_dir = QFileDialog.getExistingDirectory(None, "选择图片目录")
+        if not image_dir:
+            return
+        output_dir = QFileDialog.getExistingDirectory(None, "选择输出目录")
+        if not output_dir:
+            return
+        
+        for button in self.batch_buttons:
+            button.setEnabled(False)
+        self.batch_progress.setValue(0)
+        self.batch_progress.setVisible(True)
+        
+        self.batch_thread = ArnoldBatchThread(
+            batch_transform, image_dir, output_dir, self.iteration_spinbox.value(), scramble,
+            rect=self.RECT_MODES[self.rect_combo.currentText()]
+        )
+        self.batch_thread.progress_signal.connect(self._batch_progress)
+        self.batch_thread.finished_signal.connect(self._batch_finished)
+        self.batch_thread.error_signal.connect(self._batch_error)
+        self.batch_thread.start()
+    
+    def _batch_progress(self, done, total):
+        self.batch_progress.setRange(0, total)
+        self.batch_progress.setValue(done)
+    
+    def _batch_done(self):
+        for button in self.batch_buttons:
+            button.setEnabled(True)
+        self.batch_progress.setVisible(False)
+        self.batch_thread = None
+    
+    def _batch_finished(self, rows):
+        self._batch_done()
+        failed = [row for row in rows if row['error']]
+        message = f"完成 {len(rows)} 个，失败 {len(failed)} 个"
+        if failed:
+            message += "\n" + "\n".join(f"{row['image']}: {row['error']}" for row in failed[:10])
+        QMessageBox.information(None, "批量处理", message)
+    
+    def _batch_error(self, message):
+        self._batch_done()
+        QMessageBox.warning(None, "错误", f"批量处理失败: {message}")
+
     def process(self, text: str) -> str:
         """处理输入文本 - 这个插件不处理文本"""
         return text
@@ -0,0 +1,271 @@
+"""广义猫映射 [[1,a],[b,ab+1]] 的参数暴力搜索
+
+对每组 (a, b) 只计算一次置换 P，然后只跟踪降采样预览上的采样位置及其右、下相邻像素：
+第 k 次迭代的采样源位置满足 S_{k+1} = P[S_k]，每步只需 3M 次取数（M 为预览像素数），
+按相邻像素差能量打分（越小越平滑，越可能是还原后的图像）。
+采样点在网格上随机抖动，规则网格是映射的不变子格，其周期可能短于整幅图像。
+不同的 (a, b) 分发到进程池并行计算。
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox,
+                              QPushButton, QProgressBar, QListWidget, QListWidgetItem,
+                              QMessageBox)
+from PySide6.QtCore import Qt, QThread, Signal, QSize
+from PySide6.QtGui import QImage, QPixmap, QIcon
+from PIL import Image
+import numpy as np
+
+from .cat_map import ArnoldCatMap
+
+# 子进程中的灰度图（由进程池初始化函数设置，避免每个任务重复传输图像）
+_gray = None
+
+
+def to_gray(image: np.ndarray) -> np.ndarray:
+    """打分用的 float32 灰度图"""
+    if image.ndim == 2:
+        return image.astype(np.float32)
+    rgb = image[..., :3].astype(np.float32)
+    return rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def smoothness(values: np.ndarray, right: np.ndarray, down: np.ndarray) -> float:
+    """相邻像素差能量：与右侧、下方像素差值平方的均值，越小越平滑"""
+    dx = values - right
+    dy = values - down
+    return float((np.mean(dx * dx) + np.mean(dy * dy)) / 2)
+
+
+def sample_positions(height: int, width: int, preview_size: int) -> np.ndarray:
+    """降采样预览的采样点在展平图像中的位置（网格内固定种子抖动，不含最后一行/列）"""
+    rng = np.random.default_rng(0)
+    axes = []
+    for length in (height, width):
+        step = max(1, (length - 1) // preview_size)
+        grid = np.arange(0, length - 1, step)[:preview_size]
+        axes.append((grid, step, length))
+    (row_grid, row_step, _), (col_grid, col_step, _) = axes
+    shape = (len(row_grid), len(col_grid))
+    rows = np.minimum(row_grid[:, None] + rng.integers(0, row_step, shape), height - 2)
+    cols = np.minimum(col_grid[None, :] + rng.integers(0, col_step, shape), width - 2)
+    return (rows * width + cols).ravel()
+
+
+def _init_worker(gray):
+    global _gray
+    _gray = gray
+
+
+def search_pair(a: int, b: int, max_iterations: int, preview_size: int, keep: int) -> list:
+    """对一组 (a, b) 搜索迭代次数，返回得分最低的若干个 (score, a, b, k)"""
+    height, width = _gray.shape
+    flat = _gray.ravel()
+    cat_map = ArnoldCatMap.generalized(a, b)
+    perm = cat_map.permutation((height, width))
+    # 第 period 次迭代回到输入本身，不参与比较
+    limit = min(max_iterations, cat_map.period((height, width)) - 1)
+    if limit < 1:
+        return []
+
+    positions = sample_positions(height, width, preview_size)
+    count = len(positions)
+    scores = np.empty(limit, dtype=np.float64)
+    # 采样点、右邻、下邻一起跟踪
+    source = np.concatenate((positions, positions + 1, positions + width))
+    for k in range(limit):
+        source = perm[source]
+        values = flat[source]
+        scores[k] = smoothness(values[:count], values[count:2 * count], values[2 * count:])
+
+    best = np.argsort(scores, kind='stable')[:keep]
+    return [(float(scores[i]), a, b, int(i) + 1) for i in best]
+
+
+def brute_force(image: np.ndarray, a_range: range, b_range: range, max_iterations: int,
+                top: int = 12, preview_size: int = 64, workers: int = None,
+                progress=None, should_stop=None) -> list:
+    """在 (a, b, 迭代次数) 上暴力搜索，返回按得分升序排列的候选列表"""
+    if min(image.shape[:2]) < 2:
+        raise ValueError("图像尺寸太小")
+
+    pairs = [(a, b) for a in a_range for b in b_range]
+    candidates = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(to_gray(image),)) as executor:
+        futures = [executor.submit(search_pair, a, b, max_iterations, preview_size, top)
+                   for a, b in pairs]
+        for done, future in enumerate(as_completed(futures)):
+            if should_stop is not None and should_stop():
+                for pending in futures:
+                    pending.cancel()
+                break
+            candidates.extend(future.result())
+            if progress is not None:
+                progress(done + 1, len(pairs))
+
+    candidates.sort()
+    return [{'score': score, 'a': a, 'b': b, 'iterations': k}
+            for score, a, b, k in candidates[:top]]
+
+
+class BruteForceThread(QThread):
+    progress_signal = Signal(int, int)  # 进度信号 (已完成, 总数)
+    finished_signal = Signal(object)  # 完成信号，传递候选列表（附带缩略图）
+    error_signal = Signal(str)  # 错误信号
+
+    def __init__(self, image, a_range, b_range, max_iterations, top, thumb_size=128):
+        super().__init__()
+        self.image = image
+        self.a_range = a_range
+        self.b_range = b_range
+        self.max_iterations = max_iterations
+        self.top = top
+        self.thumb_size = thumb_size
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+
+    def run(self):
+        try:
+            candidates = brute_force(self.image, self.a_range, self.b_range,
+                                     self.max_iterations, self.top,
+                                     progress=self.progress_signal.emit,
+                                     should_stop=lambda: self._stop)
+            # 只为最终候选计算全分辨率结果并生成缩略图
+            for candidate in candidates:
+                cat_map = ArnoldCatMap.generalized(candidate['a'], candidate['b'])
+                result = cat_map.transform(self.image, candidate['iterations'])
+                thumb = Image.fromarray(result)
+                thumb.thumbnail((self.thumb_size, self.thumb_size))
+                candidate['thumbnail'] = np.ascontiguousarray(np.asarray(thumb.convert('RGB')))
+            self.finished_signal.emit(candidates)
+        except Exception as e:
+            self.error_signal.emit(str(e))
+
+
+class BruteForceDialog(QDialog):
+    """广义猫映射参数暴力破解，结果以缩略图列出，双击应用"""
+
+    candidate_selected = Signal(object)  # 选中的候选 {'a', 'b', 'iterations', ...}
+
+    def __init__(self, image, max_iterations, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("暴力破解参数")
+        self.setMinimumWidth(800)
+        self.setMinimumHeight(600)
+
+        self._image = image
+        self._thread = None
+
+        layout = QVBoxLayout(self)
+
+        control_layout = QHBoxLayout()
+        self.a_min, self.a_max = self._add_range(control_layout, "a:", 1, 8)
+        self.b_min, self.b_max = self._add_range(control_layout, "b:", 1, 8)
+
+        control_layout.addWidget(QLabel("最大迭代:"))
+        self.iter_spin = QSpinBox(self)
+        self.iter_spin.setRange(1, 100000)
+        self.iter_spin.setValue(max(1, min(max_iterations, self.iter_spin.maximum())))
+        control_layout.addWidget(self.iter_spin)
+
+        control_layout.addWidget(QLabel("候选数:"))
+        self.top_spin = QSpinBox(self)
+        self.top_spin.setRange(1, 100)
+        self.top_spin.setValue(12)
+        control_layout.addWidget(self.top_spin)
+
+        self.start_btn = QPushButton("开始", self)
+        self.start_btn.clicked.connect(self._start)
+        control_layout.addWidget(self.start_btn)
+
+        self.stop_btn = QPushButton("停止", self)
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self._stop)
+        control_layout.addWidget(self.stop_btn)
+        layout.addLayout(control_layout)
+
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+
+        self.result_list = QListWidget(self)
+        self.result_list.setViewMode(QListWidget.IconMode)
+        self.result_list.setIconSize(QSize(128, 128))
+        self.result_list.setResizeMode(QListWidget.Adjust)
+        self.result_list.setMovement(QListWidget.Static)
+        self.result_list.itemDoubleClicked.connect(self._on_item_double_clicked)
+        layout.addWidget(self.result_list)
+
+    def _add_range(self, layout, label, low, high):
+        layout.addWidget(QLabel(label))
+        spins = []
+        for value in (low, high):
+            spin = QSpinBox(self)
+            spin.setRange(0, 10000)
+            spin.setValue(value)
+            layout.addWidget(spin)
+            spins.append(spin)
+        return spins
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        a_range = range(self.a_min.value(), self.a_max.value() + 1)
+        b_range = range(self.b_min.value(), self.b_max.value() + 1)
+        if not a_range or not b_range:
+            QMessageBox.warning(self, "警告", "参数范围无效")
+            return
+
+        self.result_list.clear()
+        self.start_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.progress_bar.setRange(0, len(a_range) * len(b_range))
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+
+        self._thread = BruteForceThread(self._image, a_range, b_range,
+                                        self.iter_spin.value(), self.top_spin.value())
+        self._thread.progress_signal.connect(lambda done, total: self.progress_bar.setValue(done))
+        self._thread.finished_signal.connect(self._on_finished)
+        self._thread.error_signal.connect(self._on_error)
+        self._thread.start()
+
+    def _stop(self):
+        if self._thread is not None:
+            self._thread.stop()
+
+    def _reset(self):
+        self.start_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        self.progress_bar.setVisible(False)
+        self._thread = None
+
+    def _on_finished(self, candidates):
+        for candidate in candidates:
+            thumb = candidate['thumbnail']
+            height, width = thumb.shape[:2]
+            qimg = QImage(thumb.data, width, height, 3 * width, QImage.Format_RGB888)
+            item = QListWidgetItem(
+                QIcon(QPixmap.fromImage(qimg)),
+                f"a={candidate['a']} b={candidate['b']} k={candidate['iterations']}\n"
+                f"得分 {candidate['score']:.1f}"
+            )
+            item.setData(Qt.ItemDataRole.UserRole,
+                         {key: candidate[key] for key in ('a', 'b', 'iterations', 'score')})
+            self.result_list.addItem(item)
+        self._reset()
+
+    def _on_error(self, message):
+        self._reset()
+        QMessageBox.warning(self, "错误", f"暴力破解失败: {message}")
+
+    def _on_item_double_clicked(self, item):
+        self.candidate_selected.emit(item.data(Qt.ItemDataRole.UserRole))
+
+    def closeEvent(self, event):
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread.wait()
+        event.accept()
@@ -0,0 +1,203 @@
+import math
+import threading
+import numpy as np
+
+
+def pad_to_square(image: np.ndarray) -> np.ndarray:
+    """右侧/下方补零为正方形，配合 unpad 可精确还原原尺寸"""
+    height, width = image.shape[:2]
+    side = max(height, width)
+    if height == width:
+        return image
+    padded = np.zeros((side, side) + image.shape[2:], dtype=image.dtype)
+    padded[:height, :width] = image
+    return padded
+
+
+def unpad(image: np.ndarray, size) -> np.ndarray:
+    """裁掉 pad_to_square 补齐的部分，size 为原始 (宽, 高)"""
+    width, height = size
+    return image[:height, :width]
+
+
+class ArnoldCatMap:
+    """Arnold's Cat Map 变换实现
+
+    变换 (x, y) -> ((m00·x + m01·y) mod N, (m10·x + m11·y) mod N) 是 N×N 像素位置上的一个置换，
+    默认矩阵为 [[2,1],[1,1]]，广义猫映射 [[1,a],[b,ab+1]] 可用 generalized(a, b) 创建。
+    预先计算一次展平后的索引置换 P（P[新位置] = 原位置），
+    一次迭代就是 np.take(image, P)；k 次迭代的置换 P^k 用平方求幂得到，
+    跳到第 k 次迭代只需 O(N² log k)，逆变换使用逆置换。
+
+    尺寸参数可以是边长 N 或 (高, 宽)。矩形图像按分块处理：沿长边依次对边长为短边的正方形块做变换，
+    最后一块与末端对齐（可与前一块重叠），每块都是置换，组合后仍是整幅图上的置换，尺寸不变。
+    """
+
+    DEFAULT_MATRIX = ((2, 1), (1, 1))
+
+    def __init__(self, matrix=DEFAULT_MATRIX):
+        (m00, m01), (m10, m11) = matrix
+        if abs(m00 * m11 - m01 * m10) != 1:
+            raise ValueError("变换矩阵的行列式必须为 ±1")
+        self.matrix = ((int(m00), int(m01)), (int(m10), int(m11)))
+        # (高, 宽) -> [P, P^2, P^4, ...]，平方求幂时按需延长
+        self._ladders = {}
+        # (高, 宽) -> P^-1，动画逐帧回退时复用
+        self._inverses = {}
+        # (高, 宽) -> 周期
+        self._periods = {}
+        # 界面线程与动画线程共用同一实例，延长平方阶梯时加锁
+        self._lock = threading.Lock()
+
+    @classmethod
+    def generalized(cls, a: int, b: int) -> 'ArnoldCatMap':
+        """广义猫映射 [[1,a],[b,ab+1]]"""
+        return cls(((1, a), (b, a * b + 1)))
+
+    @staticmethod
+    def _shape(size) -> tuple:
+        if isinstance(size, (int, np.integer)):
+            return int(size), int(size)
+        height, width = size[:2]
+        return int(height), int(width)
+
+    @staticmethod
+    def _index_dtype(size: int):
+        return np.int32 if size < 2 ** 31 else np.int64
+
+    def _square_permutation(self, N: int, dtype) -> np.ndarray:
+        y, x = np.divmod(np.arange(N * N, dtype=np.int64), N)
+        (m00, m01), (m10, m11) = self.matrix
+        target = ((m10 * x + m11 * y) % N) * N + (m00 * x + m01 * y) % N
+        perm = np.empty(N * N, dtype=dtype)
+        perm[target] = np.arange(N * N, dtype=dtype)
+        return perm
+
+    def _block_permutation(self, height: int, width: int, dtype) -> np.ndarray:
+        """矩形图像：依次变换覆盖长边的正方形块，组合成整幅图上的置换"""
+        side = min(height, width)
+        length = max(height, width)
+        offsets = list(range(0, length - side + 1, side))
+        if offsets[-1] + side < length:
+            offsets.append(length - side)
+
+        block = self._square_permutation(side, dtype)
+        index = np.arange(height * width, dtype=dtype).reshape(height, width)
+        for offset in offsets:
+            if height > width:
+                region = index[offset:offset + side, :]
+            else:
+                region = index[:, offset:offset + side]
+            region[...] = np.take(region.ravel(), block).reshape(side, side)
+        return index.ravel()
+
+    def permutation(self, size) -> np.ndarray:
+        """一次迭代的置换：result.flat[i] = image.flat[P[i]]"""
+        shape = self._shape(size)
+        ladder = self._ladders.get(shape)
+        if ladder is None:
+            height, width = shape
+            dtype = self._index_dtype(height * width)
+            if height == width:
+                perm = self._square_permutation(height, dtype)
+            else:
+                perm = self._block_permutation(height, width, dtype)
+            ladder = [perm]
+            self._ladders[shape] = ladder
+        return ladder[0]
+
+    def inverse_permutation(self, size) -> np.ndarray:
+        """一次逆迭代的置换 P^-1"""
+        shape = self._shape(size)
+        inverse = self._inverses.get(shape)
+        if inverse is None:
+            inverse = self.invert(self.permutation(shape))
+            self._inverses[shape] = inverse
+        return inverse
+
+    @staticmethod
+    def compose(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+        """先应用 first 再应用 second 的置换"""
+        return np.take(first, second)
+
+    @staticmethod
+    def invert(perm: np.ndarray) -> np.ndarray:
+        inverse = np.empty_like(perm)
+        inverse[perm] = np.arange(len(perm), dtype=perm.dtype)
+        return inverse
+
+    def power(self, size, iterations: int) -> np.ndarray:
+        """k 次迭代的置换 P^k，k 为负数时返回逆变换"""
+        shape = self._shape(size)
+        base = self.permutation(shape)
+        ladder = self._ladders[shape]
+        k = abs(iterations)
+
+        result = None
+        level = 0
+        while k:
+            if level == len(ladder):
+                with self._lock:
+                    if level == len(ladder):
+                        ladder.append(self.compose(ladder[-1], ladder[-1]))
+            if k & 1:
+                result = ladder[level] if result is None else self.compose(result, ladder[level])
+            k >>= 1
+            level += 1
+
+        if result is None:
+            return np.arange(len(base), dtype=base.dtype)
+        return self.invert(result) if iterations < 0 else result
+
+    def cycle_lengths(self, size) -> np.ndarray:
+        """置换各个环的长度（每个环一项）
+
+        指针倍增：每轮把每个位置的标签取为自己与 2^i 步后位置标签的较小者，
+        log2(N²) 轮后同一环内所有位置的标签都等于环内最小下标，
+        再按标签计数即得各环长度，全程向量化。
+        """
+        perm = self.permutation(size)
+        jump = perm.astype(np.int64)
+        label = np.arange(len(perm), dtype=np.int64)
+        span = 1
+        while span < len(perm):
+            np.minimum(label, label[jump], out=label)
+            jump = jump[jump]
+            span *= 2
+        counts = np.bincount(label, minlength=len(perm))
+        return counts[counts > 0]
+
+    def period(self, size) -> int:
+        """变换的周期：迭代该次数后图像复原，等于各环长度的最小公倍数"""
+        shape = self._shape(size)
+        period = self._periods.get(shape)
+        if period is None:
+            period = 1
+            for length in np.unique(self.cycle_lengths(shape)):
+                period = math.lcm(period, int(length))
+            self._periods[shape] = period
+        return period
+
+    @staticmethod
+    def apply(image: np.ndarray, perm: np.ndarray) -> np.ndarray:
+        """将置换应用到图像（支持灰度和多通道）"""
+        height, width = image.shape[:2]
+        flat = image.reshape(height * width, *image.shape[2:])
+        return np.take(flat, perm, axis=0).reshape(image.shape)
+
+    def transform(self, image: np.ndarray, iterations: int = 1) -> np.ndarray:
+        """
+        使用Arnold's Cat Map进行图像变换
+
+        Args:
+            image: 输入图像（numpy数组，正方形或矩形）
+            iterations: 迭代次数，负数表示逆变换
+
+        Returns:
+            变换后的图像，尺寸、通道数和数据类型与输入相同
+        """
+        return self.apply(image, self.power(image.shape[:2], iterations))
+
+    def inverse_transform(self, image: np.ndarray, iterations: int = 1) -> np.ndarray:
+        """逆变换，用于还原被置乱的图像"""
+        return self.transform(image, -iterations)
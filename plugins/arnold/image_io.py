@@ -0,0 +1,89 @@
+from PIL import Image, PngImagePlugin
+import numpy as np
+
+# 按原样保留的图像模式（像素置换不需要改变颜色表示）
+PRESERVED_MODES = ('1', 'L', 'LA', 'P', 'PA', 'RGB', 'RGBA', 'CMYK', 'I;16', 'I', 'F')
+
+# 补齐为正方形时，原始尺寸写入 PNG 文本块，还原时据此精确裁剪
+SIZE_KEY = 'ArnoldSize'
+
+
+def load_image(path: str) -> tuple:
+    """读取图像为数组，保留模式、调色板和透明色
+
+    返回 (数组, 元数据)，元数据包含 mode、palette、transparency
+    以及从 PNG 文本块读出的补齐前尺寸 original_size（宽, 高，没有则为 None）。
+    """
+    with Image.open(path) as image:
+        image.load()
+        if image.mode not in PRESERVED_MODES:
+            has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+        meta = {
+            'mode': image.mode,
+            'palette': image.getpalette() if image.mode in ('P', 'PA') else None,
+            'transparency': image.info.get('transparency'),
+            'original_size': parse_size(image.info.get(SIZE_KEY)),
+        }
+        return np.array(image), meta
+
+
+def parse_size(text) -> tuple:
+    if not text:
+        return None
+    try:
+        width, height = (int(part) for part in str(text).lower().split('x'))
+    except ValueError:
+        return None
+    return width, height
+
+
+def to_image(array: np.ndarray, meta: dict) -> Image.Image:
+    """将数组按原模式还原为 PIL 图像"""
+    mode = meta['mode']
+    image = Image.fromarray(array)
+    if image.mode != mode:
+        height, width = array.shape[:2]
+        image = Image.frombytes(mode, (width, height), np.ascontiguousarray(array).tobytes())
+    if meta.get('palette') is not None:
+        image.putpalette(meta['palette'])
+    return image
+
+
+def save_image(path: str, array: np.ndarray, meta: dict, original_size=None):
+    """保存数组，保留原模式；original_size 不为空时写入 PNG 文本块"""
+    image = to_image(array, meta)
+    params = {}
+    if meta.get('transparency') is not None:
+        params['transparency'] = meta['transparency']
+    if original_size is not None and path.lower().endswith('.png'):
+        info = PngImagePlugin.PngInfo()
+        info.add_text(SIZE_KEY, f"{original_size[0]}x{original_size[1]}")
+        params['pnginfo'] = info
+    image.save(path, **params)
+
+
+def to_display_rgb(array: np.ndarray, meta: dict) -> np.ndarray:
+    """转换为 (H, W, 3) uint8 数组用于显示，不改变原始数据"""
+    mode = meta['mode']
+    if mode in ('P', 'PA'):
+        palette = np.zeros((256, 3), dtype=np.uint8)
+        entries = np.array(meta['palette'] or [], dtype=np.uint8).reshape(-1, 3)[:256]
+        palette[:len(entries)] = entries
+        indices = array[..., 0] if array.ndim == 3 else array
+        return np.take(palette, indices, axis=0)
+    if mode == '1':
+        gray = array.astype(np.uint8) * 255
+    elif mode in ('I;16', 'I', 'F'):
+        # 高位深按实际取值范围线性映射到 0~255
+        values = array.astype(np.float64)
+        low, high = float(values.min()), float(values.max())
+        scale = 255.0 / (high - low) if high > low else 0.0
+        gray = ((values - low) * scale).astype(np.uint8)
+    elif mode in ('L', 'LA'):
+        gray = array[..., 0] if array.ndim == 3 else array
+    elif mode == 'CMYK':
+        return np.asarray(to_image(array, meta).convert('RGB'))
+    else:
+        return np.ascontiguousarray(array[..., :3])
+    return np.repeat(gray[..., None], 3, axis=2)
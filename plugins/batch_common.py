@@ -0,0 +1,57 @@
+"""批量处理的公共部分（LSB 批量嵌入/提取、Arnold 批量置乱/还原共用）
+
+目录中的图片列表、输出文件名模板、进程池执行并写出 CSV 清单，以及命令行的进度和汇总输出。
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import csv
+import os
+
+
+def list_images(directory: str, extensions: tuple) -> list:
+    """目录中扩展名属于 extensions 的文件，按路径排序"""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(extensions)
+    )
+
+
+def output_name(template: str, path: str, index: int) -> str:
+    """按模板生成输出文件名，可用 {stem}、{ext}、{index}"""
+    stem, ext = os.path.splitext(os.path.basename(path))
+    return template.format(stem=stem, ext=ext.lstrip('.'), index=index)
+
+
+def run_tasks(worker, tasks: list, fields: list, manifest: str, workers: int = None, progress=None,
+              initializer=None, initargs=()) -> list:
+    """在进程池中对每个任务调用 worker，返回的行按第一列排序后写入 CSV 清单
+
+    progress(已完成, 总数) 每完成一个任务调用一次。
+    """
+    rows = []
+    if tasks:
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                                 initargs=initargs) as executor:
+            futures = [executor.submit(worker, task) for task in tasks]
+            for done, future in enumerate(as_completed(futures)):
+                rows.append(future.result())
+                if progress is not None:
+                    progress(done + 1, len(tasks))
+
+    rows.sort(key=lambda row: row[fields[0]])
+    with open(manifest, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
+
+
+def print_progress(done: int, total: int):
+    """命令行进度，在同一行刷新"""
+    print(f"\r{done}/{total}", end='', flush=True)
+
+
+def report(rows: list) -> int:
+    """输出完成和失败的数量，返回命令行退出码（有失败时为 1）"""
+    failed = sum(1 for row in rows if row['error'])
+    print(f"\n完成 {len(rows)} 个，失败 {failed} 个")
+    return 1 if failed else 0
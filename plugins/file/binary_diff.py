@@ -0,0 +1,335 @@
+"""两个文件的二进制对比
+
+两个文件都以 mmap 访问，按块取 np.frombuffer 视图比较，内存占用与文件大小无关。
+每块先用 np.array_equal 整体比较（逐块 memcmp 级别，相同的块直接跳过，比分别计算两边的
+哈希更省），不同的块再求出逐字节的差异，用 np.diff 找出连续差异区间的边界。
+间隔不超过「合并间隔」的区间合并为一个，跨块的区间与上一块最后一个区间相接。
+长度不同时，较长文件多出的部分作为最后一个区间。
+"""
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSpinBox,
+    QProgressBar, QListWidget, QSplitter, QFileDialog, QMessageBox
+)
+from PySide6.QtCore import Qt, QThread, Signal
+import mmap
+import os
+import numpy as np
+
+from .hex_view import HexView
+
+# 每次比较的字节数
+CHUNK_BYTES = 1 << 24
+
+# 最多记录的差异区间数，超过后只继续统计不同的字节数
+MAX_RANGES = 100000
+
+
+def _runs(x: np.ndarray, y: np.ndarray, base: int, gap: int):
+    """两段等长数据中不同字节组成的区间，返回 (起始数组, 结束数组, 不同的字节数)"""
+    differ = np.zeros(len(x) + 2, dtype=np.int8)
+    np.not_equal(x, y, out=differ[1:-1].view(np.bool_))
+    edges = np.flatnonzero(np.diff(differ))
+    starts, ends = edges[::2], edges[1::2]
+    if gap and len(starts) > 1:
+        keep = starts[1:] - ends[:-1] > gap
+        starts = np.concatenate((starts[:1], starts[1:][keep]))
+        ends = np.concatenate((ends[:-1][keep], ends[-1:]))
+    return starts + base, ends + base, int(np.count_nonzero(differ))
+
+
+def diff(a, b, gap: int = 0, limit: int = MAX_RANGES, on_ranges=None, progress=None,
+         should_stop=None) -> dict:
+    """对比两个缓冲区（bytes 或 mmap）
+
+    差异区间 [起始, 结束) 按块分批交给 on_ranges。返回
+    {'ranges': 区间列表, 'bytes': 不同的字节数（不含多出的部分）, 'truncated': 区间数是否超过 limit,
+     'stopped': 是否被中止}。
+    """
+    common = min(len(a), len(b))
+    ranges = []
+    differing = 0
+    truncated = False
+    stopped = False
+    pending = None  # 上一块最后一个区间，可能与下一块开头的区间相连
+
+    def emit(found):
+        nonlocal truncated
+        room = limit - len(ranges)
+        if len(found) > room:
+            found = found[:room]
+            truncated = True
+        if found:
+            ranges.extend(found)
+            if on_ranges is not None:
+                on_ranges(found)
+
+    position = 0
+    while position < common:
+        if should_stop is not None and should_stop():
+            stopped = True
+            break
+        end = min(position + CHUNK_BYTES, common)
+        x = np.frombuffer(a, dtype=np.uint8, count=end - position, offset=position)
+        y = np.frombuffer(b, dtype=np.uint8, count=end - position, offset=position)
+        if not np.array_equal(x, y):
+            starts, ends, count = _runs(x, y, position, gap)
+            differing += count
+            if not truncated:
+                found = list(zip(starts.tolist(), ends.tolist()))
+                if pending is not None and found[0][0] - pending[1] <= gap:
+                    found[0] = (pending[0], found[0][1])
+                elif pending is not None:
+                    found.insert(0, pending)
+                pending = found.pop()
+                emit(found)
+        del x, y
+        if progress is not None:
+            progress(int(end * 100 / max(1, common)))
+        position = end
+
+    if pending is not None and not truncated:
+        emit([pending])
+    if not stopped and len(a) != len(b) and not truncated:
+        emit([(common, max(len(a), len(b)))])
+    return {'ranges': ranges, 'bytes': differing, 'truncated': truncated, 'stopped': stopped}
+
+
+class DiffThread(QThread):
+    ranges_signal = Signal(list)  # 每块找到的 [(起始, 结束), ...]
+    progress_signal = Signal(int)  # 进度信号
+    finished_signal = Signal(object)  # 完成信号，传递 diff 的结果
+    error_signal = Signal(str)  # 错误信号
+
+    def __init__(self, a, b, gap=0):
+        super().__init__()
+        self.a = a
+        self.b = b
+        self.gap = gap
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+
+    def run(self):
+        try:
+            result = diff(self.a, self.b, self.gap, on_ranges=self.ranges_signal.emit,
+                          progress=self.progress_signal.emit, should_stop=lambda: self._stop)
+            self.finished_signal.emit(result)
+        except Exception as e:
+            self.error_signal.emit(str(e))
+
+
+class BinaryDiffDialog(QDialog):
+    """左右两个十六进制视图同步滚动，差异字节标红，单击差异区间两边同时跳转"""
+
+    def __init__(self, path=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("二进制对比")
+        self.setMinimumWidth(1100)
+        self.setMinimumHeight(700)
+
+        self._paths = [None, None]
+        self._data = [b"", b""]
+        self._ranges = []
+        self._thread = None
+        self._syncing = False
+
+        layout = QVBoxLayout(self)
+
+        file_layout = QHBoxLayout()
+        self.file_labels = []
+        for index, name in enumerate(("文件 A", "文件 B")):
+            label = QLabel(f"{name}: 未选择", self)
+            button = QPushButton("选择文件", self)
+            button.clicked.connect(lambda checked=False, index=index: self._select_file(index))
+            file_layout.addWidget(label, 1)
+            file_layout.addWidget(button)
+            self.file_labels.append(label)
+        layout.addLayout(file_layout)
+
+        control_layout = QHBoxLayout()
+        control_layout.addWidget(QLabel("合并间隔:", self))
+        self.gap_spin = QSpinBox(self)
+        self.gap_spin.setRange(0, 4096)
+        self.gap_spin.setSuffix(" 字节")
+        self.gap_spin.setToolTip("间隔不超过该字节数的差异合并为一处，便于查看逐字节的 LSB 改动")
+        control_layout.addWidget(self.gap_spin)
+        self.compare_btn = QPushButton("对比", self)
+        self.compare_btn.clicked.connect(self._start)
+        control_layout.addWidget(self.compare_btn)
+        self.stop_btn = QPushButton("停止", self)
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(lambda: self._stop())
+        control_layout.addWidget(self.stop_btn)
+        self.status_label = QLabel("", self)
+        control_layout.addWidget(self.status_label, 1)
+        layout.addLayout(control_layout)
+
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+
+        splitter = QSplitter(Qt.Horizontal, self)
+        self.views = [HexView(splitter), HexView(splitter)]
+        for view in self.views:
+            splitter.addWidget(view)
+        layout.addWidget(splitter, 1)
+
+        # 两个视图的滚动条互相跟随
+        first, second = self.views
+        first.verticalScrollBar().valueChanged.connect(lambda: self._sync(first, second))
+        second.verticalScrollBar().valueChanged.connect(lambda: self._sync(second, first))
+        first.horizontalScrollBar().valueChanged.connect(lambda: self._sync(first, second))
+        second.horizontalScrollBar().valueChanged.connect(lambda: self._sync(second, first))
+
+        self.range_list = QListWidget(self)
+        self.range_list.setMaximumHeight(180)
+        self.range_list.currentRowChanged.connect(self._jump_to_range)
+        layout.addWidget(self.range_list)
+
+        if path:
+            try:
+                self.open_file(0, path)
+            except Exception as e:
+                QMessageBox.warning(self, "错误", f"打开文件失败：{str(e)}")
+
+    def _select_file(self, index: int):
+        file_path, _ = QFileDialog.getOpenFileName(self, "选择文件", "", "所有文件 (*.*)")
+        if not file_path:
+            return
+        try:
+            self.open_file(index, file_path)
+        except Exception as e:
+            QMessageBox.warning(self, "错误", f"打开文件失败：{str(e)}")
+
+    def open_file(self, index: int, path: str):
+        """以只读 mmap 打开第 index 个文件，替换原来的映射"""
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._stop(wait=True)
+        self._clear_results()
+        self.views[index].set_data(mapped)
+        self._close_data(index)
+        self._data[index] = mapped
+        self._paths[index] = path
+        name = "文件 A" if index == 0 else "文件 B"
+        self.file_labels[index].setText(f"{name}: {os.path.basename(path)}（{size} 字节）")
+
+    def _close_data(self, index: int):
+        if isinstance(self._data[index], mmap.mmap):
+            self._data[index].close()
+        self._data[index] = b""
+
+    def _clear_results(self):
+        self._ranges = []
+        self.range_list.clear()
+        self.status_label.setText("")
+        for view in self.views:
+            view.set_marks(None)
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        if None in self._paths:
+            QMessageBox.warning(self, "警告", "请先选择两个文件")
+            return
+        self._clear_results()
+        self.compare_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.status_label.setText("对比中…")
+
+        self._thread = DiffThread(self._data[0], self._data[1], self.gap_spin.value())
+        self._thread.ranges_signal.connect(self._add_ranges)
+        self._thread.progress_signal.connect(self.progress_bar.setValue)
+        self._thread.finished_signal.connect(self._on_finished)
+        self._thread.error_signal.connect(self._on_error)
+        self._thread.start()
+
+    def _stop(self, wait: bool = False):
+        if self._thread is None:
+            return
+        self._thread.stop()
+        if wait:
+            self._thread.wait()
+            self._reset()
+            self.status_label.setText("已停止")
+
+    def _reset(self):
+        self.compare_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        self.progress_bar.setVisible(False)
+        self._thread = None
+
+    def _add_ranges(self, ranges):
+        # 线程已被取代时丢弃
+        if self._thread is None:
+            return
+        common = min(len(self._data[0]), len(self._data[1]))
+        texts = []
+        for start, end in ranges:
+            text = f"0x{start:08X} - 0x{end - 1:08X}  {end - start} 字节"
+            if start >= common:
+                text += "（仅文件 A 有）" if len(self._data[0]) > common else "（仅文件 B 有）"
+            texts.append(text)
+        # 列表的行号即区间在 self._ranges 中的下标
+        self.range_list.addItems(texts)
+        self._ranges.extend(ranges)
+        # 只追加新的一批，避免每批都重建整个标记列表
+        for view in self.views:
+            view.add_marks(ranges)
+
+    def _on_finished(self, result):
+        if self._thread is None:
+            return
+        self._reset()
+        sizes = [len(data) for data in self._data]
+        if not result['ranges']:
+            text = "两个文件相同" if not result['stopped'] else "已停止，未发现差异"
+        else:
+            text = f"{len(result['ranges'])} 处差异，{result['bytes']} 个字节不同"
+            if sizes[0] != sizes[1]:
+                text += f"，长度相差 {abs(sizes[0] - sizes[1])} 字节"
+            if result['truncated']:
+                text += f"（仅列出前 {MAX_RANGES} 处）"
+            if result['stopped']:
+                text = "已停止，" + text
+        self.status_label.setText(text)
+        if self.range_list.count():
+            self.range_list.setCurrentRow(0)
+
+    def _on_error(self, message):
+        self._reset()
+        self.status_label.setText("")
+        QMessageBox.warning(self, "错误", f"对比失败: {message}")
+
+    def _jump_to_range(self, row):
+        if not 0 <= row < len(self._ranges):
+            return
+        start, end = self._ranges[row]
+        for view, data in zip(self.views, self._data):
+            if start < len(data):
+                view.scroll_to_offset(start, min(end, len(data)) - start)
+            else:
+                view.highlight = None
+                view.set_top_row(start // view.bytes_per_line)
+
+    def _sync(self, source, target):
+        if self._syncing:
+            return
+        self._syncing = True
+        target.set_top_row(source.top_row())
+        target.horizontalScrollBar().setValue(source.horizontalScrollBar().value())
+        self._syncing = False
+
+    def done(self, result):
+        # 非模态对话框按 Esc 时只调用 reject()，不经过 closeEvent；关闭窗口也会走到这里
+        self._stop(wait=True)
+        for index, view in enumerate(self.views):
+            view.set_data(b"")
+            self._close_data(index)
+        self._paths = [None, None]
+        super().done(result)
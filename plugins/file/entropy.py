@@ -0,0 +1,274 @@
+"""分块熵与字节频率
+
+文件按块计算香农熵（比特/字节，0~8），压缩或加密的数据接近 8，文本和代码明显更低。
+直接在 mmap 上取 np.frombuffer 视图，按 (块数, 块大小) 重塑，每个字节加上「块号 × 256」后一次
+np.bincount 得到所有块的直方图；熵按「计数 -> -p·log2 p」的查表求和，没有逐块的 Python 循环。
+各段在线程池中并行（numpy 运算释放 GIL）。
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from PySide6.QtWidgets import QWidget
+from PySide6.QtGui import QPainter, QColor, QImage
+from PySide6.QtCore import Qt, QThread, Signal
+import os
+import numpy as np
+
+BLOCK_SIZES = {
+    "256 B": 256,
+    "4 KB": 4096,
+}
+
+# 每个任务处理的字节数（块大小的整数倍）
+SEGMENT_BYTES = 1 << 22
+
+
+@lru_cache(maxsize=8)
+def _entropy_terms(block_size: int) -> np.ndarray:
+    """计数 c（0..block_size）对应的 -p·log2(p)，p = c / block_size"""
+    counts = np.arange(block_size + 1, dtype=np.float64)
+    p = counts / block_size
+    terms = np.zeros(block_size + 1, dtype=np.float64)
+    terms[1:] = -p[1:] * np.log2(p[1:])
+    terms.flags.writeable = False
+    return terms
+
+
+def block_histograms(values: np.ndarray, block_size: int) -> np.ndarray:
+    """(块数 × 块大小) 个字节 -> (块数, 256) 的计数"""
+    blocks = len(values) // block_size
+    index = values[:blocks * block_size].reshape(blocks, block_size).astype(np.int32)
+    index += (np.arange(blocks, dtype=np.int32) * 256)[:, None]
+    return np.bincount(index.ravel(), minlength=blocks * 256).reshape(blocks, 256)
+
+
+def block_entropy(counts: np.ndarray, block_size: int) -> np.ndarray:
+    """按行计算熵，counts 的每行总和为 block_size"""
+    return np.take(_entropy_terms(block_size), counts).sum(axis=-1)
+
+
+def histogram_entropy(histogram: np.ndarray) -> float:
+    """单个直方图的熵（总数任意，用于不足一块的尾部和整个文件）"""
+    total = histogram.sum()
+    if not total:
+        return 0.0
+    p = histogram[histogram > 0] / total
+    return float(-(p * np.log2(p)).sum())
+
+
+def _segment(buffer, start: int, end: int, block_size: int):
+    values = np.frombuffer(buffer, dtype=np.uint8, count=end - start, offset=start)
+    counts = block_histograms(values, block_size)
+    entropy = block_entropy(counts, block_size).astype(np.float32)
+    histogram = counts.sum(axis=0)
+
+    # 最后不足一块的部分单独计算
+    tail = values[len(counts) * block_size:]
+    if len(tail):
+        tail_counts = np.bincount(tail, minlength=256)
+        entropy = np.append(entropy, np.float32(histogram_entropy(tail_counts)))
+        histogram = histogram + tail_counts
+    return entropy, histogram
+
+
+def analyze(buffer, block_size: int = 4096, workers: int = None, progress=None,
+            should_stop=None) -> dict:
+    """返回 {'block_size', 'entropy': 每块的熵, 'histogram': 256 项字节计数, 'total': 整体熵}"""
+    size = len(buffer)
+    segment = max(block_size, SEGMENT_BYTES // block_size * block_size)
+    starts = list(range(0, size, segment))
+    entropies = []
+    histogram = np.zeros(256, dtype=np.int64)
+
+    workers = workers or min(8, os.cpu_count() or 1)
+    window = 2 * workers  # 每批提交的段数，限制临时数组占用的内存
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for first in range(0, len(starts), window):
+            if should_stop is not None and should_stop():
+                break
+            futures = [executor.submit(_segment, buffer, start, min(start + segment, size), block_size)
+                       for start in starts[first:first + window]]
+            # 按提交顺序取结果，保证各块的熵按偏移排列
+            for future in futures:
+                entropy, counts = future.result()
+                entropies.append(entropy)
+                histogram += counts
+            if progress is not None:
+                done = min(size, starts[min(first + window, len(starts)) - 1] + segment)
+                progress(int(done * 100 / max(1, size)))
+
+    return {
+        'block_size': block_size,
+        'entropy': np.concatenate(entropies) if entropies else np.zeros(0, dtype=np.float32),
+        'histogram': histogram,
+        'total': histogram_entropy(histogram),
+    }
+
+
+class EntropyThread(QThread):
+    progress_signal = Signal(int)  # 进度信号
+    finished_signal = Signal(object)  # 完成信号，传递 analyze 的结果
+    error_signal = Signal(str)  # 错误信号
+
+    def __init__(self, data, block_size):
+        super().__init__()
+        self.data = data
+        self.block_size = block_size
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+
+    def run(self):
+        try:
+            result = analyze(self.data, self.block_size, progress=self.progress_signal.emit,
+                             should_stop=lambda: self._stop)
+            if not self._stop:
+                self.finished_signal.emit(result)
+        except Exception as e:
+            self.error_signal.emit(str(e))
+
+
+def _colors(values: np.ndarray) -> np.ndarray:
+    """熵 0~8 映射为蓝 -> 绿 -> 红，返回 (n, 3) uint8"""
+    t = np.clip(values / 8.0, 0.0, 1.0)[:, None]
+    low = np.array([[66, 133, 244]], dtype=np.float32)
+    middle = np.array([[52, 199, 89]], dtype=np.float32)
+    high = np.array([[255, 59, 48]], dtype=np.float32)
+    color = np.where(t < 0.5, low + (middle - low) * (t * 2), middle + (high - middle) * (t * 2 - 1))
+    return color.astype(np.uint8)
+
+
+def _to_qimage(array: np.ndarray) -> QImage:
+    height, width = array.shape[:2]
+    return QImage(array.tobytes(), width, height, width * 3, QImage.Format_RGB888).copy()
+
+
+class EntropyStrip(QWidget):
+    """竖直的熵条：自上而下对应文件偏移，条长为该区域块熵的平均值，单击跳转"""
+
+    offset_clicked = Signal(object)  # 点击位置对应的文件偏移
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumWidth(80)
+        self.setMouseTracking(True)
+        self.setCursor(Qt.PointingHandCursor)
+        self.entropy = None
+        self.block_size = 4096
+        self.size = 0
+        self.view_range = None  # 十六进制视图当前可见的 (起始, 结束) 偏移
+        self.message = ""
+        self._image = None
+
+    def set_result(self, result, size: int):
+        self.entropy = None if result is None else result['entropy']
+        self.block_size = 4096 if result is None else result['block_size']
+        self.size = size
+        self._image = None
+        self.update()
+
+    def set_message(self, text: str):
+        self.message = text
+        self.update()
+
+    def set_view_range(self, start: int, end: int):
+        self.view_range = (start, end)
+        self.update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._image = None
+
+    def _render(self) -> QImage:
+        """按控件高度聚合各块的熵，用 numpy 生成整幅位图"""
+        width, height = self.width(), self.height()
+        blocks = len(self.entropy)
+        if blocks >= height:
+            edges = np.linspace(0, blocks, height + 1).astype(np.int64)
+            rows = np.add.reduceat(self.entropy, edges[:-1]) / np.diff(edges)
+        else:
+            rows = self.entropy[np.arange(height) * blocks // height]
+        lengths = (rows / 8.0 * width).astype(np.int64)
+        mask = np.arange(width)[None, :] < lengths[:, None]
+        image = np.full((height, width, 3), 245, dtype=np.uint8)
+        image[mask] = np.repeat(_colors(rows), lengths, axis=0)
+        return _to_qimage(image)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#F5F5F5"))
+        if self.entropy is None or not len(self.entropy) or self.size == 0:
+            painter.drawText(self.rect(), Qt.AlignCenter | Qt.TextWordWrap, self.message)
+            painter.end()
+            return
+        if self._image is None:
+            self._image = self._render()
+        painter.drawImage(0, 0, self._image)
+        if self.view_range is not None:
+            top = int(self.view_range[0] / self.size * self.height())
+            bottom = int(self.view_range[1] / self.size * self.height())
+            painter.setPen(QColor("#000000"))
+            painter.drawRect(0, top, self.width() - 1, max(2, bottom - top))
+        painter.end()
+
+    def mousePressEvent(self, event):
+        if self.entropy is None or not len(self.entropy):
+            return
+        block = self.block_at(event.position().y())
+        self.offset_clicked.emit(min(block * self.block_size, self.size - 1))
+
+    def block_at(self, y: float) -> int:
+        fraction = min(max(y / max(1, self.height()), 0.0), 1.0)
+        return min(int(fraction * len(self.entropy)), len(self.entropy) - 1)
+
+    def mouseMoveEvent(self, event):
+        if self.entropy is None or not len(self.entropy):
+            return
+        block = self.block_at(event.position().y())
+        self.setToolTip(f"偏移 0x{block * self.block_size:X}，熵 {self.entropy[block]:.3f}")
+
+
+class ByteHistogram(QWidget):
+    """字节 0x00~0xFF 的出现频率（对数刻度）"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(90)
+        self.setMouseTracking(True)
+        self.histogram = None
+        self._image = None
+
+    def set_histogram(self, histogram):
+        self.histogram = histogram
+        self._image = None
+        self.update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._image = None
+
+    def _render(self) -> QImage:
+        width, height = self.width(), self.height()
+        scaled = np.log1p(self.histogram.astype(np.float64))
+        peak = scaled.max() or 1.0
+        columns = np.arange(width) * 256 // max(1, width)
+        heights = (scaled[columns] / peak * height).astype(np.int64)
+        mask = np.arange(height)[::-1][:, None] < heights[None, :]
+        image = np.full((height, width, 3), 245, dtype=np.uint8)
+        image[mask] = (90, 86, 214)
+        return _to_qimage(image)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#F5F5F5"))
+        if self.histogram is not None and self.histogram.any():
+            if self._image is None:
+                self._image = self._render()
+            painter.drawImage(0, 0, self._image)
+        painter.end()
+
+    def mouseMoveEvent(self, event):
+        if self.histogram is None:
+            return
+        value = min(255, int(event.position().x() / max(1, self.width()) * 256))
+        self.setToolTip(f"0x{value:02X}：{int(self.histogram[value])} 次")
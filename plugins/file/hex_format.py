@@ -0,0 +1,160 @@
+"""十六进制转储格式化
+
+所有十六进制视图共用。一段连续的行一次性生成：按版式预先算好每一列的字符位置，
+用一个 (行数, 行宽) 的字节矩阵填入模板（空格、分隔符、换行），再用 256 项的
+十六进制高/低位表和 ASCII 表一次 np.take 写入所有字节列，没有逐字节的 Python 循环。
+不满一行的最后一行补齐后同样生成，再把多出的列改回空格。
+
+版式：
+    classic    本工具原有格式：大写，单空格分隔，|ASCII|
+    xxd        00000000: 4865 6c6c 6f20 776f  Hello wo
+    canonical  hexdump -C：00000000  48 65 6c 6c 6f 20 77 6f  72 6c 64 0a  |Hello world.|
+               （可以任意截取行区间，因此不合并重复行为 '*'）
+"""
+import numpy as np
+
+LAYOUTS = {
+    "默认": 'classic',
+    "xxd": 'xxd',
+    "hexdump -C": 'canonical',
+}
+
+# 每次生成的最大行数，限制临时矩阵的大小
+BLOCK_ROWS = 1 << 16
+
+_DIGITS_UPPER = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+_DIGITS_LOWER = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+# 不可打印字节显示为 '.'
+ASCII_TABLE = bytes(b if 32 <= b <= 126 else ord('.') for b in range(256))
+_ASCII = np.frombuffer(ASCII_TABLE, dtype=np.uint8)
+
+_SPACE, _NEWLINE, _BAR = ord(' '), ord('\n'), ord('|')
+
+
+class HexFormat:
+    def __init__(self, layout: str = 'classic', bytes_per_line: int = 16, offset_digits: int = 8):
+        if layout not in LAYOUTS.values():
+            raise ValueError(f"不支持的版式: {layout}")
+        self.layout = layout
+        self.bytes_per_line = bytes_per_line
+        self.offset_digits = offset_digits
+        self.uppercase = layout == 'classic'
+
+        columns = np.arange(bytes_per_line)
+        if layout == 'xxd':
+            # "偏移: " 之后每 2 字节一组，组间一个空格，十六进制区与 ASCII 区之间两个空格
+            first = offset_digits + 2
+            self.hex_positions = first + columns * 2 + columns // 2
+            self.ascii_start = first + bytes_per_line * 2 + (bytes_per_line - 1) // 2 + 2
+            self.bars = False
+        else:
+            # "偏移  " 之后每字节 "xx "；hexdump -C 每 8 字节多一个空格
+            first = offset_digits + 2
+            gap = columns // 8 if layout == 'canonical' else 0
+            self.hex_positions = first + columns * 3 + gap
+            self.ascii_start = int(self.hex_positions[-1]) + 2 + 2 + 1
+            self.bars = True
+        self.line_length = self.ascii_start + bytes_per_line + (1 if self.bars else 0)
+
+        # 整行模板：空格、分隔符和行尾换行
+        template = np.full(self.line_length + 1, _SPACE, dtype=np.uint8)
+        if layout == 'xxd':
+            template[offset_digits] = ord(':')
+        if self.bars:
+            template[self.ascii_start - 1] = _BAR
+            template[self.line_length - 1] = _BAR
+        template[-1] = _NEWLINE
+        self._template = template
+
+        digits = _DIGITS_UPPER if self.uppercase else _DIGITS_LOWER
+        self._digits = digits
+        self._high = np.take(digits, np.arange(256) >> 4)
+        self._low = np.take(digits, np.arange(256) & 15)
+        self._shifts = np.arange(offset_digits - 1, -1, -1, dtype=np.uint64) * 4
+
+    # ---- 列位置，供视图定位和高亮 ----
+
+    def hex_column(self, index: int) -> int:
+        """行内第 index 个字节十六进制的起始字符位置"""
+        return int(self.hex_positions[index])
+
+    def ascii_column(self, index: int) -> int:
+        """行内第 index 个字节在 ASCII 区的字符位置"""
+        return self.ascii_start + index
+
+    def header(self) -> str:
+        """列标题：每个字节列上方标出行内偏移"""
+        line = [' '] * self.line_length
+        line[:6] = "Offset"
+        for index in range(self.bytes_per_line):
+            position = self.hex_column(index)
+            line[position:position + 2] = f"{index:02X}" if self.uppercase else f"{index:02x}"
+        title = "|ASCII|" if self.bars else "ASCII"
+        start = self.ascii_start - (1 if self.bars else 0)
+        line[start:start + len(title)] = title
+        return "".join(line).rstrip()
+
+    # ---- 格式化 ----
+
+    def format_rows(self, data, first_row: int, count: int, base: int = 0) -> bytes:
+        """格式化 data 中第 first_row 行起的 count 行，每行以换行结尾
+
+        data 为 bytes、bytearray 或 mmap；base 为 data 开头对应的显示偏移。
+        """
+        width = self.bytes_per_line
+        start = first_row * width
+        chunk = bytes(data[start:start + count * width])
+        full = len(chunk) // width
+        parts = []
+        for row in range(0, full, BLOCK_ROWS):
+            rows = min(BLOCK_ROWS, full - row)
+            block = chunk[row * width:(row + rows) * width]
+            parts.append(self._format_block(block, rows, base + start + row * width))
+        if len(chunk) % width:
+            parts.append(self._format_partial(chunk[full * width:], base + start + full * width))
+        return b"".join(parts)
+
+    def _format_block(self, block: bytes, rows: int, offset: int) -> bytes:
+        width = self.bytes_per_line
+        values = np.frombuffer(block, dtype=np.uint8).reshape(rows, width)
+        matrix = np.empty((rows, self.line_length + 1), dtype=np.uint8)
+        matrix[:] = self._template
+
+        offsets = np.arange(rows, dtype=np.uint64) * np.uint64(width) + np.uint64(offset)
+        nibbles = (offsets[:, None] >> self._shifts) & np.uint64(15)
+        matrix[:, :self.offset_digits] = np.take(self._digits, nibbles)
+        matrix[:, self.hex_positions] = np.take(self._high, values)
+        matrix[:, self.hex_positions + 1] = np.take(self._low, values)
+        matrix[:, self.ascii_start:self.ascii_start + width] = np.take(_ASCII, values)
+        return matrix.tobytes()
+
+    def _format_partial(self, chunk: bytes, offset: int) -> bytes:
+        """不满一行：补齐后按整行生成，十六进制区多出的位置改回空格，ASCII 区按实际长度截断"""
+        count = len(chunk)
+        line = np.frombuffer(self._format_block(chunk.ljust(self.bytes_per_line, b"\0"), 1, offset),
+                             dtype=np.uint8).copy()
+        unused = self.hex_positions[count:]
+        line[unused] = _SPACE
+        line[unused + 1] = _SPACE
+        tail = b"|\n" if self.bars else b"\n"
+        return line[:self.ascii_start + count].tobytes() + tail
+
+    def format_offset(self, offset: int) -> str:
+        text = f"{offset:0{self.offset_digits}X}" if self.uppercase else f"{offset:0{self.offset_digits}x}"
+        return text[-self.offset_digits:]
+
+    def row_count(self, size: int) -> int:
+        return -(-size // self.bytes_per_line)
+
+    def dump(self, data, base: int = 0) -> str:
+        """完整转储；hexdump -C 版式末尾附上总长度一行，与命令行输出一致"""
+        text = self.format_rows(data, 0, self.row_count(len(data)), base).decode('ascii')
+        if self.layout == 'canonical' and data:
+            text += self.format_offset(base + len(data)) + "\n"
+        return text
+
+
+def offset_digits_for(size: int) -> int:
+    """显示 size 字节的偏移所需的十六进制位数，至少 8 位"""
+    return max(8, len(f"{max(0, size - 1):x}"))
@@ -0,0 +1,173 @@
+"""十六进制视图的搜索
+
+直接在 mmap 上搜索：不含通配符的字节串用 mmap.find（memchr 级别的速度，不复制数据），
+通配符和正则用 re.search(缓冲区, pos, endpos)。忽略大小写的 ASCII 字符串先用 bytes.translate
+把整块的 A-Z 转成小写再 find，只改动 A-Z 字节，对 UTF-8 和 UTF-16LE 都是精确的；其余情况用正则。
+按块推进以便报告进度和取消；每块向后多看「模式最大长度 - 1」字节，只接受起点落在本块内的结果，
+跨块的匹配不会丢失也不会重复。正则的匹配若恰好结束在向后多看的窗口末尾，就加大窗口重新匹配，
+因此超过 REGEX_OVERLAP 的长匹配不会被截短，$、\\Z 和前瞻也不会在窗口末尾误判；
+但起点在块末尾附近、需要看过窗口末尾才能成立的匹配仍可能漏掉。
+"""
+import re
+
+MODES = {
+    "十六进制": 'hex',
+    "ASCII/UTF-8": 'text',
+    "UTF-16": 'utf16',
+    "正则": 'regex',
+}
+
+# 每块搜索的字节数
+CHUNK_BYTES = 1 << 24
+
+# 正则长度不固定，跨块时先向后多看的字节数（匹配到窗口末尾时再加大）
+REGEX_OVERLAP = 1 << 16
+
+# A-Z 转小写，其余字节不变
+_LOWER = bytes(b + 32 if 65 <= b <= 90 else b for b in range(256))
+
+
+def parse_hex(text: str) -> list:
+    """解析十六进制模式，'??' 为单字节通配符，返回字节值列表（通配符为 None）"""
+    digits = "".join(text.split()).replace("0x", "").replace("0X", "")
+    if not digits:
+        raise ValueError("请输入十六进制模式")
+    if len(digits) % 2:
+        raise ValueError("十六进制模式的位数必须是偶数")
+    values = []
+    for index in range(0, len(digits), 2):
+        pair = digits[index:index + 2]
+        if pair == "??":
+            values.append(None)
+            continue
+        try:
+            values.append(int(pair, 16))
+        except ValueError:
+            raise ValueError(f"无效的十六进制字节: {pair}") from None
+    if all(value is None for value in values):
+        raise ValueError("模式不能全是通配符")
+    return values
+
+
+def _case_insensitive(text: str, encoding: str) -> bytes:
+    """逐字符生成大小写两种编码的正则"""
+    parts = []
+    for char in text:
+        lower, upper = char.lower().encode(encoding), char.upper().encode(encoding)
+        if lower == upper:
+            parts.append(re.escape(lower))
+        else:
+            parts.append(b"(?:" + re.escape(lower) + b"|" + re.escape(upper) + b")")
+    return b"".join(parts)
+
+
+class SearchPattern:
+    """编译后的搜索模式：literal 不为空时用 find（fold 为真时先转小写），否则用正则"""
+
+    def __init__(self, text: str, mode: str, ignore_case: bool = False):
+        self.literal = None
+        self.regex = None
+        self.fold = False
+        if mode == 'hex':
+            values = parse_hex(text)
+            if None in values:
+                self.regex = re.compile(b"".join(
+                    b"." if value is None else re.escape(bytes([value])) for value in values
+                ), re.DOTALL)
+            else:
+                self.literal = bytes(values)
+            self.max_length = len(values)
+        elif mode in ('text', 'utf16'):
+            if not text:
+                raise ValueError("请输入要搜索的字符串")
+            encoding = 'utf-8' if mode == 'text' else 'utf-16-le'
+            if ignore_case and text.isascii():
+                self.literal = text.encode(encoding).translate(_LOWER)
+                self.fold = True
+                self.max_length = len(self.literal)
+            elif ignore_case:
+                self.regex = re.compile(_case_insensitive(text, encoding))
+                self.max_length = max(len(text.lower().encode(encoding)), len(text.upper().encode(encoding)))
+            else:
+                self.literal = text.encode(encoding)
+                self.max_length = len(self.literal)
+        elif mode == 'regex':
+            if not text:
+                raise ValueError("请输入正则表达式")
+            try:
+                self.regex = re.compile(text.encode('utf-8'), re.DOTALL | (re.IGNORECASE if ignore_case else 0))
+            except re.error as e:
+                raise ValueError(f"正则表达式错误: {e}") from None
+            self.max_length = REGEX_OVERLAP
+        else:
+            raise ValueError(f"不支持的搜索方式: {mode}")
+
+    def find_iter(self, buffer, start: int, end: int):
+        """生成起点在 [start, end) 内的 (偏移, 长度)"""
+        stop = min(len(buffer), end + self.max_length - 1)
+        if self.fold:
+            length = len(self.literal)
+            chunk = buffer[start:stop].translate(_LOWER)
+            position = chunk.find(self.literal)
+            while 0 <= position < end - start:
+                yield start + position, length
+                position = chunk.find(self.literal, position + 1)
+        elif self.literal is not None:
+            length = len(self.literal)
+            position = buffer.find(self.literal, start, stop)
+            while 0 <= position < end:
+                yield position, length
+                position = buffer.find(self.literal, position + 1, stop)
+        else:
+            position = start
+            while True:
+                match = self.regex.search(buffer, position, stop)
+                if match is None or match.start() >= end:
+                    break
+                offset = match.start()
+                # 匹配到了人为的窗口末尾：可能被截短，$、\Z 和前瞻也可能误判，加大窗口重新匹配
+                window = stop
+                while match is not None and match.end() == window < len(buffer):
+                    window = min(len(buffer), window + max(REGEX_OVERLAP, window - offset))
+                    match = self.regex.match(buffer, offset, window)
+                if match is None:
+                    position = offset + 1
+                    continue
+                # 空匹配没有意义
+                if match.end() > offset:
+                    yield offset, match.end() - offset
+                    position = match.end()
+                else:
+                    position = offset + 1
+
+
+def search(buffer, pattern: SearchPattern, start: int = 0, limit: int = None,
+           on_hits=None, progress=None, should_stop=None) -> int:
+    """按块搜索整个缓冲区，每块的结果以列表交给 on_hits，返回结果总数
+
+    正则结果跨块时，下一块从上一个结果的末尾接着搜，与整体 finditer 的结果一致。
+    """
+    size = len(buffer)
+    total = 0
+    last_end = 0
+    position = start
+    while position < size:
+        if should_stop is not None and should_stop():
+            break
+        end = min(position + CHUNK_BYTES, size)
+        begin = max(position, last_end) if pattern.regex is not None else position
+        hits = []
+        for offset, length in pattern.find_iter(buffer, begin, end) if begin < end else ():
+            hits.append((offset, length))
+            last_end = offset + length
+            if limit is not None and total + len(hits) >= limit:
+                break
+        total += len(hits)
+        if hits and on_hits is not None:
+            on_hits(hits)
+        if progress is not None:
+            progress(int((end - start) * 100 / max(1, size - start)))
+        if limit is not None and total >= limit:
+            break
+        position = end
+    return total
@@ -0,0 +1,209 @@
+"""虚拟化的十六进制视图
+
+只保存数据缓冲区（bytes 或 mmap）的引用，绘制时按滚动位置切出可见的几十行，
+交给 hex_format 一次格式化，内存占用与文件大小无关。行数超过滚动条的整数范围时按比例缩放滚动条。
+除单个高亮区间外，还可以标记一组有序的区间（如对比得到的差异），绘制时二分查找出可见的部分。
+"""
+import bisect
+from PySide6.QtWidgets import QAbstractScrollArea
+from PySide6.QtGui import QFont, QFontMetrics, QFontMetricsF, QPainter, QColor
+from PySide6.QtCore import Qt, QRectF
+
+from .hex_format import HexFormat, offset_digits_for
+
+# 滚动条取值上限（QScrollBar 为 32 位整数）
+SCROLL_LIMIT = (1 << 31) - 1
+
+
+class HexView(QAbstractScrollArea):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.data = b""
+        self.bytes_per_line = 16
+        self.layout = 'classic'
+        self.format = HexFormat(self.layout, self.bytes_per_line)
+        self.highlight = None  # (起始偏移, 长度)
+        self.marks = None  # ([起始...], [结束...])，按偏移排序且互不重叠
+        self._scale = 1  # 每个滚动条单位对应的行数
+
+        font = QFont("Courier New", 12)
+        font.setFixedPitch(True)
+        font.setStyleHint(QFont.Monospace)
+        self.setFont(font)
+        self.viewport().setStyleSheet("background-color: #FFFFFF;")
+        self.setStyleSheet("QAbstractScrollArea { border: 1px solid #CCCCCC; }")
+        self.verticalScrollBar().valueChanged.connect(self.viewport().update)
+        self.horizontalScrollBar().valueChanged.connect(self.viewport().update)
+
+    # ---- 数据与布局 ----
+
+    def set_data(self, data):
+        """设置数据缓冲区（bytes、bytearray 或 mmap），不复制"""
+        self.data = data
+        self.highlight = None
+        self.marks = None
+        self._update_format()
+        self._update_scrollbars()
+        self.verticalScrollBar().setValue(0)
+        self.viewport().update()
+
+    def set_bytes_per_line(self, count: int):
+        """修改每行字节数，保持当前首行的偏移可见"""
+        offset = self.top_row() * self.bytes_per_line
+        self.bytes_per_line = count
+        self._update_format()
+        self._update_scrollbars()
+        self._scroll_to_row(offset // count)
+        self.viewport().update()
+
+    def set_layout(self, layout: str):
+        """切换版式（classic / xxd / canonical）"""
+        self.layout = layout
+        self._update_format()
+        self._update_scrollbars()
+        self.viewport().update()
+
+    def set_marks(self, ranges):
+        """标记一组 [起始, 结束) 区间，须按起始排序且互不重叠；None 或空列表清除标记"""
+        self.marks = ([start for start, _ in ranges], [end for _, end in ranges]) if ranges else None
+        self.viewport().update()
+
+    def add_marks(self, ranges):
+        """在已有标记之后追加区间，ranges 须排在已有区间之后"""
+        if not ranges:
+            return
+        if self.marks is None:
+            self.marks = ([], [])
+        starts, ends = self.marks
+        starts.extend(start for start, _ in ranges)
+        ends.extend(end for _, end in ranges)
+        self.viewport().update()
+
+    def _update_format(self):
+        # 偏移列宽度随数据大小变化，超过 4GB 时加宽
+        self.format = HexFormat(self.layout, self.bytes_per_line, offset_digits_for(len(self.data)))
+
+    def row_count(self) -> int:
+        return -(-len(self.data) // self.bytes_per_line)
+
+    def visible_rows(self) -> int:
+        return max(1, self.viewport().height() // self._row_height() - 1)
+
+    def top_row(self) -> int:
+        return min(self.verticalScrollBar().value() * self._scale, max(0, self.row_count() - 1))
+
+    def scroll_to_offset(self, offset: int, length: int = 1):
+        """滚动到指定偏移并高亮 [offset, offset+length)"""
+        if not 0 <= offset < max(1, len(self.data)):
+            raise ValueError(f"偏移超出范围：0 ~ {max(0, len(self.data) - 1):X}")
+        self.highlight = (offset, max(1, length))
+        row = offset // self.bytes_per_line
+        top = self.top_row()
+        if not top <= row < top + self.visible_rows():
+            # 目标行放在可见区域的上部三分之一处
+            self._scroll_to_row(max(0, row - self.visible_rows() // 3))
+        self.viewport().update()
+
+    def set_top_row(self, row: int):
+        """滚动使第 row 行位于顶部，用于多个视图同步滚动"""
+        self._scroll_to_row(min(max(0, row), max(0, self.row_count() - 1)))
+
+    def _scroll_to_row(self, row: int):
+        self.verticalScrollBar().setValue(-(-row // self._scale) if self._scale > 1 else row)
+
+    def _row_height(self) -> int:
+        return QFontMetrics(self.font()).lineSpacing()
+
+    def _char_width(self) -> float:
+        # 等宽字体的字符宽度通常不是整数像素，按浮点累计才不会越往右偏差越大
+        return QFontMetricsF(self.font()).horizontalAdvance('0')
+
+    def _update_scrollbars(self):
+        rows = max(0, self.row_count() - self.visible_rows())
+        self._scale = max(1, -(-rows // SCROLL_LIMIT))
+        vertical = self.verticalScrollBar()
+        vertical.setRange(0, -(-rows // self._scale))
+        vertical.setPageStep(max(1, self.visible_rows() // self._scale))
+        vertical.setSingleStep(1)
+
+        horizontal = self.horizontalScrollBar()
+        text_width = int(self.format.line_length * self._char_width()) + 8
+        horizontal.setRange(0, max(0, text_width - self.viewport().width()))
+        horizontal.setPageStep(self.viewport().width())
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    # ---- 格式化与绘制 ----
+
+    def format_row(self, row: int) -> str:
+        return self.format.format_rows(self.data, row, 1).decode('ascii').rstrip("\n")
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.setFont(self.font())
+        row_height = self._row_height()
+        char_width = self._char_width()
+        width = self.viewport().width()
+        x = 4 - self.horizontalScrollBar().value()
+        text_width = int(self.format.line_length * char_width) + 8
+
+        top = self.top_row()
+        rows = max(0, min(self.visible_rows() + 1, self.row_count() - top))
+        if self.marks is not None:
+            self._paint_marks(painter, top, rows, x, char_width, row_height)
+        if self.highlight is not None:
+            for index in range(rows):
+                self._paint_highlight(painter, top + index, x, (index + 1) * row_height + 2,
+                                      char_width, row_height)
+
+        # 可见行拼成一段文本一次绘制
+        painter.setPen(QColor("#000000"))
+        text = self.format.format_rows(self.data, top, rows).decode('ascii').rstrip("\n")
+        painter.drawText(x, row_height + 2, text_width, rows * row_height,
+                         Qt.AlignLeft | Qt.AlignTop, text)
+
+        # 表头固定在顶部
+        painter.setPen(QColor("#8E8E93"))
+        painter.drawText(x, 0, text_width, row_height, Qt.AlignLeft | Qt.AlignTop, self.format.header())
+        painter.drawLine(0, row_height, width, row_height)
+        painter.end()
+
+    def _paint_highlight(self, painter, row, x, y, char_width, row_height):
+        """高亮当前行中落在 highlight 范围内的字节（十六进制列和 ASCII 列）"""
+        start, length = self.highlight
+        if not start // self.bytes_per_line <= row <= (start + length - 1) // self.bytes_per_line:
+            return
+        row_start = row * self.bytes_per_line
+        first = max(start, row_start) - row_start
+        last = min(start + length, row_start + self.bytes_per_line) - row_start
+        self._fill_columns(painter, first, last, x, y, char_width, row_height, QColor("#FFE08A"))
+
+    def _paint_marks(self, painter, top, rows, x, char_width, row_height):
+        """填充可见行中被标记的字节"""
+        starts, ends = self.marks
+        width = self.bytes_per_line
+        visible_start = top * width
+        visible_end = min(len(self.data), (top + rows) * width)
+        color = QColor("#FFB3B3")
+        index = bisect.bisect_right(ends, visible_start)
+        while index < len(starts) and starts[index] < visible_end:
+            position = max(starts[index], visible_start)
+            end = min(ends[index], visible_end)
+            # 区间跨行时逐行填充
+            while position < end:
+                row = position // width
+                row_end = min(end, (row + 1) * width)
+                self._fill_columns(painter, position - row * width, row_end - row * width, x,
+                                   (row - top + 1) * row_height + 2, char_width, row_height, color)
+                position = row_end
+            index += 1
+
+    def _fill_columns(self, painter, first, last, x, y, char_width, row_height, color):
+        """填充一行中第 first 到 last-1 个字节的十六进制列和 ASCII 列"""
+        hex_x = x + self.format.hex_column(first) * char_width
+        hex_width = self.format.hex_column(last - 1) + 2 - self.format.hex_column(first)
+        painter.fillRect(QRectF(hex_x, y, hex_width * char_width, row_height), color)
+        ascii_x = x + self.format.ascii_column(first) * char_width
+        painter.fillRect(QRectF(ascii_x, y, (last - first) * char_width, row_height), color)
@@ -1,14 +1,50 @@
 from plugins import Plugin
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTextEdit,
+    QWidget, QVBoxLayout, QHBoxLayout, QLineEdit,
     QPushButton, QFileDialog, QLabel, QSpinBox,
-    QScrollArea, QGroupBox
+    QGroupBox, QMessageBox, QComboBox, QCheckBox,
+    QProgressBar, QListWidget, QListWidgetItem
 )
-from PySide6.QtGui import QFont, QTextCursor
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QThread, Signal
+import mmap
 import os
 import style
 from style import FONTS
+from .hex_view import HexView
+from .hex_format import LAYOUTS
+from . import hex_search
+from .signatures import SignatureScanDialog
+from .binary_diff import BinaryDiffDialog
+from .entropy import EntropyThread, EntropyStrip, ByteHistogram, BLOCK_SIZES
+
+# 搜索结果的最大数量
+MAX_RESULTS = 10000
+
+class HexSearchThread(QThread):
+    hits_signal = Signal(list)  # 每块找到的 [(偏移, 长度), ...]
+    progress_signal = Signal(int)  # 进度信号
+    finished_signal = Signal(int, bool)  # 结果总数、是否被中止
+    error_signal = Signal(str)  # 错误信号
+
+    def __init__(self, data, pattern, start=0):
+        super().__init__()
+        self.data = data
+        self.pattern = pattern
+        self.start_offset = start
+        self._stopped = False
+
+    def stop(self):
+        self._stopped = True
+
+    def run(self):
+        try:
+            total = hex_search.search(self.data, self.pattern, self.start_offset, MAX_RESULTS,
+                                      on_hits=self.hits_signal.emit,
+                                      progress=self.progress_signal.emit,
+                                      should_stop=lambda: self._stopped)
+            self.finished_signal.emit(total, self._stopped)
+        except Exception as e:
+            self.error_signal.emit(str(e))
 
 class HexDumpPlugin(Plugin):
     name = "十六进制查看器"
@@ -22,6 +58,21 @@ class HexDumpPlugin(Plugin):
         self.hex_view = None
         self.file_label = None
         self.bytes_spin = None
+        self.jump_input = None
+        self.layout_combo = None
+        self.search_thread = None
+        self.search_mode = None
+        self.search_input = None
+        self.ignore_case_check = None
+        self.search_btn = None
+        self.search_progress = None
+        self.search_status = None
+        self.result_list = None
+        self.entropy_thread = None
+        self.entropy_strip = None
+        self.byte_histogram = None
+        self.entropy_label = None
+        self.block_combo = None
         self.bytes_per_line = 16
         
     def create_ui(self, parent: QWidget, layout: QVBoxLayout) -> None:
@@ -46,8 +97,18 @@ class HexDumpPlugin(Plugin):
         select_btn.setStyleSheet(f"font: {FONTS['body']};")
         select_btn.clicked.connect(self.select_file)
         
+        scan_btn = QPushButton("扫描签名", parent)
+        scan_btn.setStyleSheet(f"font: {FONTS['body']};")
+        scan_btn.clicked.connect(self.scan_signatures)
+        
         file_layout.addWidget(self.file_label)
         file_layout.addWidget(select_btn)
+        diff_btn = QPushButton("对比文件", parent)
+        diff_btn.setStyleSheet(f"font: {FONTS['body']};")
+        diff_btn.clicked.connect(self.compare_files)
+        
+        file_layout.addWidget(scan_btn)
+        file_layout.addWidget(diff_btn)
         file_layout.addStretch()
         
         # 每行字节数选择
@@ -65,6 +126,16 @@ class HexDumpPlugin(Plugin):
         
         bytes_layout.addWidget(bytes_label)
         bytes_layout.addWidget(self.bytes_spin)
+
+        # 显示版式
+        layout_label = QLabel("格式:", parent)
+        layout_label.setStyleSheet(f"font: {FONTS['body']};")
+        self.layout_combo = QComboBox(parent)
+        self.layout_combo.addItems(list(LAYOUTS.keys()))
+        self.layout_combo.setStyleSheet(f"font: {FONTS['body']};")
+        self.layout_combo.currentTextChanged.connect(self.update_layout)
+        bytes_layout.addWidget(layout_label)
+        bytes_layout.addWidget(self.layout_combo)
         bytes_layout.addStretch()
         
         # 添加到工具栏
@@ -72,35 +143,112 @@ class HexDumpPlugin(Plugin):
         toolbar.addLayout(bytes_layout)
         main_layout.addWidget(toolbar_group)
         
+        # 跳转到偏移
+        jump_layout = QHBoxLayout()
+        jump_label = QLabel("跳转到偏移:", parent)
+        jump_label.setStyleSheet(f"font: {FONTS['body']};")
+        self.jump_input = QLineEdit(parent)
+        self.jump_input.setPlaceholderText("0x1F00 或 7936")
+        self.jump_input.setToolTip("0x 前缀或含 A-F 时按十六进制解析，否则按十进制")
+        self.jump_input.setStyleSheet(f"font: {FONTS['body']};")
+        self.jump_input.setFixedWidth(160)
+        self.jump_input.returnPressed.connect(self.jump_to_offset)
+        jump_btn = QPushButton("跳转", parent)
+        jump_btn.setStyleSheet(f"font: {FONTS['body']};")
+        jump_btn.clicked.connect(self.jump_to_offset)
+
+        jump_layout.addWidget(jump_label)
+        jump_layout.addWidget(self.jump_input)
+        jump_layout.addWidget(jump_btn)
+        jump_layout.addStretch()
+        toolbar.addLayout(jump_layout)
+        
         # 创建十六进制显示组
         hex_group = QGroupBox("十六进制视图", parent)
         hex_group.setStyleSheet(style.get_group_box_style())
-        hex_layout = QVBoxLayout(hex_group)
-        
-        # 创建十六进制显示区域
-        scroll_area = QScrollArea(parent)
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        
-        self.hex_view = QTextEdit(parent)
-        self.hex_view.setReadOnly(True)
-        # 使用等宽字体
-        font = QFont("Courier New", 12)
-        font.setFixedPitch(True)
-        self.hex_view.setFont(font)
-        # 设置样式
-        self.hex_view.setStyleSheet("""
-            QTextEdit {
-                background-color: #FFFFFF;
-                color: #000000;
-                border: 1px solid #CCCCCC;
-            }
-        """)
-        
-        scroll_area.setWidget(self.hex_view)
-        hex_layout.addWidget(scroll_area)
+        hex_layout = QHBoxLayout(hex_group)
+        
+        # 只绘制可见行，文件通过 mmap 访问
+        self.hex_view = HexView(parent)
+        self.hex_view.setMinimumHeight(400)
+        self.hex_view.set_bytes_per_line(self.bytes_per_line)
+        self.hex_view.verticalScrollBar().valueChanged.connect(self.update_view_range)
+        hex_layout.addWidget(self.hex_view, 1)
+
+        # 右侧：分块熵条（单击跳转）和字节频率
+        side_layout = QVBoxLayout()
+        block_layout = QHBoxLayout()
+        block_label = QLabel("熵块大小:", parent)
+        block_label.setStyleSheet(f"font: {FONTS['body']};")
+        self.block_combo = QComboBox(parent)
+        self.block_combo.addItems(list(BLOCK_SIZES.keys()))
+        self.block_combo.setCurrentText("4 KB")
+        self.block_combo.setStyleSheet(f"font: {FONTS['body']};")
+        self.block_combo.currentTextChanged.connect(self.start_entropy)
+        block_layout.addWidget(block_label)
+        block_layout.addWidget(self.block_combo)
+        side_layout.addLayout(block_layout)
+
+        self.entropy_strip = EntropyStrip(parent)
+        self.entropy_strip.setFixedWidth(160)
+        self.entropy_strip.offset_clicked.connect(self.jump_to_block)
+        side_layout.addWidget(self.entropy_strip, 1)
+
+        self.entropy_label = QLabel("", parent)
+        self.entropy_label.setStyleSheet(f"font: {FONTS['body']};")
+        side_layout.addWidget(self.entropy_label)
+
+        self.byte_histogram = ByteHistogram(parent)
+        self.byte_histogram.setFixedWidth(160)
+        self.byte_histogram.setToolTip("字节 0x00 ~ 0xFF 的出现次数（对数刻度）")
+        side_layout.addWidget(self.byte_histogram)
+        hex_layout.addLayout(side_layout)
         main_layout.addWidget(hex_group)
+
+        # 搜索区域
+        search_group = QGroupBox("搜索", parent)
+        search_group.setStyleSheet(style.get_group_box_style())
+        search_layout = QVBoxLayout(search_group)
+
+        search_bar = QHBoxLayout()
+        self.search_mode = QComboBox(parent)
+        self.search_mode.addItems(list(hex_search.MODES.keys()))
+        self.search_mode.setStyleSheet(f"font: {FONTS['body']};")
+        self.search_input = QLineEdit(parent)
+        self.search_input.setPlaceholderText("十六进制如 4D 5A ?? 00（?? 为通配符），或字符串、正则")
+        self.search_input.setToolTip(
+            f"正则按块搜索，块末尾向后先看 {hex_search.REGEX_OVERLAP // 1024} KB：匹配到此处时会自动加大范围，"
+            "但起点在块末尾附近、要看得更远才能成立的匹配（如很长的定长模式或前瞻）可能漏掉")
+        self.search_input.setStyleSheet(f"font: {FONTS['body']};")
+        self.search_input.returnPressed.connect(self.toggle_search)
+        self.ignore_case_check = QCheckBox("忽略大小写", parent)
+        self.ignore_case_check.setStyleSheet(f"font: {FONTS['body']};")
+        self.search_btn = QPushButton("搜索", parent)
+        self.search_btn.setStyleSheet(f"font: {FONTS['body']};")
+        self.search_btn.clicked.connect(self.toggle_search)
+        search_bar.addWidget(self.search_mode)
+        search_bar.addWidget(self.search_input, 1)
+        search_bar.addWidget(self.ignore_case_check)
+        search_bar.addWidget(self.search_btn)
+        search_layout.addLayout(search_bar)
+
+        status_bar = QHBoxLayout()
+        self.search_progress = QProgressBar(parent)
+        self.search_progress.setRange(0, 100)
+        self.search_progress.setVisible(False)
+        self.search_status = QLabel("", parent)
+        self.search_status.setStyleSheet(f"font: {FONTS['body']};")
+        status_bar.addWidget(self.search_progress, 1)
+        status_bar.addWidget(self.search_status)
+        search_layout.addLayout(status_bar)
+
+        # 结果边搜边追加，单击跳转
+        self.result_list = QListWidget(parent)
+        self.result_list.setMaximumHeight(160)
+        self.result_list.setStyleSheet(f"font: {FONTS['mono']};")
+        self.result_list.currentItemChanged.connect(self.jump_to_result)
+        search_layout.addWidget(self.result_list)
+        main_layout.addWidget(search_group)
         
         # 添加到插件布局
         layout.addWidget(container)
@@ -116,68 +264,230 @@ class HexDumpPlugin(Plugin):
         
         if file_path:
             try:
-                with open(file_path, 'rb') as f:
-                    self.file_data = f.read()
-                self.current_file = file_path
-                self.file_label.setText(os.path.basename(file_path))
-                self.update_view()
+                self.open_file(file_path)
             except Exception as e:
-                self.hex_view.setText(f"错误：{str(e)}")
+                QMessageBox.warning(None, "错误", f"打开文件失败：{str(e)}")
+
+    def open_file(self, file_path: str):
+        """以只读 mmap 打开文件，不读入内存"""
+        size = os.path.getsize(file_path)
+        with open(file_path, 'rb') as f:
+            # 空文件无法映射
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.close_file()
+        self.file_data = mapped
+        self.current_file = file_path
+        self.file_label.setText(f"{os.path.basename(file_path)}（{size} 字节）")
+        self.hex_view.set_data(self.file_data)
+        self.start_entropy()
+
+    def close_file(self):
+        """释放当前文件的映射"""
+        # 搜索和熵计算线程持有映射的引用，先结束
+        self.stop_search(wait=True)
+        self.stop_entropy()
+        self.entropy_strip.set_result(None, 0)
+        self.entropy_strip.set_message("")
+        self.byte_histogram.set_histogram(None)
+        self.entropy_label.setText("")
+        self.result_list.clear()
+        self.search_status.setText("")
+        self.hex_view.set_data(b"")
+        if isinstance(self.file_data, mmap.mmap):
+            self.file_data.close()
+        self.file_data = None
+        self.current_file = None
+
+    def cleanup(self):
+        self.close_file()
     
     def update_view(self):
-        """更新十六进制视图"""
-        if not self.file_data:
-            return
-            
+        """每行字节数变化时重新布局，不重新读取文件"""
         self.bytes_per_line = self.bytes_spin.value()
-        hex_dump = []
-        
-        # 添加列标题
-        header = "Offset    "
-        # 添加十六进制列标题
-        for i in range(self.bytes_per_line):
-            header += f"{i:02X} "
-        # 补充空格使其与数据行对齐
-        header = header.ljust(self.bytes_per_line * 3 + 10)
-        header += "|ASCII字符|"
-        hex_dump.append(header)
-        hex_dump.append("-" * len(header))
-        
-        # 生成十六进制显示
-        for i in range(0, len(self.file_data), self.bytes_per_line):
-            # 获取当前行的字节
-            chunk = self.file_data[i:i+self.bytes_per_line]
-            
-            # 十六进制部分
-            hex_line = []
-            for b in chunk:
-                hex_line.append(f"{b:02X}")
-            
-            # ASCII部分
-            ascii_line = []
-            for b in chunk:
-                if 32 <= b <= 126:  # 可打印字符
-                    ascii_line.append(chr(b))
-                else:
-                    ascii_line.append('.')
-                    
-            # 格式化输出
-            offset = f"{i:08X}"
-            hex_part = " ".join(hex_line).ljust(self.bytes_per_line * 3 - 1)
-            ascii_part = "".join(ascii_line)
-            
-            hex_dump.append(f"{offset}  {hex_part}  |{ascii_part}|")
-            
-        self.hex_view.setText("\n".join(hex_dump))
+        self.hex_view.set_bytes_per_line(self.bytes_per_line)
+        self.update_view_range()
+
+    def update_layout(self, name: str):
+        """切换 默认 / xxd / hexdump -C 版式"""
+        self.hex_view.set_layout(LAYOUTS[name])
+
+    def jump_to_offset(self):
+        """跳转到输入的偏移并高亮该字节"""
+        text = self.jump_input.text().strip().lower()
+        if not text:
+            return
+        try:
+            if text.startswith('0x'):
+                offset = int(text[2:], 16)
+            elif text.isdigit():
+                offset = int(text)
+            else:
+                offset = int(text.rstrip('h'), 16)
+            self.hex_view.scroll_to_offset(offset)
+        except ValueError as e:
+            QMessageBox.warning(None, "警告", f"无效的偏移：{text}\n{e}")
     
+    def start_entropy(self, *args):
+        """在后台计算分块熵和字节频率，块大小变化时重新计算"""
+        self.stop_entropy()
+        self.entropy_strip.set_result(None, 0)
+        self.byte_histogram.set_histogram(None)
+        if not self.file_data:
+            return
+        self.entropy_strip.set_message("正在计算熵…")
+        self.entropy_label.setText("")
+        thread = EntropyThread(self.file_data, BLOCK_SIZES[self.block_combo.currentText()])
+        thread.progress_signal.connect(self.entropy_progress)
+        thread.finished_signal.connect(lambda result: self.entropy_finished(thread, result))
+        thread.error_signal.connect(self.entropy_error)
+        self.entropy_thread = thread
+        thread.start()
+
+    def stop_entropy(self):
+        if self.entropy_thread is None:
+            return
+        self.entropy_thread.stop()
+        self.entropy_thread.wait()
+        self.entropy_thread = None
+
+    def entropy_progress(self, value):
+        if self.entropy_thread is not None:
+            self.entropy_strip.set_message(f"正在计算熵… {value}%")
+
+    def entropy_finished(self, thread, result):
+        # 已被新的计算或关闭文件取代
+        if thread is not self.entropy_thread:
+            return
+        self.entropy_thread = None
+        self.entropy_strip.set_result(result, len(self.file_data))
+        self.byte_histogram.set_histogram(result['histogram'])
+        self.entropy_label.setText(f"整体熵: {result['total']:.4f} 比特/字节")
+        self.update_view_range()
+
+    def entropy_error(self, message):
+        self.entropy_thread = None
+        self.entropy_strip.set_message(f"熵计算失败：{message}")
+
+    def update_view_range(self, *args):
+        """在熵条上标出十六进制视图当前可见的范围"""
+        if not self.file_data:
+            return
+        start = self.hex_view.top_row() * self.bytes_per_line
+        end = min(len(self.file_data), start + self.hex_view.visible_rows() * self.bytes_per_line)
+        self.entropy_strip.set_view_range(start, end)
+
+    def jump_to_block(self, offset):
+        """单击熵条：跳转到对应块并高亮整块"""
+        length = min(self.entropy_strip.block_size, len(self.file_data) - offset)
+        self.hex_view.scroll_to_offset(offset, length)
+        self.update_view_range()
+
+    def scan_signatures(self):
+        """扫描嵌入的文件签名；打开的文件由子进程各自映射，文本输入直接扫描内存"""
+        if not self.file_data:
+            QMessageBox.warning(None, "警告", "请先打开文件")
+            return
+        source = self.current_file if self.current_file is not None else bytes(self.file_data)
+        dialog = SignatureScanDialog(source, self.hex_view.window())
+        dialog.offset_selected.connect(self.hex_view.scroll_to_offset)
+        dialog.show()
+
+    def compare_files(self):
+        """打开二进制对比窗口，当前文件作为文件 A"""
+        dialog = BinaryDiffDialog(self.current_file, self.hex_view.window())
+        dialog.show()
+
+    def toggle_search(self):
+        """开始搜索，正在搜索时停止"""
+        if self.search_thread is not None:
+            self.stop_search()
+            return
+        if not self.file_data:
+            QMessageBox.warning(None, "警告", "请先打开文件")
+            return
+        try:
+            pattern = hex_search.SearchPattern(
+                self.search_input.text(),
+                hex_search.MODES[self.search_mode.currentText()],
+                self.ignore_case_check.isChecked(),
+            )
+        except ValueError as e:
+            QMessageBox.warning(None, "警告", str(e))
+            return
+
+        self.result_list.clear()
+        self.search_status.setText("")
+        self.search_progress.setValue(0)
+        self.search_progress.setVisible(True)
+        self.search_btn.setText("停止")
+
+        self.search_thread = HexSearchThread(self.file_data, pattern)
+        self.search_thread.hits_signal.connect(self.add_results)
+        self.search_thread.progress_signal.connect(self.search_progress.setValue)
+        self.search_thread.finished_signal.connect(self.search_finished)
+        self.search_thread.error_signal.connect(self.search_error)
+        self.search_thread.start()
+
+    def stop_search(self, wait: bool = False):
+        if self.search_thread is None:
+            return
+        self.search_thread.stop()
+        if wait:
+            self.search_thread.wait()
+            self._reset_search()
+
+    def add_results(self, hits):
+        """追加一块的搜索结果"""
+        # 文件关闭后仍在队列中的结果直接丢弃
+        if self.search_thread is None:
+            return
+        data = self.file_data
+        for offset, length in hits:
+            preview = bytes(data[offset:offset + min(length, 16)]).hex(' ')
+            item = QListWidgetItem(f"{offset:08X}  {length:>6} 字节  {preview}")
+            item.setData(Qt.UserRole, (offset, length))
+            self.result_list.addItem(item)
+        self.search_status.setText(f"{self.result_list.count()} 个结果")
+        if self.result_list.count() == len(hits):
+            self.result_list.setCurrentRow(0)
+
+    def search_finished(self, total, stopped):
+        if self.search_thread is None:
+            return
+        self._reset_search()
+        if stopped:
+            text = f"已停止，{total} 个结果"
+        elif total >= MAX_RESULTS:
+            text = f"结果过多，仅显示前 {MAX_RESULTS} 个"
+        else:
+            text = f"共 {total} 个结果"
+        self.search_status.setText(text)
+
+    def search_error(self, message):
+        self._reset_search()
+        QMessageBox.warning(None, "错误", f"搜索失败：{message}")
+
+    def _reset_search(self):
+        self.search_thread = None
+        self.search_progress.setVisible(False)
+        self.search_btn.setText("搜索")
+
+    def jump_to_result(self, item, previous=None):
+        if item is None:
+            return
+        offset, length = item.data(Qt.UserRole)
+        self.hex_view.scroll_to_offset(offset, length)
+
     def process(self, text: str) -> str:
         """处理输入文本"""
         if not text:
             return ""
             
         try:
+            self.close_file()
             self.file_data = text.encode('utf-8')
-            self.update_view()
+            self.hex_view.set_data(self.file_data)
+            self.start_entropy()
             return ""
         except Exception as e:
             return f"错误: {str(e)}"
@@ -0,0 +1,574 @@
+"""嵌入文件的签名扫描与提取（类似 binwalk）
+
+所有文件头魔数合并为一个正则，在 mmap 上单遍扫描（正则引擎按首字节集合跳过不可能的位置）；
+命中后按各格式的头部结构校验（PNG 的 IHDR CRC、ZIP 本地文件头字段、ELF 头字段、gzip 实际解压……），
+并尽量算出对象的完整长度，用于提取到磁盘。
+大文件按块分发到进程池，每个子进程自己映射文件，只传回命中结果。
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                              QProgressBar, QTableWidget, QTableWidgetItem, QHeaderView,
+                              QAbstractItemView, QFileDialog, QMessageBox)
+from PySide6.QtCore import QThread, Signal
+import mmap
+import os
+import re
+import struct
+import zlib
+
+# 单个对象的最大长度，也是向后查找结束标记的范围
+MAX_CARVE = 1 << 28
+
+# 每个并行任务扫描的字节数
+CHUNK_BYTES = 1 << 26
+
+
+def _read(buffer, offset: int, count: int) -> bytes:
+    return bytes(buffer[offset:offset + count])
+
+
+def _limit(buffer, offset: int) -> int:
+    return min(len(buffer), offset + MAX_CARVE)
+
+
+# ---- 各格式的校验，返回 (长度或 None, 说明)，不是有效文件头时返回 None ----
+
+def _png(buffer, offset):
+    head = _read(buffer, offset, 33)
+    if len(head) < 33:
+        return None
+    length, kind = struct.unpack('>I4s', head[8:16])
+    if length != 13 or kind != b'IHDR':
+        return None
+    if zlib.crc32(head[12:29]) != struct.unpack('>I', head[29:33])[0]:
+        return None
+    width, height, depth, color = struct.unpack('>IIBB', head[16:26])
+
+    # 逐块跳到 IEND
+    size = None
+    position, limit = offset + 8, _limit(buffer, offset)
+    while position + 12 <= limit:
+        length, kind = struct.unpack('>I4s', _read(buffer, position, 8))
+        position += 12 + length
+        if kind == b'IEND':
+            size = position - offset
+            break
+        if not kind.isalpha():
+            break
+    return size, f"{width}×{height}，{depth} 位，颜色类型 {color}"
+
+
+# 紧跟 SOI 之后可能出现的标记
+_JPEG_FIRST = set(range(0xE0, 0xF0)) | {0xDB, 0xC4, 0xC0, 0xC2, 0xFE, 0xDD}
+
+
+def _jpeg(buffer, offset):
+    head = _read(buffer, offset, 4)
+    if len(head) < 4 or head[3] not in _JPEG_FIRST:
+        return None
+
+    size, info = None, ""
+    position, limit = offset + 2, _limit(buffer, offset)
+    while position + 4 <= limit:
+        marker, length = struct.unpack('>xBH', _read(buffer, position, 4))
+        if _read(buffer, position, 1) != b'\xff':
+            break
+        if marker == 0xD9:
+            size = position + 2 - offset
+            break
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:
+            position += 2
+            continue
+        if length < 2:
+            break
+        if marker in (0xC0, 0xC1, 0xC2, 0xC3) and not info:
+            height, width = struct.unpack('>HH', _read(buffer, position + 5, 4))
+            info = f"{width}×{height}" + ("，渐进式" if marker == 0xC2 else "")
+        position += 2 + length
+        if marker == 0xDA:
+            # 熵编码数据：跳过填充的 FF00 和 RST 标记，找到下一个真正的标记
+            while True:
+                position = buffer.find(b'\xff', position, limit)
+                if position < 0 or position + 1 >= limit:
+                    return None if not info else (None, info)
+                following = buffer[position + 1]
+                if following == 0 or 0xD0 <= following <= 0xD7 or following == 0xFF:
+                    position += 1
+                    continue
+                break
+    # 既没到 EOI 也没读到帧头，只是碰巧出现的 FF D8 FF
+    if size is None and not info:
+        return None
+    return size, info
+
+
+def _skip_sub_blocks(buffer, position: int, limit: int) -> int:
+    while position < limit:
+        count = buffer[position]
+        position += 1 + count
+        if count == 0:
+            return position
+    return -1
+
+
+def _gif(buffer, offset):
+    head = _read(buffer, offset, 13)
+    if len(head) < 13:
+        return None
+    width, height, flags = struct.unpack('<HHB', head[6:11])
+    if width == 0 or height == 0:
+        return None
+    info = f"{head[3:6].decode('ascii')}，{width}×{height}"
+
+    position, limit = offset + 13, _limit(buffer, offset)
+    if flags & 0x80:
+        position += 3 * (2 << (flags & 7))
+    frames = 0
+    while 0 <= position < limit:
+        block = buffer[position]
+        if block == 0x3B:
+            return position + 1 - offset, f"{info}，{frames} 帧"
+        if block == 0x21:
+            position = _skip_sub_blocks(buffer, position + 2, limit)
+        elif block == 0x2C:
+            local = _read(buffer, position + 9, 1)
+            if not local:
+                break
+            position += 10
+            if local[0] & 0x80:
+                position += 3 * (2 << (local[0] & 7))
+            position = _skip_sub_blocks(buffer, position + 1, limit)
+            frames += 1
+        else:
+            break
+    return None, info
+
+
+_ZIP_METHODS = {0: "存储", 8: "Deflate", 9: "Deflate64", 12: "BZIP2", 14: "LZMA",
+                93: "Zstandard", 95: "XZ", 98: "PPMd", 99: "AES"}
+
+
+def _zip(buffer, offset):
+    head = _read(buffer, offset, 30)
+    if len(head) < 30:
+        return None
+    version, flags, method, _, _, _, compressed, _, name_length, extra_length = \
+        struct.unpack('<HHHHHIIIHH', head[4:30])
+    if version > 100 or method not in _ZIP_METHODS or not 0 < name_length <= 1024:
+        return None
+    name = _read(buffer, offset + 30, name_length)
+    if len(name) < name_length or b'\x00' in name:
+        return None
+    # 未使用数据描述符时，压缩数据不能超出缓冲区
+    if not flags & 0x08 and offset + 30 + name_length + extra_length + compressed > len(buffer):
+        return None
+
+    info = f"{name.decode('utf-8', errors='replace')}，{_ZIP_METHODS[method]}"
+    end = buffer.find(b'PK\x05\x06', offset, _limit(buffer, offset))
+    if end < 0 or end + 22 > len(buffer):
+        return None, info
+    entries, comment_length = struct.unpack('<H8xH', _read(buffer, end + 10, 12))
+    return end + 22 + comment_length - offset, f"{info}，共 {entries} 项"
+
+
+_PDF_VERSION = re.compile(rb'%PDF-[12]\.\d')
+
+
+def _pdf(buffer, offset):
+    head = _read(buffer, offset, 8)
+    if not _PDF_VERSION.match(head):
+        return None
+    # 增量更新会有多个 %%EOF，取下一个 PDF 头之前的最后一个
+    limit = _limit(buffer, offset)
+    following = buffer.find(b'%PDF-', offset + 5, limit)
+    if following >= 0:
+        limit = following
+    size = None
+    position = buffer.find(b'%%EOF', offset, limit)
+    while position >= 0:
+        end = position + 5
+        for newline in (b'\r\n', b'\n', b'\r'):
+            if _read(buffer, end, len(newline)) == newline:
+                end += len(newline)
+                break
+        size = end - offset
+        position = buffer.find(b'%%EOF', position + 5, limit)
+    return size, f"版本 {head[5:8].decode('ascii')}"
+
+
+_ELF_TYPES = {1: "可重定位文件", 2: "可执行文件", 3: "共享库", 4: "core 转储"}
+_ELF_MACHINES = {3: "x86", 8: "MIPS", 20: "PowerPC", 40: "ARM", 62: "x86-64", 183: "AArch64",
+                 243: "RISC-V"}
+
+
+def _elf(buffer, offset):
+    head = _read(buffer, offset, 64)
+    if len(head) < 52:
+        return None
+    bits, order, version = head[4], head[5], head[6]
+    if bits not in (1, 2) or order not in (1, 2) or version != 1:
+        return None
+    endian = '<' if order == 1 else '>'
+    if bits == 1:
+        fields = struct.unpack(endian + 'HHI4xIIIHHHHHH', head[16:52])
+    elif len(head) == 64:
+        fields = struct.unpack(endian + 'HHI8xQQIHHHHHH', head[16:64])
+    else:
+        return None
+    kind, machine, _, ph_offset, sh_offset, _, header_size, ph_size, ph_count, sh_size, sh_count, _ = fields
+    if kind not in _ELF_TYPES or header_size < 52:
+        return None
+
+    # 长度取节头表末尾和各程序段末尾的最大值
+    size = max(header_size, sh_offset + sh_size * sh_count)
+    entry = '4xI4x4xI' if bits == 1 else '8xQ8x8xQ'
+    for index in range(min(ph_count, 4096)):
+        record = _read(buffer, offset + ph_offset + index * ph_size, struct.calcsize(endian + entry))
+        if len(record) < struct.calcsize(endian + entry):
+            break
+        segment_offset, segment_size = struct.unpack(endian + entry, record)
+        size = max(size, segment_offset + segment_size)
+    if size > len(buffer) - offset:
+        size = None
+    info = (f"{32 if bits == 1 else 64} 位，{'小端' if order == 1 else '大端'}，"
+            f"{_ELF_MACHINES.get(machine, f'机器 {machine}')}，{_ELF_TYPES[kind]}")
+    return size, info
+
+
+def _gzip(buffer, offset):
+    head = _read(buffer, offset, 10)
+    if len(head) < 10 or head[3] & 0xE0 or (head[9] > 13 and head[9] != 255):
+        return None
+    info = ""
+    if head[3] & 0x08:
+        # FNAME：原始文件名（可能在 FEXTRA 之后）
+        position = offset + 10
+        if head[3] & 0x04:
+            position += 2 + struct.unpack('<H', _read(buffer, position, 2).ljust(2, b'\0'))[0]
+        end = buffer.find(b'\x00', position, position + 1024)
+        if end > 0:
+            info = f"原文件名 {_read(buffer, position, end - position).decode('latin-1')}"
+
+    # 实际解压以校验并确定长度
+    decompressor = zlib.decompressobj(31)
+    position, limit = offset, _limit(buffer, offset)
+    try:
+        while position < limit and not decompressor.eof:
+            chunk = _read(buffer, position, min(1 << 20, limit - position))
+            decompressor.decompress(chunk, 1 << 16)
+            # 限制输出，只关心输入消耗了多少
+            while decompressor.unconsumed_tail and not decompressor.eof:
+                decompressor.decompress(decompressor.unconsumed_tail, 1 << 16)
+            position += len(chunk)
+    except zlib.error:
+        return None
+    if not decompressor.eof:
+        return (None, info) if position >= limit else None
+    return position - len(decompressor.unused_data) - offset, info
+
+
+_BMP_HEADERS = {12, 40, 52, 56, 108, 124}
+
+
+def _bmp(buffer, offset):
+    head = _read(buffer, offset, 30)
+    if len(head) < 30:
+        return None
+    size, reserved, pixels, header = struct.unpack('<IIII', head[2:18])
+    if reserved or header not in _BMP_HEADERS or not 14 + header <= pixels < size:
+        return None
+    if header == 12:
+        width, height, planes, depth = struct.unpack('<HHHH', head[18:26])
+    else:
+        width, height, planes, depth = struct.unpack('<iiHH', head[18:30])
+    if planes != 1 or depth not in (1, 4, 8, 16, 24, 32) or width <= 0 or height == 0:
+        return None
+    if size > len(buffer) - offset:
+        return None
+    return size, f"{width}×{abs(height)}，{depth} 位"
+
+
+# (名称, 魔数列表, 扩展名, 校验函数, 是否合并同类嵌套命中)
+SIGNATURES = [
+    ("PNG", [b'\x89PNG\r\n\x1a\n'], 'png', _png, False),
+    ("JPEG", [b'\xff\xd8\xff'], 'jpg', _jpeg, False),
+    ("GIF", [b'GIF87a', b'GIF89a'], 'gif', _gif, False),
+    ("ZIP", [b'PK\x03\x04'], 'zip', _zip, True),
+    ("PDF", [b'%PDF-'], 'pdf', _pdf, False),
+    ("ELF", [b'\x7fELF'], 'elf', _elf, False),
+    ("gzip", [b'\x1f\x8b\x08'], 'gz', _gzip, False),
+    ("BMP", [b'BM'], 'bmp', _bmp, False),
+]
+
+_BY_MAGIC = {magic: signature for signature in SIGNATURES for magic in signature[1]}
+_PATTERN = re.compile(b"|".join(re.escape(magic) for magic in
+                                sorted(_BY_MAGIC, key=len, reverse=True)))
+_OVERLAP = max(len(magic) for magic in _BY_MAGIC) - 1
+
+
+def scan_range(buffer, start: int, end: int) -> list:
+    """扫描起点在 [start, end) 内的签名，返回校验通过的命中"""
+    hits = []
+    stop = min(len(buffer), end + _OVERLAP)
+    for match in _PATTERN.finditer(buffer, start, stop):
+        offset = match.start()
+        if offset >= end:
+            break
+        name, _, extension, validate, _ = _BY_MAGIC[match.group()]
+        try:
+            result = validate(buffer, offset)
+        except (struct.error, IndexError, ValueError):
+            result = None
+        if result is None:
+            continue
+        size, info = result
+        hits.append({'offset': offset, 'name': name, 'extension': extension,
+                     'size': size, 'info': info})
+    return hits
+
+
+def merge_nested(hits: list) -> list:
+    """去掉落在同类对象内部的命中（例如 ZIP 中每个文件的本地文件头）"""
+    merging = {signature[0] for signature in SIGNATURES if signature[4]}
+    result = []
+    extents = {}
+    for hit in sorted(hits, key=lambda hit: hit['offset']):
+        name = hit['name']
+        if name in merging and hit['offset'] < extents.get(name, -1):
+            continue
+        if hit['size'] is not None:
+            extents[name] = max(extents.get(name, -1), hit['offset'] + hit['size'])
+        result.append(hit)
+    return result
+
+
+# 子进程中的 {路径: (文件对象, 映射)}
+_mapped = {}
+
+
+def _scan_file_range(path: str, start: int, end: int) -> list:
+    if path not in _mapped:
+        f = open(path, 'rb')
+        _mapped[path] = (f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    return scan_range(_mapped[path][1], start, end)
+
+
+def scan(buffer, progress=None, should_stop=None) -> list:
+    """扫描内存中的数据（bytes 或 mmap），单线程"""
+    hits = []
+    size = len(buffer)
+    for start in range(0, size, CHUNK_BYTES):
+        if should_stop is not None and should_stop():
+            break
+        hits.extend(scan_range(buffer, start, min(start + CHUNK_BYTES, size)))
+        if progress is not None:
+            progress(min(size, start + CHUNK_BYTES), size)
+    return merge_nested(hits)
+
+
+def scan_file(path: str, workers: int = None, progress=None, should_stop=None) -> list:
+    """按块并行扫描文件，每个子进程自己映射文件"""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    if size <= CHUNK_BYTES:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return scan(mapped, progress, should_stop)
+
+    starts = range(0, size, CHUNK_BYTES)
+    hits = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_scan_file_range, path, start, min(start + CHUNK_BYTES, size))
+                   for start in starts]
+        for done, future in enumerate(as_completed(futures)):
+            if should_stop is not None and should_stop():
+                for pending in futures:
+                    pending.cancel()
+                break
+            hits.extend(future.result())
+            if progress is not None:
+                progress(min(size, (done + 1) * CHUNK_BYTES), size)
+    return merge_nested(hits)
+
+
+def carve_size(buffer, hits: list, index: int) -> int:
+    """提取长度：未能确定长度时截到下一个命中或 MAX_CARVE"""
+    hit = hits[index]
+    if hit['size'] is not None:
+        return hit['size']
+    end = _limit(buffer, hit['offset'])
+    for following in hits[index + 1:]:
+        if following['offset'] > hit['offset']:
+            end = min(end, following['offset'])
+            break
+    return end - hit['offset']
+
+
+def carve(buffer, hits: list, indexes, output_dir: str) -> list:
+    """将选中的命中写入 output_dir，文件名为 偏移.扩展名，返回写出的路径"""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for index in indexes:
+        hit = hits[index]
+        size = carve_size(buffer, hits, index)
+        path = os.path.join(output_dir, f"{hit['offset']:08X}.{hit['extension']}")
+        with open(path, 'wb') as f:
+            for position in range(hit['offset'], hit['offset'] + size, 1 << 20):
+                f.write(buffer[position:min(position + (1 << 20), hit['offset'] + size)])
+        paths.append(path)
+    return paths
+
+
+class SignatureScanThread(QThread):
+    progress_signal = Signal(object, object)  # 进度信号 (已扫描字节, 总字节)
+    finished_signal = Signal(object)  # 完成信号，传递命中列表
+    error_signal = Signal(str)  # 错误信号
+
+    def __init__(self, source):
+        super().__init__()
+        self.source = source  # 文件路径或内存中的数据
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+
+    def run(self):
+        try:
+            if isinstance(self.source, str):
+                hits = scan_file(self.source, progress=self.progress_signal.emit,
+                                 should_stop=lambda: self._stop)
+            else:
+                hits = scan(self.source, progress=self.progress_signal.emit,
+                            should_stop=lambda: self._stop)
+            self.finished_signal.emit(hits)
+        except Exception as e:
+            self.error_signal.emit(str(e))
+
+
+class SignatureScanDialog(QDialog):
+    """签名扫描结果列表，双击跳转，可提取选中或全部对象"""
+
+    offset_selected = Signal(object, object)  # (偏移, 长度)
+
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("扫描签名")
+        self.setMinimumWidth(760)
+        self.setMinimumHeight(480)
+
+        self._source = source
+        self._hits = []
+        self._thread = None
+
+        layout = QVBoxLayout(self)
+
+        control_layout = QHBoxLayout()
+        self.status_label = QLabel("", self)
+        control_layout.addWidget(self.status_label, 1)
+        self.scan_btn = QPushButton("扫描", self)
+        self.scan_btn.clicked.connect(self._start)
+        control_layout.addWidget(self.scan_btn)
+        self.stop_btn = QPushButton("停止", self)
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self._stop)
+        control_layout.addWidget(self.stop_btn)
+        self.carve_selected_btn = QPushButton("提取选中", self)
+        self.carve_selected_btn.clicked.connect(lambda: self._carve(selected_only=True))
+        control_layout.addWidget(self.carve_selected_btn)
+        self.carve_all_btn = QPushButton("全部提取", self)
+        self.carve_all_btn.clicked.connect(lambda: self._carve(selected_only=False))
+        control_layout.addWidget(self.carve_all_btn)
+        layout.addLayout(control_layout)
+
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+
+        self.table = QTableWidget(0, 4, self)
+        self.table.setHorizontalHeaderLabels(["偏移", "类型", "大小", "说明"])
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.cellDoubleClicked.connect(self._on_double_clicked)
+        layout.addWidget(self.table)
+
+        self._start()
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        self.table.setRowCount(0)
+        self._hits = []
+        self.scan_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.status_label.setText("扫描中…")
+
+        self._thread = SignatureScanThread(self._source)
+        self._thread.progress_signal.connect(
+            lambda done, total: self.progress_bar.setValue(int(done * 1000 / max(1, total))))
+        self._thread.finished_signal.connect(self._on_finished)
+        self._thread.error_signal.connect(self._on_error)
+        self._thread.start()
+
+    def _stop(self):
+        if self._thread is not None:
+            self._thread.stop()
+
+    def _reset(self):
+        self.scan_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        self.progress_bar.setVisible(False)
+        self._thread = None
+
+    def _on_finished(self, hits):
+        self._hits = hits
+        self.table.setRowCount(len(hits))
+        for row, hit in enumerate(hits):
+            size = "未知" if hit['size'] is None else f"{hit['size']}"
+            for column, text in enumerate((f"0x{hit['offset']:08X}", hit['name'], size, hit['info'])):
+                self.table.setItem(row, column, QTableWidgetItem(text))
+        self.table.resizeColumnsToContents()
+        self.status_label.setText(f"找到 {len(hits)} 个对象")
+        self._reset()
+
+    def _on_error(self, message):
+        self._reset()
+        self.status_label.setText("")
+        QMessageBox.warning(self, "错误", f"扫描失败: {message}")
+
+    def _on_double_clicked(self, row, column):
+        hit = self._hits[row]
+        self.offset_selected.emit(hit['offset'], hit['size'] or 1)
+
+    def _carve(self, selected_only: bool):
+        if selected_only:
+            indexes = sorted({index.row() for index in self.table.selectionModel().selectedRows()})
+        else:
+            indexes = list(range(len(self._hits)))
+        if not indexes:
+            QMessageBox.warning(self, "警告", "没有可提取的对象")
+            return
+        output_dir = QFileDialog.getExistingDirectory(self, "选择输出目录")
+        if not output_dir:
+            return
+        try:
+            if isinstance(self._source, str):
+                with open(self._source, 'rb') as f, \
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    paths = carve(mapped, self._hits, indexes, output_dir)
+            else:
+                paths = carve(self._source, self._hits, indexes, output_dir)
+            QMessageBox.information(self, "成功", f"已提取 {len(paths)} 个文件到 {output_dir}")
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"提取失败：{str(e)}")
+
+    def done(self, result):
+        # 非模态对话框按 Esc 时只调用 reject()，不经过 closeEvent；关闭窗口也会走到这里
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread.wait()
+        super().done(result)
@@ -0,0 +1,369 @@
+"""字典匹配未知摘要
+
+根据十六进制摘要的长度找出可能的算法，用字典逐个尝试所有候选算法。
+字典以 mmap 访问，按换行对齐切成块分发到进程池，每个子进程自己映射文件。
+有前缀盐时每个算法只 update 一次前缀，之后每个口令从这个状态 copy() 继续，省去重复计算前缀。
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QPushButton, QLineEdit, QCheckBox,
+    QProgressBar, QListWidget, QListWidgetItem, QTextEdit, QFileDialog, QMessageBox
+)
+from PySide6.QtCore import Qt, QThread, Signal
+import mmap
+import os
+import time
+
+from style import FONTS
+from .hash_plugin import HashCalculator
+
+# 每个任务处理的字典字节数（按换行对齐）
+CHUNK_BYTES = 1 << 20
+
+# 每批提交给进程池的任务数 = workers × WINDOW，停止时最多再等这么多块
+WINDOW = 4
+
+
+@lru_cache(maxsize=None)
+def digest_lengths() -> dict:
+    """{算法: 十六进制摘要长度}，当前环境不支持的算法不在其中"""
+    lengths = {}
+    for algorithm in HashCalculator.ALGORITHMS:
+        try:
+            lengths[algorithm] = len(HashCalculator.hexdigest(algorithm, HashCalculator.new(algorithm)))
+        except ValueError:
+            continue
+    return lengths
+
+
+def parse_digest(text: str) -> bytes:
+    """规范化输入的十六进制摘要（忽略空白和大小写）"""
+    digits = "".join(text.split()).lower()
+    if digits.startswith("0x"):
+        digits = digits[2:]
+    if not digits:
+        raise ValueError("请输入要匹配的摘要")
+    try:
+        return bytes.fromhex(digits)
+    except ValueError:
+        raise ValueError("摘要必须是十六进制字符串") from None
+
+
+def candidate_algorithms(text: str) -> list:
+    """按摘要长度列出可能的算法"""
+    length = len(parse_digest(text)) * 2
+    return [algorithm for algorithm, size in digest_lengths().items() if size == length]
+
+
+def split_lines(buffer, chunk_bytes: int = CHUNK_BYTES) -> list:
+    """把字典切成 [(起始, 结束)]，每块在换行之后结束"""
+    size = len(buffer)
+    ranges = []
+    start = 0
+    while start < size:
+        end = buffer.find(b"\n", min(start + chunk_bytes, size) - 1)
+        end = size if end < 0 else end + 1
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def crack_range(buffer, start: int, end: int, algorithms: list, target: bytes,
+                prefix: bytes = b"", suffix: bytes = b"") -> tuple:
+    """尝试 buffer[start:end] 中的每一行，返回 ([(算法, 口令)], 尝试的口令数)"""
+    chunk = buffer[start:end]
+    words = chunk.split(b"\n")
+    if b"\r" in chunk:
+        words = [word.rstrip(b"\r") for word in words]
+    # 末尾换行之后的空串不是口令
+    if words and not words[-1]:
+        words.pop()
+
+    found = []
+    for algorithm in algorithms:
+        base = HashCalculator.new(algorithm)
+        if prefix:
+            base.update(prefix)
+        copy = base.copy
+        # SHAKE 的输出长度由摘要长度决定
+        shake = algorithm.startswith("SHAKE")
+        length = len(target)
+        for word in words:
+            h = copy()
+            h.update(word)
+            if suffix:
+                h.update(suffix)
+            if (h.digest(length) if shake else h.digest()) == target:
+                found.append((algorithm, word))
+    return found, len(words)
+
+
+# 子进程中的 {路径: (文件对象, 映射)}
+_mapped = {}
+
+
+def _crack_file_range(path: str, start: int, end: int, algorithms: list, target: bytes,
+                      prefix: bytes, suffix: bytes) -> tuple:
+    if path not in _mapped:
+        f = open(path, 'rb')
+        _mapped[path] = (f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    return crack_range(_mapped[path][1], start, end, algorithms, target, prefix, suffix)
+
+
+def crack_file(path: str, digest: str, algorithms: list = None, prefix: bytes = b"", suffix: bytes = b"",
+               stop_on_first: bool = True, workers: int = None, progress=None, should_stop=None) -> dict:
+    """用字典文件匹配摘要
+
+    algorithms 默认为按长度得到的全部候选。progress(已处理字节, 总字节, 已尝试口令数)。
+    返回 {'found': [(算法, 口令)], 'words': 已尝试口令数, 'stopped': 是否被中止}。
+    """
+    target = parse_digest(digest)
+    if algorithms is None:
+        algorithms = candidate_algorithms(digest)
+    if not algorithms:
+        raise ValueError(f"没有输出 {len(target) * 8} 位摘要的算法")
+
+    size = os.path.getsize(path)
+    found = []
+    words = 0
+    stopped = False
+    if size == 0:
+        return {'found': found, 'words': words, 'stopped': stopped}
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        ranges = split_lines(mapped)
+        # 只有一块时不必启动进程池
+        if len(ranges) == 1:
+            found, words = crack_range(mapped, 0, size, algorithms, target, prefix, suffix)
+            if progress is not None:
+                progress(size, size, words)
+            return {'found': found, 'words': words, 'stopped': stopped}
+
+    workers = workers or os.cpu_count() or 1
+    window = workers * WINDOW
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for first in range(0, len(ranges), window):
+            batch = ranges[first:first + window]
+            futures = {executor.submit(_crack_file_range, path, start, end, algorithms, target, prefix, suffix):
+                       end - start for start, end in batch}
+            for future in as_completed(futures):
+                if should_stop is not None and should_stop():
+                    stopped = True
+                    for pending in futures:
+                        pending.cancel()
+                    break
+                hits, count = future.result()
+                found.extend(hits)
+                words += count
+                done += futures[future]
+                if progress is not None:
+                    progress(done, size, words)
+            if stopped or (found and stop_on_first):
+                break
+    return {'found': found, 'words': words, 'stopped': stopped}
+
+
+class CrackThread(QThread):
+    progress_signal = Signal(object, object, object)  # 进度信号 (已处理字节, 总字节, 已尝试口令数)
+    finished_signal = Signal(object)  # 完成信号，传递 crack_file 的结果
+    error_signal = Signal(str)  # 错误信号
+
+    def __init__(self, path, digest, algorithms, prefix, suffix, stop_on_first):
+        super().__init__()
+        self.path = path
+        self.digest = digest
+        self.algorithms = algorithms
+        self.prefix = prefix
+        self.suffix = suffix
+        self.stop_on_first = stop_on_first
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+
+    def run(self):
+        try:
+            result = crack_file(self.path, self.digest, self.algorithms, self.prefix, self.suffix,
+                                self.stop_on_first, progress=self.progress_signal.emit,
+                                should_stop=lambda: self._stop)
+            self.finished_signal.emit(result)
+        except Exception as e:
+            self.error_signal.emit(str(e))
+
+
+def _show_word(word: bytes) -> str:
+    text = word.decode('utf-8', errors='replace')
+    return text if text.isprintable() else f"{text!r}（hex: {word.hex()}）"
+
+
+class CrackDialog(QDialog):
+    """输入摘要，自动列出候选算法，用字典逐个尝试"""
+
+    def __init__(self, digest="", parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("字典匹配")
+        self.setMinimumWidth(720)
+        self.setMinimumHeight(560)
+
+        self._thread = None
+        self._wordlist = None
+        self._started = 0.0
+        self._algorithm_count = 1
+
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+
+        self.digest_input = QLineEdit(self)
+        self.digest_input.setPlaceholderText("十六进制摘要，如 5f4dcc3b5aa765d61d8327deb882cf99")
+        self.digest_input.setStyleSheet(f"font: {FONTS['mono']};")
+        self.digest_input.textChanged.connect(self._update_candidates)
+        form.addRow("目标摘要:", self.digest_input)
+
+        wordlist_layout = QHBoxLayout()
+        self.wordlist_label = QLabel("未选择", self)
+        wordlist_btn = QPushButton("选择字典", self)
+        wordlist_btn.clicked.connect(self._select_wordlist)
+        wordlist_layout.addWidget(self.wordlist_label, 1)
+        wordlist_layout.addWidget(wordlist_btn)
+        form.addRow("字典文件:", wordlist_layout)
+
+        self.prefix_input = QLineEdit(self)
+        self.prefix_input.setPlaceholderText("可选，拼接在口令之前")
+        form.addRow("前缀盐:", self.prefix_input)
+        self.suffix_input = QLineEdit(self)
+        self.suffix_input.setPlaceholderText("可选，拼接在口令之后")
+        form.addRow("后缀盐:", self.suffix_input)
+        layout.addLayout(form)
+
+        layout.addWidget(QLabel("候选算法（按摘要长度）:", self))
+        self.algorithm_list = QListWidget(self)
+        self.algorithm_list.setMaximumHeight(120)
+        layout.addWidget(self.algorithm_list)
+
+        control_layout = QHBoxLayout()
+        self.first_check = QCheckBox("找到后停止", self)
+        self.first_check.setChecked(True)
+        control_layout.addWidget(self.first_check)
+        control_layout.addStretch()
+        self.start_btn = QPushButton("开始", self)
+        self.start_btn.clicked.connect(self._start)
+        self.stop_btn = QPushButton("停止", self)
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self._stop)
+        control_layout.addWidget(self.start_btn)
+        control_layout.addWidget(self.stop_btn)
+        layout.addLayout(control_layout)
+
+        status_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setVisible(False)
+        self.status_label = QLabel("", self)
+        status_layout.addWidget(self.progress_bar, 1)
+        status_layout.addWidget(self.status_label)
+        layout.addLayout(status_layout)
+
+        self.result_edit = QTextEdit(self)
+        self.result_edit.setReadOnly(True)
+        self.result_edit.setStyleSheet(f"font: {FONTS['mono']};")
+        layout.addWidget(self.result_edit, 1)
+
+        self.digest_input.setText(digest)
+
+    def _update_candidates(self, text):
+        self.algorithm_list.clear()
+        try:
+            algorithms = candidate_algorithms(text) if text.strip() else []
+        except ValueError:
+            algorithms = []
+        for algorithm in algorithms:
+            item = QListWidgetItem(algorithm)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+            self.algorithm_list.addItem(item)
+
+    def _select_wordlist(self):
+        path, _ = QFileDialog.getOpenFileName(self, "选择字典", "", "字典文件 (*.txt *.lst *.dic);;所有文件 (*.*)")
+        if path:
+            self._wordlist = path
+            self.wordlist_label.setText(f"{os.path.basename(path)}（{os.path.getsize(path)} 字节）")
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        try:
+            parse_digest(self.digest_input.text())
+        except ValueError as e:
+            QMessageBox.warning(self, "警告", str(e))
+            return
+        algorithms = [self.algorithm_list.item(row).text() for row in range(self.algorithm_list.count())
+                      if self.algorithm_list.item(row).checkState() == Qt.Checked]
+        if not algorithms:
+            QMessageBox.warning(self, "警告", "没有与摘要长度匹配的算法，或未勾选任何算法")
+            return
+        if self._wordlist is None:
+            QMessageBox.warning(self, "警告", "请先选择字典文件")
+            return
+
+        self.result_edit.clear()
+        self.start_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.status_label.setText("匹配中…")
+        self._started = time.perf_counter()
+        self._algorithm_count = len(algorithms)
+
+        self._thread = CrackThread(self._wordlist, self.digest_input.text(), algorithms,
+                                   self.prefix_input.text().encode('utf-8'),
+                                   self.suffix_input.text().encode('utf-8'),
+                                   self.first_check.isChecked())
+        self._thread.progress_signal.connect(self._on_progress)
+        self._thread.finished_signal.connect(self._on_finished)
+        self._thread.error_signal.connect(self._on_error)
+        self._thread.start()
+
+    def _stop(self):
+        if self._thread is not None:
+            self._thread.stop()
+
+    def _reset(self):
+        self._thread = None
+        self.start_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        self.progress_bar.setVisible(False)
+
+    def _rate(self, words) -> str:
+        elapsed = time.perf_counter() - self._started
+        rate = words * self._algorithm_count / elapsed if elapsed > 0 else 0.0
+        return f"{words} 个口令，{rate:,.0f} 次/秒"
+
+    def _on_progress(self, done, total, words):
+        self.progress_bar.setValue(int(done * 1000 / max(1, total)))
+        self.status_label.setText(self._rate(words))
+
+    def _on_finished(self, result):
+        self._reset()
+        text = self._rate(result['words'])
+        if result['stopped']:
+            text = "已停止，" + text
+        self.status_label.setText(text)
+        if result['found']:
+            self.result_edit.setPlainText("\n".join(
+                f"{algorithm}: {_show_word(word)}" for algorithm, word in result['found']))
+        else:
+            self.result_edit.setPlainText("未找到匹配的口令")
+
+    def _on_error(self, message):
+        self._reset()
+        self.status_label.setText("")
+        QMessageBox.warning(self, "错误", f"匹配失败: {message}")
+
+    def done(self, result):
+        # 非模态对话框按 Esc 时只调用 reject()，不经过 closeEvent；关闭窗口也会走到这里
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread.wait()
+        super().done(result)
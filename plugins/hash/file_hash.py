@@ -0,0 +1,375 @@
+"""文件哈希：一次读取，同时计算多个算法
+
+文件只读一遍：用 readinto 读进两个反复使用的大缓冲区（双缓冲），每块交给所有选中算法的
+update。各算法的 update 提交到线程池并行执行（hashlib 处理大块数据时释放 GIL），
+同时主循环把下一块读进另一个缓冲区，读盘与计算重叠，整体速度接近磁盘带宽。
+HMAC 与校验和（CRC、Adler-32、xxHash）走同一条分块路径。
+
+benchmark 在内存中的数据上测量各算法的吞吐量，不受磁盘影响，用于挑选算法。
+"""
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QPushButton, QCheckBox,
+    QProgressBar, QListWidget, QTextEdit, QLineEdit, QFileDialog, QMessageBox
+)
+from PySide6.QtCore import QThread, Signal
+import os
+import time
+
+from style import FONTS
+from .hash_plugin import HashCalculator
+
+# 每次读取的字节数
+CHUNK_BYTES = 1 << 23
+
+# 默认勾选的算法
+DEFAULT_ALGORITHMS = ["MD5 (128位)", "SHA1 (160位)", "SHA256 (256位)"]
+
+# 测速时每个算法处理的字节数
+BENCHMARK_BYTES = 1 << 26
+
+
+def hash_stream(f, algorithms: list, executor=None, progress=None, should_stop=None, key=None):
+    """读取二进制文件对象 f 直到结尾，返回 {算法: 十六进制摘要}；被中止时返回 None
+
+    executor 为线程池时各算法并行 update；progress(已读字节数) 每块调用一次。
+    key 为 bytes 时计算各算法的 HMAC。
+    """
+    hashers = [HashCalculator.new(algorithm, key) for algorithm in algorithms]
+    views = [memoryview(bytearray(CHUNK_BYTES)) for _ in range(2)]
+    pending = []
+    done = 0
+    index = 0
+    try:
+        while True:
+            if should_stop is not None and should_stop():
+                return None
+            # 读入空闲的缓冲区时，上一块仍在另一个缓冲区中计算
+            count = f.readinto(views[index])
+            for future in pending:
+                future.result()
+            pending = []
+            if not count:
+                break
+            chunk = views[index][:count]
+            if executor is not None and len(hashers) > 1:
+                pending = [executor.submit(h.update, chunk) for h in hashers]
+            else:
+                for h in hashers:
+                    h.update(chunk)
+            done += count
+            if progress is not None:
+                progress(done)
+            index ^= 1
+    finally:
+        for future in pending:
+            future.result()
+    return {algorithm: HashCalculator.hexdigest(algorithm, h) for algorithm, h in zip(algorithms, hashers)}
+
+
+def hash_file(path: str, algorithms: list, executor=None, progress=None, should_stop=None, key=None):
+    """计算一个文件的多个摘要，见 hash_stream"""
+    # 不经过 Python 的缓冲层，readinto 直接写入缓冲区
+    with open(path, 'rb', buffering=0) as f:
+        return hash_stream(f, algorithms, executor, progress, should_stop, key)
+
+
+def benchmark(algorithms=None, size: int = BENCHMARK_BYTES, key=None, on_result=None,
+              should_stop=None) -> list:
+    """逐个算法对 size 字节的随机数据按 CHUNK_BYTES 分块计算，返回 [(算法, MB/s), ...]
+
+    algorithms 默认为全部算法；给出 key 时测量 HMAC，不支持 HMAC 的算法跳过。
+    on_result(算法, MB/s) 每测完一个算法调用一次。
+    """
+    if algorithms is None:
+        algorithms = list(HashCalculator.ALGORITHMS)
+    if key is not None:
+        algorithms = [algorithm for algorithm in algorithms if HashCalculator.supports_hmac(algorithm)]
+    chunk = memoryview(os.urandom(min(size, CHUNK_BYTES)))
+    results = []
+    for algorithm in algorithms:
+        if should_stop is not None and should_stop():
+            break
+        h = HashCalculator.new(algorithm, key)
+        # 先处理一块，表格之类的一次性初始化不计入
+        h.update(chunk)
+        done = 0
+        started = time.perf_counter()
+        while done < size:
+            h.update(chunk[:size - done])
+            done += min(len(chunk), size - done)
+        HashCalculator.hexdigest(algorithm, h)
+        elapsed = time.perf_counter() - started
+        speed = done / elapsed / (1 << 20) if elapsed > 0 else float('inf')
+        results.append((algorithm, speed))
+        if on_result is not None:
+            on_result(algorithm, speed)
+    return results
+
+
+def create_algorithm_grid(parent, checked) -> tuple:
+    """算法多选框，每行 4 个；返回 (布局, {算法: 复选框})"""
+    layout = QGridLayout()
+    checks = {}
+    for index, algorithm in enumerate(HashCalculator.ALGORITHMS):
+        check = QCheckBox(algorithm, parent)
+        check.setStyleSheet(f"font: {FONTS['body']};")
+        check.setChecked(algorithm in checked)
+        layout.addWidget(check, index // 4, index % 4)
+        checks[algorithm] = check
+    return layout, checks
+
+
+class FileHashThread(QThread):
+    file_signal = Signal(str, object)  # 文件路径、{算法: 摘要}
+    progress_signal = Signal(object, object)  # 进度信号 (已处理字节, 总字节)
+    finished_signal = Signal(bool)  # 完成信号，是否被中止
+    error_signal = Signal(str, str)  # 文件路径、错误信息
+
+    def __init__(self, paths, algorithms, key=None):
+        super().__init__()
+        self.paths = paths
+        self.algorithms = algorithms
+        self.key = key
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+
+    def run(self):
+        total = 0
+        for path in self.paths:
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        finished = 0
+        workers = max(1, min(len(self.algorithms), os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for path in self.paths:
+                if self._stop:
+                    break
+                try:
+                    digests = hash_file(path, self.algorithms, executor,
+                                        progress=lambda done: self.progress_signal.emit(finished + done, total),
+                                        should_stop=lambda: self._stop, key=self.key)
+                    if digests is not None:
+                        self.file_signal.emit(path, digests)
+                    finished += os.path.getsize(path)
+                except Exception as e:
+                    self.error_signal.emit(path, str(e))
+        self.finished_signal.emit(self._stop)
+
+
+class BenchmarkThread(QThread):
+    result_signal = Signal(str, float)  # 算法、MB/s
+    finished_signal = Signal(bool)  # 完成信号，是否被中止
+    error_signal = Signal(str)  # 错误信号
+
+    def __init__(self, algorithms, key=None):
+        super().__init__()
+        self.algorithms = algorithms
+        self.key = key
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+
+    def run(self):
+        try:
+            benchmark(self.algorithms, key=self.key, on_result=self.result_signal.emit,
+                      should_stop=lambda: self._stop)
+        except Exception as e:
+            self.error_signal.emit(str(e))
+        self.finished_signal.emit(self._stop)
+
+
+class FileHashDialog(QDialog):
+    """选择文件和算法，每个文件读取一次得到所有摘要"""
+
+    def __init__(self, algorithms=None, parent=None, key=""):
+        super().__init__(parent)
+        self.setWindowTitle("文件哈希")
+        self.setMinimumWidth(820)
+        self.setMinimumHeight(600)
+
+        self._thread = None
+        self._started = 0.0
+        self._bytes = 0
+
+        layout = QVBoxLayout(self)
+
+        # 算法多选
+        algorithm_layout, self.algorithm_checks = create_algorithm_grid(
+            self, set(algorithms or []) | set(DEFAULT_ALGORITHMS))
+        layout.addLayout(algorithm_layout)
+
+        key_layout = QHBoxLayout()
+        key_layout.addWidget(QLabel("HMAC 密钥:", self))
+        self.key_edit = QLineEdit(key, self)
+        self.key_edit.setPlaceholderText("留空为普通哈希")
+        key_layout.addWidget(self.key_edit, 1)
+        layout.addLayout(key_layout)
+
+        file_layout = QHBoxLayout()
+        add_btn = QPushButton("添加文件", self)
+        add_btn.clicked.connect(self._add_files)
+        clear_btn = QPushButton("清空", self)
+        clear_btn.clicked.connect(self._clear_files)
+        self.start_btn = QPushButton("计算", self)
+        self.start_btn.clicked.connect(self._start)
+        self.benchmark_btn = QPushButton("测速", self)
+        self.benchmark_btn.setToolTip(f"在内存中对每个选中的算法计算 {BENCHMARK_BYTES >> 20} MB 数据，比较吞吐量")
+        self.benchmark_btn.clicked.connect(self._start_benchmark)
+        self.stop_btn = QPushButton("停止", self)
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self._stop)
+        file_layout.addWidget(add_btn)
+        file_layout.addWidget(clear_btn)
+        file_layout.addStretch()
+        file_layout.addWidget(self.start_btn)
+        file_layout.addWidget(self.benchmark_btn)
+        file_layout.addWidget(self.stop_btn)
+        layout.addLayout(file_layout)
+
+        self.file_list = QListWidget(self)
+        self.file_list.setMaximumHeight(120)
+        layout.addWidget(self.file_list)
+
+        status_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setVisible(False)
+        self.status_label = QLabel("", self)
+        status_layout.addWidget(self.progress_bar, 1)
+        status_layout.addWidget(self.status_label)
+        layout.addLayout(status_layout)
+
+        self.result_edit = QTextEdit(self)
+        self.result_edit.setReadOnly(True)
+        self.result_edit.setStyleSheet(f"font: {FONTS['mono']};")
+        layout.addWidget(self.result_edit, 1)
+
+    def selected_algorithms(self) -> list:
+        return [algorithm for algorithm, check in self.algorithm_checks.items() if check.isChecked()]
+
+    def key(self):
+        """HMAC 密钥，留空时为 None"""
+        text = self.key_edit.text()
+        return text.encode() if text else None
+
+    def _check_algorithms(self):
+        """选中的算法，不合适时提示并返回 None"""
+        algorithms = self.selected_algorithms()
+        if not algorithms:
+            QMessageBox.warning(self, "警告", "请至少选择一种算法")
+            return None
+        if self.key() is not None:
+            unsupported = [algorithm for algorithm in algorithms if not HashCalculator.supports_hmac(algorithm)]
+            if unsupported:
+                QMessageBox.warning(self, "警告", "以下算法不能用于 HMAC:\n" + "\n".join(unsupported))
+                return None
+        return algorithms
+
+    def _set_running(self, running: bool):
+        self.start_btn.setEnabled(not running)
+        self.benchmark_btn.setEnabled(not running)
+        self.stop_btn.setEnabled(running)
+
+    def _add_files(self):
+        paths, _ = QFileDialog.getOpenFileNames(self, "选择文件", "", "所有文件 (*.*)")
+        for path in paths:
+            self.file_list.addItem(path)
+
+    def _clear_files(self):
+        if self._thread is None:
+            self.file_list.clear()
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        paths = [self.file_list.item(row).text() for row in range(self.file_list.count())]
+        if not paths:
+            QMessageBox.warning(self, "警告", "请先添加文件")
+            return
+        algorithms = self._check_algorithms()
+        if algorithms is None:
+            return
+
+        self.result_edit.clear()
+        self._set_running(True)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.status_label.setText("计算中…")
+        self._started = time.perf_counter()
+        self._bytes = 0
+
+        self._thread = FileHashThread(paths, algorithms, self.key())
+        self._thread.file_signal.connect(self._on_file)
+        self._thread.progress_signal.connect(self._on_progress)
+        self._thread.error_signal.connect(self._on_error)
+        self._thread.finished_signal.connect(self._on_finished)
+        self._thread.start()
+
+    def _start_benchmark(self):
+        if self._thread is not None:
+            return
+        algorithms = self._check_algorithms()
+        if algorithms is None:
+            return
+
+        self.result_edit.clear()
+        self.result_edit.append(f"测速：每个算法 {BENCHMARK_BYTES >> 20} MB，数据在内存中\n")
+        self._set_running(True)
+        self.status_label.setText("测速中…")
+
+        self._thread = BenchmarkThread(algorithms, self.key())
+        self._thread.result_signal.connect(self._on_benchmark_result)
+        self._thread.error_signal.connect(lambda message: self._on_error("测速", message))
+        self._thread.finished_signal.connect(self._on_benchmark_finished)
+        self._thread.start()
+
+    def _on_benchmark_result(self, algorithm, speed):
+        prefix = "HMAC-" if self.key() is not None else ""
+        self.result_edit.append(f"  {prefix + algorithm:<28}  {speed:10.1f} MB/s")
+
+    def _on_benchmark_finished(self, stopped):
+        self._thread = None
+        self._set_running(False)
+        self.status_label.setText("测速已停止" if stopped else "测速完成")
+
+    def _stop(self):
+        if self._thread is not None:
+            self._thread.stop()
+
+    def _on_progress(self, done, total):
+        self._bytes = done
+        self.progress_bar.setValue(int(done * 1000 / max(1, total)))
+        elapsed = time.perf_counter() - self._started
+        if elapsed > 0:
+            self.status_label.setText(f"{done / elapsed / (1 << 20):.1f} MB/s")
+
+    def _on_file(self, path, digests):
+        prefix = "HMAC-" if self._thread is not None and self._thread.key is not None else ""
+        width = max(len(prefix + algorithm) for algorithm in digests)
+        lines = [path] + [f"  {prefix + algorithm:<{width}}  {digest}" for algorithm, digest in digests.items()]
+        self.result_edit.append("\n".join(lines) + "\n")
+
+    def _on_error(self, path, message):
+        self.result_edit.append(f"{path}\n  错误: {message}\n")
+
+    def _on_finished(self, stopped):
+        self._thread = None
+        self._set_running(False)
+        self.progress_bar.setVisible(False)
+        elapsed = time.perf_counter() - self._started
+        speed = self._bytes / elapsed / (1 << 20) if elapsed > 0 else 0.0
+        prefix = "已停止" if stopped else "完成"
+        self.status_label.setText(f"{prefix}，{self._bytes} 字节，{elapsed:.2f} 秒，{speed:.1f} MB/s")
+
+    def done(self, result):
+        # 非模态对话框按 Esc 时只调用 reject()，不经过 closeEvent；关闭窗口也会走到这里
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread.wait()
+        super().done(result)
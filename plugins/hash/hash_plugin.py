@@ -1,14 +1,39 @@
 import hashlib
+import hmac
+from functools import partial
 from plugins import Plugin
 from typing import List, Dict, Any
-from PySide6.QtWidgets import QWidget, QLabel, QComboBox, QHBoxLayout, QTextEdit
+from PySide6.QtWidgets import QWidget, QLabel, QComboBox, QHBoxLayout, QTextEdit, QPushButton, QLineEdit
 from style import FONTS
 
-class HashCalculator:
-    """哈希计算器"""
-    
-    # 支持的哈希算法
-    ALGORITHMS = {
+from . import checksums
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+def _openssl(name: str, fallback=None):
+    """OpenSSL 提供的算法（RIPEMD160、Whirlpool 取决于 OpenSSL 的版本和配置），不可用时返回 fallback"""
+    try:
+        hashlib.new(name)
+        return partial(hashlib.new, name)
+    except ValueError:
+        return fallback
+
+
+def _ripemd160():
+    """OpenSSL 3 默认不提供 RIPEMD160 时改用 pycryptodome"""
+    try:
+        from Crypto.Hash import RIPEMD160
+    except ImportError:
+        return None
+    return RIPEMD160.new
+
+
+def _algorithms() -> dict:
+    algorithms = {
         "MD5 (128位)": hashlib.md5,
         "SHA1 (160位)": hashlib.sha1,
         "SHA224 (224位)": hashlib.sha224,
@@ -23,37 +48,68 @@ class HashCalculator:
         "BLAKE2b (512位)": hashlib.blake2b,
         "SHAKE128 (128位)": hashlib.shake_128,
         "SHAKE256 (256位)": hashlib.shake_256,
-        "RIPEMD160 (160位)": 'ripemd160',
-        "Whirlpool (512位)": 'whirlpool'
+        "RIPEMD160 (160位)": _openssl('ripemd160', _ripemd160()),
+        "Whirlpool (512位)": _openssl('whirlpool'),
+        # 校验和
+        "CRC16/ARC (16位)": checksums.crc("CRC16/ARC"),
+        "CRC16/MODBUS (16位)": checksums.crc("CRC16/MODBUS"),
+        "CRC16/CCITT-FALSE (16位)": checksums.crc("CRC16/CCITT-FALSE"),
+        "CRC32 (32位)": checksums.crc32,
+        "Adler-32 (32位)": checksums.adler32,
+        "CRC64/XZ (64位)": checksums.crc("CRC64/XZ"),
+        "CRC64/ECMA-182 (64位)": checksums.crc("CRC64/ECMA-182"),
     }
+    if xxhash is not None:
+        algorithms["XXH32 (32位)"] = xxhash.xxh32
+        algorithms["XXH64 (64位)"] = xxhash.xxh64
+        algorithms["XXH3 (64位)"] = xxhash.xxh3_64
+    # 当前环境不可用的算法不列出
+    return {name: func for name, func in algorithms.items() if func is not None}
+
+
+class HashCalculator:
+    """哈希计算器"""
     
+    # 支持的哈希算法，值为无参构造函数
+    ALGORITHMS = _algorithms()
+
+    # 非密码学的校验和，不能用于 HMAC
+    CHECKSUMS = {algorithm for algorithm in ALGORITHMS
+                 if algorithm.startswith(("CRC", "Adler", "XXH"))}
+
+    @staticmethod
+    def supports_hmac(algorithm: str) -> bool:
+        return algorithm not in HashCalculator.CHECKSUMS and not algorithm.startswith("SHAKE")
+
+    @staticmethod
+    def new(algorithm: str, key: bytes = None):
+        """创建算法的哈希对象，可以多次 update，用于分块计算文件；给出 key 时为 HMAC"""
+        if algorithm not in HashCalculator.ALGORITHMS:
+            raise ValueError(f"不支持的哈希算法: {algorithm}")
+        hash_func = HashCalculator.ALGORITHMS[algorithm]
+        if key is None:
+            return hash_func()
+        if not HashCalculator.supports_hmac(algorithm):
+            raise ValueError(f"{algorithm} 不能用于 HMAC")
+        return hmac.new(key, digestmod=hash_func)
+
+    @staticmethod
+    def hexdigest(algorithm: str, h) -> str:
+        """取十六进制摘要，SHAKE 按名称中的位数输出"""
+        if algorithm in ["SHAKE128 (128位)", "SHAKE256 (256位)"]:
+            length = 128 if "128" in algorithm else 256
+            return h.hexdigest(length // 8)  # 转换为字节长度
+        return h.hexdigest()
+
     @staticmethod
-    def calculate(text: str, algorithm: str) -> str:
-        """计算哈希值"""
+    def calculate(text: str, algorithm: str, key: str = "") -> str:
+        """计算哈希值，key 不为空时计算 HMAC"""
         try:
             if not text:
                 return ""
-                
-            if algorithm not in HashCalculator.ALGORITHMS:
-                raise ValueError(f"不支持的哈希算法: {algorithm}")
-                
-            hash_func = HashCalculator.ALGORITHMS[algorithm]
-            
-            # 处理特殊的哈希算法
-            if algorithm in ["SHAKE128 (128位)", "SHAKE256 (256位)"]:
-                length = 128 if "128" in algorithm else 256
-                h = hash_func()
-                h.update(text.encode())
-                return h.hexdigest(length // 8)  # 转换为字节长度
-            elif algorithm in ["RIPEMD160 (160位)", "Whirlpool (512位)"]:
-                h = hashlib.new(hash_func)
-                h.update(text.encode())
-                return h.hexdigest()
-            else:
-                h = hash_func()
-                h.update(text.encode())
-                return h.hexdigest()
-                
+            h = HashCalculator.new(algorithm, key.encode() if key else None)
+            h.update(text.encode())
+            return HashCalculator.hexdigest(algorithm, h)
         except Exception as e:
             raise ValueError(f"哈希计算错误: {str(e)}")
 
@@ -110,6 +166,30 @@ class HashPlugin(Plugin):
         
         # 连接下拉框变化信号
         self.algorithm_combo.currentTextChanged.connect(self.on_algorithm_changed)
+
+        # HMAC 密钥，留空时计算普通哈希
+        key_label = QLabel("HMAC 密钥:", parent)
+        key_label.setStyleSheet(f"font: {FONTS['body']};")
+        self.key_edit = QLineEdit(parent)
+        self.key_edit.setFixedWidth(160)
+        self.key_edit.setStyleSheet(f"font: {FONTS['body']};")
+        self.key_edit.setPlaceholderText("留空为普通哈希")
+        self.key_edit.textChanged.connect(self.on_input_changed)
+
+        # 文件哈希：一次读取同时计算多个算法
+        file_btn = QPushButton("计算文件哈希", parent)
+        file_btn.setStyleSheet(f"font: {FONTS['body']};")
+        file_btn.clicked.connect(lambda: self.open_file_hash(parent))
+
+        # 目录清单：生成或校验
+        dir_btn = QPushButton("目录哈希清单", parent)
+        dir_btn.setStyleSheet(f"font: {FONTS['body']};")
+        dir_btn.clicked.connect(lambda: self.open_directory_hash(parent))
+
+        # 字典匹配：输入框中的摘要作为目标
+        crack_btn = QPushButton("字典匹配", parent)
+        crack_btn.setStyleSheet(f"font: {FONTS['body']};")
+        crack_btn.clicked.connect(lambda: self.open_crack(parent))
             
         # 添加到布局，并添加弹性空间
         layout.addWidget(label)
@@ -129,8 +209,48 @@ class HashPlugin(Plugin):
                 'type': 'input',
                 'key': 'algorithm',
                 'widget': self.algorithm_combo
+            },
+            {
+                'type': 'label',
+                'widget': key_label
+            },
+            {
+                'type': 'input',
+                'key': 'key',
+                'widget': self.key_edit
+            },
+            {
+                'type': 'button',
+                'widget': file_btn
+            },
+            {
+                'type': 'button',
+                'widget': dir_btn
+            },
+            {
+                'type': 'button',
+                'widget': crack_btn
             }
         ]
+
+    def open_file_hash(self, parent=None):
+        """打开文件哈希窗口，默认勾选当前算法，带上当前的 HMAC 密钥"""
+        from .file_hash import FileHashDialog
+        dialog = FileHashDialog([self.algorithm_combo.currentText()], parent, self.key_edit.text())
+        dialog.show()
+
+    def open_directory_hash(self, parent=None):
+        """打开目录哈希清单窗口"""
+        from .manifest import DirectoryHashDialog
+        dialog = DirectoryHashDialog([self.algorithm_combo.currentText()], parent)
+        dialog.show()
+
+    def open_crack(self, parent=None):
+        """打开字典匹配窗口，输入框中的内容作为目标摘要"""
+        from .crack import CrackDialog
+        digest = self.input_edit.toPlainText().strip() if getattr(self, 'input_edit', None) else ""
+        dialog = CrackDialog(digest, parent)
+        dialog.show()
     
     def on_algorithm_changed(self, _):
         """算法选择变化时触发"""
@@ -161,7 +281,7 @@ class HashPlugin(Plugin):
             
         try:
             algorithm = self.algorithm_combo.currentText()
-            result = self.calculator.calculate(input_text, algorithm)
+            result = self.calculator.calculate(input_text, algorithm, self.key_edit.text())
             self.output_edit.setPlainText(result)
         except Exception as e:
             self.output_edit.setPlainText(f"错误: {str(e)}")
@@ -172,7 +292,7 @@ class HashPlugin(Plugin):
                 return "请输入要计算哈希的文本"
             
             algorithm = self.algorithm_combo.currentText()
-            return self.calculator.calculate(input_data, algorithm)
+            return self.calculator.calculate(input_data, algorithm, kwargs.get('key', ""))
             
         except ValueError as e:
             return f"错误: {str(e)}"
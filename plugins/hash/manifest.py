@@ -0,0 +1,641 @@
+"""目录哈希清单
+
+遍历目录树，对每个文件计算所选算法的摘要，生成 sha256sum / CSV / JSON 格式的清单，
+或者按已有清单校验目录。
+
+- 文件分发到进程池，每个文件在一个进程中只读一遍（见 file_hash.hash_file），
+  按大小从大到小提交，避免最后剩下一个大文件单独拖慢整体。
+- 摘要缓存在 SQLite 中，以 (设备号, inode, 大小, mtime_ns, 算法) 为键；未改动的文件只需要 stat，
+  重复处理大量文件的目录时几乎不读盘。算完后再 stat 一次，期间被修改的文件不写入缓存。
+"""
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QCheckBox, QComboBox,
+    QProgressBar, QTextEdit, QFileDialog, QMessageBox
+)
+from PySide6.QtCore import QThread, Signal, QStandardPaths
+import csv
+import io
+import json
+import multiprocessing
+import os
+import re
+import sqlite3
+import tempfile
+import time
+
+from style import FONTS
+from .hash_plugin import HashCalculator
+from .file_hash import hash_file, create_algorithm_grid, DEFAULT_ALGORITHMS
+
+FORMATS = {
+    "sha256sum": 'sum',
+    "CSV": 'csv',
+    "JSON": 'json',
+}
+
+CACHE_NAME = 'hash_cache.sqlite3'
+
+# *sum 工具按摘要长度对应的算法；其他算法写成 BSD 风格的带标签行
+_SUM_ALGORITHMS = {
+    32: "MD5 (128位)",
+    40: "SHA1 (160位)",
+    56: "SHA224 (224位)",
+    64: "SHA256 (256位)",
+    96: "SHA384 (384位)",
+    128: "SHA512 (512位)",
+}
+
+# BSD 风格（--tag）的行：算法 (路径) = 摘要
+_TAGGED_LINE = re.compile(r"(\S+) \((.*)\) = ([0-9A-Fa-f]+)")
+
+
+def cache_path() -> str:
+    """缓存文件放在用户的缓存目录，不写入程序目录"""
+    directory = QStandardPaths.writableLocation(QStandardPaths.CacheLocation) or tempfile.gettempdir()
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, CACHE_NAME)
+
+
+def short_name(algorithm: str) -> str:
+    """清单中使用的算法名：'SHA256 (256位)' -> 'SHA256'"""
+    return algorithm.split(" (")[0]
+
+
+def algorithm_for(name: str) -> str:
+    """清单中的算法名 -> HashCalculator.ALGORITHMS 中的名称"""
+    for algorithm in HashCalculator.ALGORITHMS:
+        if short_name(algorithm).upper() == name.upper():
+            return algorithm
+    raise ValueError(f"不支持的哈希算法: {name}")
+
+
+def list_files(root: str) -> list:
+    """递归列出 root 下的普通文件（不跟随符号链接）
+
+    返回 [{'path': 相对路径（/ 分隔）, 'size': 大小, 'key': (设备号, inode, 大小, mtime_ns)}, ...]
+    """
+    files = []
+    stack = [""]
+    while stack:
+        relative = stack.pop()
+        with os.scandir(os.path.join(root, relative) if relative else root) as entries:
+            for entry in entries:
+                path = f"{relative}/{entry.name}" if relative else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(path)
+                elif entry.is_file(follow_symlinks=False):
+                    st = entry.stat(follow_symlinks=False)
+                    # Windows 上 scandir 的 stat 不含 inode，需要再 stat 一次
+                    if not st.st_ino:
+                        st = os.stat(entry.path, follow_symlinks=False)
+                    files.append({'path': path, 'size': st.st_size,
+                                  'key': (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)})
+    files.sort(key=lambda item: item['path'])
+    return files
+
+
+class HashCache:
+    """持久化的摘要缓存"""
+
+    def __init__(self, path: str = None):
+        self.connection = sqlite3.connect(path or cache_path())
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS digests (file TEXT, algorithm TEXT, digest TEXT, "
+            "PRIMARY KEY (file, algorithm))"
+        )
+
+    @staticmethod
+    def _file_key(key: tuple) -> str:
+        # 设备号和 inode 可能超出 SQLite 的 64 位有符号整数，拼成字符串作为键
+        return ":".join(str(value) for value in key)
+
+    def get(self, key: tuple, algorithms: list):
+        """所有算法都有缓存时返回 {算法: 摘要}，否则返回 None"""
+        rows = self.connection.execute(
+            "SELECT algorithm, digest FROM digests WHERE file=?", (self._file_key(key),)
+        ).fetchall()
+        digests = dict(rows)
+        if not all(algorithm in digests for algorithm in algorithms):
+            return None
+        return {algorithm: digests[algorithm] for algorithm in algorithms}
+
+    def put(self, key: tuple, digests: dict):
+        file_key = self._file_key(key)
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO digests VALUES (?, ?, ?)",
+            [(file_key, algorithm, digest) for algorithm, digest in digests.items()],
+        )
+
+    def commit(self):
+        self.connection.commit()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+
+# 子进程中的取消标志（multiprocessing.Event），由进程池初始化函数设置
+_cancel = None
+
+# 等待进程池结果时检查中止的间隔（秒）
+STOP_POLL_INTERVAL = 0.2
+
+
+def _init_worker(cancel):
+    global _cancel
+    _cancel = cancel
+
+
+def _hash_job(path: str, algorithms: list, should_stop=None):
+    """计算一个文件：返回 (摘要, 错误信息)，被中止时摘要和错误都为 None
+
+    在进程池中运行时用初始化函数传入的取消标志，正在读的大文件也能在一块之内停下。
+    """
+    if should_stop is None and _cancel is not None:
+        should_stop = _cancel.is_set
+    try:
+        return hash_file(path, algorithms, should_stop=should_stop), None
+    except Exception as e:
+        return None, str(e)
+
+
+def hash_tree(root: str, algorithms: list, files: list = None, workers: int = None, cache: HashCache = None,
+              progress=None, should_stop=None) -> tuple:
+    """计算目录下文件的摘要，返回 (条目列表, 是否被中止)
+
+    条目为 {'path', 'size', 'digests', 'error', 'cached'}，按路径排序；files 默认为 list_files(root)。
+    progress(已处理字节, 需计算的总字节, 已完成文件数, 文件总数)。
+    """
+    if files is None:
+        files = list_files(root)
+    entries = []
+    todo = []
+    for item in files:
+        entry = {'path': item['path'], 'size': item['size'], 'digests': None, 'error': None, 'cached': False}
+        digests = cache.get(item['key'], algorithms) if cache is not None else None
+        if digests is not None:
+            entry['digests'] = digests
+            entry['cached'] = True
+        else:
+            todo.append((entry, item['key']))
+        entries.append(entry)
+
+    total_bytes = sum(entry['size'] for entry, _ in todo)
+    done_bytes = 0
+    done_files = len(entries) - len(todo)
+    if progress is not None:
+        progress(done_bytes, total_bytes, done_files, len(entries))
+
+    def finish(entry, key, result):
+        nonlocal done_bytes, done_files
+        entry['digests'], entry['error'] = result
+        if cache is not None and entry['digests'] is not None:
+            try:
+                st = os.stat(os.path.join(root, entry['path']), follow_symlinks=False)
+            except OSError:
+                st = None
+            if st is not None and (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns) == key:
+                cache.put(key, entry['digests'])
+        done_bytes += entry['size']
+        done_files += 1
+        if progress is not None:
+            progress(done_bytes, total_bytes, done_files, len(entries))
+
+    # 大文件先开始
+    todo.sort(key=lambda job: job[0]['size'], reverse=True)
+    stopped = False
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(todo) > 1:
+        cancel = multiprocessing.Event()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(cancel,)) as executor:
+            futures = {executor.submit(_hash_job, os.path.join(root, entry['path']), algorithms): (entry, key)
+                       for entry, key in todo}
+            pending = set(futures)
+            while pending:
+                # 定时检查中止，不必等到某个（可能很大的）文件算完
+                done, pending = wait(pending, timeout=STOP_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(*futures[future], future.result())
+                if should_stop is not None and should_stop():
+                    stopped = True
+                    # 正在计算的任务在下一块之前停下，尚未开始的直接取消
+                    cancel.set()
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    break
+    else:
+        for entry, key in todo:
+            if should_stop is not None and should_stop():
+                stopped = True
+                break
+            result = _hash_job(os.path.join(root, entry['path']), algorithms, should_stop)
+            if result == (None, None):
+                stopped = True
+                break
+            finish(entry, key, result)
+    if cache is not None:
+        cache.commit()
+    return entries, stopped
+
+
+# ---- 清单格式 ----
+
+def _escape(path: str) -> tuple:
+    """GNU *sum 的文件名转义：含反斜杠或换行时行首加 '\\'"""
+    if "\\" not in path and "\n" not in path:
+        return "", path
+    return "\\", path.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _unescape(path: str) -> str:
+    return path.replace("\\\\", "\0").replace("\\n", "\n").replace("\0", "\\")
+
+
+def is_tagged(algorithm: str) -> bool:
+    """sha256sum 格式中该算法是否写成带标签的行（摘要长度不能唯一确定算法）"""
+    return algorithm not in _SUM_ALGORITHMS.values()
+
+
+def format_manifest(entries: list, algorithms: list, fmt: str) -> str:
+    """生成清单文本；sha256sum 格式只能容纳一种摘要，使用 algorithms 中的第一个
+
+    MD5、SHA1、SHA2 输出 GNU *sum 的格式，其他算法输出 BSD 风格的
+    「算法 (路径) = 摘要」行，校验时按标签识别算法。
+    """
+    entries = [entry for entry in entries if entry['digests'] is not None]
+    if fmt == 'sum':
+        algorithm = algorithms[0]
+        tag = short_name(algorithm) if is_tagged(algorithm) else None
+        lines = []
+        for entry in entries:
+            prefix, path = _escape(entry['path'])
+            digest = entry['digests'][algorithm]
+            lines.append(f"{prefix}{tag} ({path}) = {digest}" if tag else f"{prefix}{digest}  {path}")
+        return "\n".join(lines) + ("\n" if lines else "")
+    if fmt == 'csv':
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator="\n")
+        writer.writerow(["path", "size"] + [short_name(algorithm) for algorithm in algorithms])
+        for entry in entries:
+            writer.writerow([entry['path'], entry['size']] + [entry['digests'][a] for a in algorithms])
+        return output.getvalue()
+    if fmt == 'json':
+        return json.dumps([
+            {'path': entry['path'], 'size': entry['size'],
+             'digests': {short_name(algorithm): entry['digests'][algorithm] for algorithm in algorithms}}
+            for entry in entries
+        ], ensure_ascii=False, indent=2) + "\n"
+    raise ValueError(f"不支持的清单格式: {fmt}")
+
+
+def parse_manifest(text: str) -> tuple:
+    """解析清单，自动识别格式
+
+    返回 (算法列表, {相对路径: {'size': 大小或 None, 'digests': {算法: 摘要}}})。
+    """
+    stripped = text.lstrip()
+    expected = {}
+    if stripped.startswith("["):
+        items = json.loads(text)
+        algorithms = []
+        for item in items:
+            digests = {algorithm_for(name): digest.lower() for name, digest in item['digests'].items()}
+            for algorithm in digests:
+                if algorithm not in algorithms:
+                    algorithms.append(algorithm)
+            expected[item['path']] = {'size': item.get('size'), 'digests': digests}
+        return algorithms, expected
+
+    if stripped.startswith("path,size"):
+        reader = csv.reader(io.StringIO(stripped))
+        header = next(reader)
+        algorithms = [algorithm_for(name) for name in header[2:]]
+        for row in reader:
+            if not row:
+                continue
+            expected[row[0]] = {'size': int(row[1]),
+                                'digests': {a: d.lower() for a, d in zip(algorithms, row[2:])}}
+        return algorithms, expected
+
+    algorithms = []
+    for number, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        escaped = line.startswith("\\")
+        if escaped:
+            line = line[1:]
+        tagged = _TAGGED_LINE.fullmatch(line)
+        if tagged:
+            name, path, digest = tagged.groups()
+            try:
+                algorithm = algorithm_for(name)
+            except ValueError as e:
+                raise ValueError(f"第 {number} 行: {e}")
+        else:
+            digest, separator, path = line.partition(" ")
+            if not separator or len(digest) not in _SUM_ALGORITHMS:
+                raise ValueError(f"第 {number} 行格式错误")
+            # 二进制模式的 '*' 或文本模式的空格
+            path = path[1:] if path[:1] in ("*", " ") else path
+            algorithm = _SUM_ALGORITHMS[len(digest)]
+        if escaped:
+            path = _unescape(path)
+        if algorithm not in algorithms:
+            algorithms.append(algorithm)
+        expected.setdefault(path, {'size': None, 'digests': {}})['digests'][algorithm] = digest.lower()
+    if not algorithms:
+        raise ValueError("清单为空")
+    return algorithms, expected
+
+
+def verify_tree(root: str, text: str, workers: int = None, cache: HashCache = None,
+                progress=None, should_stop=None) -> dict:
+    """按清单校验目录，返回 {'ok': [...], 'failed': [...], 'missing': [...], 'extra': [...], 'errors': [...],
+    'stopped'}，各列表为相对路径（errors 为 (路径, 错误信息)）"""
+    algorithms, expected = parse_manifest(text)
+    present = {item['path']: item for item in list_files(root)}
+    files = [present[path] for path in sorted(expected) if path in present]
+    entries, stopped = hash_tree(root, algorithms, files, workers, cache, progress, should_stop)
+
+    result = {'ok': [], 'failed': [], 'errors': [], 'stopped': stopped,
+              'missing': sorted(path for path in expected if path not in present),
+              'extra': sorted(path for path in present if path not in expected)}
+    for entry in entries:
+        if entry['error'] is not None:
+            result['errors'].append((entry['path'], entry['error']))
+        elif entry['digests'] is None:
+            continue
+        else:
+            wanted = expected[entry['path']]
+            size_ok = wanted['size'] is None or wanted['size'] == entry['size']
+            digests_ok = all(entry['digests'][a] == digest for a, digest in wanted['digests'].items())
+            result['ok' if size_ok and digests_ok else 'failed'].append(entry['path'])
+    return result
+
+
+class ManifestThread(QThread):
+    progress_signal = Signal(object, object, object, object)  # (已处理字节, 总字节, 已完成文件, 文件总数)
+    finished_signal = Signal(object)  # 完成信号，生成时为 (条目, 是否中止)，校验时为 verify_tree 的结果
+    error_signal = Signal(str)  # 错误信号
+
+    # 进度信号的最小间隔（秒），文件很多时避免刷屏
+    PROGRESS_INTERVAL = 0.1
+
+    def __init__(self, root, algorithms=None, manifest_text=None, use_cache=True):
+        super().__init__()
+        self.root = root
+        self.algorithms = algorithms
+        self.manifest_text = manifest_text
+        self.use_cache = use_cache
+        self._stop = False
+        self._last_progress = 0.0
+
+    def stop(self):
+        self._stop = True
+
+    def _progress(self, done_bytes, total_bytes, done_files, total_files):
+        now = time.perf_counter()
+        if now - self._last_progress >= self.PROGRESS_INTERVAL or done_files == total_files:
+            self._last_progress = now
+            self.progress_signal.emit(done_bytes, total_bytes, done_files, total_files)
+
+    def run(self):
+        # SQLite 连接只能在创建它的线程中使用
+        cache = None
+        try:
+            cache = HashCache() if self.use_cache else None
+            if self.manifest_text is None:
+                result = hash_tree(self.root, self.algorithms, cache=cache, progress=self._progress,
+                                   should_stop=lambda: self._stop)
+            else:
+                result = verify_tree(self.root, self.manifest_text, cache=cache, progress=self._progress,
+                                     should_stop=lambda: self._stop)
+            self.finished_signal.emit(result)
+        except Exception as e:
+            self.error_signal.emit(str(e))
+        finally:
+            if cache is not None:
+                cache.close()
+
+
+class DirectoryHashDialog(QDialog):
+    """生成目录的哈希清单，或按已有清单校验目录"""
+
+    def __init__(self, algorithms=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("目录哈希清单")
+        self.setMinimumWidth(820)
+        self.setMinimumHeight(640)
+
+        self._thread = None
+        self._root = None
+        self._entries = []
+        self._algorithms = []
+        self._started = 0.0
+
+        layout = QVBoxLayout(self)
+
+        dir_layout = QHBoxLayout()
+        self.dir_label = QLabel("未选择目录", self)
+        dir_btn = QPushButton("选择目录", self)
+        dir_btn.clicked.connect(self._select_dir)
+        dir_layout.addWidget(self.dir_label, 1)
+        dir_layout.addWidget(dir_btn)
+        layout.addLayout(dir_layout)
+
+        algorithm_layout, self.algorithm_checks = create_algorithm_grid(
+            self, set(algorithms or []) | set(DEFAULT_ALGORITHMS))
+        layout.addLayout(algorithm_layout)
+
+        control_layout = QHBoxLayout()
+        control_layout.addWidget(QLabel("格式:", self))
+        self.format_combo = QComboBox(self)
+        self.format_combo.addItems(list(FORMATS.keys()))
+        self.format_combo.setCurrentText("JSON")
+        self.format_combo.setToolTip("sha256sum 格式只保存第一个选中的算法，MD5、SHA1、SHA2 以外的算法写成「算法 (路径) = 摘要」的标签行")
+        self.format_combo.currentTextChanged.connect(self._show_manifest)
+        control_layout.addWidget(self.format_combo)
+        self.cache_check = QCheckBox("使用缓存", self)
+        self.cache_check.setChecked(True)
+        self.cache_check.setToolTip("大小、修改时间和 inode 都未变的文件直接使用上次的摘要")
+        control_layout.addWidget(self.cache_check)
+        control_layout.addStretch()
+        self.build_btn = QPushButton("生成清单", self)
+        self.build_btn.clicked.connect(self._build)
+        self.verify_btn = QPushButton("校验清单", self)
+        self.verify_btn.clicked.connect(self._verify)
+        self.stop_btn = QPushButton("停止", self)
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self._stop)
+        self.save_btn = QPushButton("保存", self)
+        self.save_btn.clicked.connect(self._save)
+        for button in (self.build_btn, self.verify_btn, self.stop_btn, self.save_btn):
+            control_layout.addWidget(button)
+        layout.addLayout(control_layout)
+
+        status_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setVisible(False)
+        self.status_label = QLabel("", self)
+        status_layout.addWidget(self.progress_bar, 1)
+        status_layout.addWidget(self.status_label)
+        layout.addLayout(status_layout)
+
+        self.result_edit = QTextEdit(self)
+        self.result_edit.setReadOnly(True)
+        self.result_edit.setStyleSheet(f"font: {FONTS['mono']};")
+        layout.addWidget(self.result_edit, 1)
+
+    def _select_dir(self):
+        path = QFileDialog.getExistingDirectory(self, "选择目录")
+        if path:
+            self._root = path
+            self.dir_label.setText(path)
+
+    def _selected_algorithms(self) -> list:
+        return [algorithm for algorithm, check in self.algorithm_checks.items() if check.isChecked()]
+
+    def _build(self):
+        if self._thread is not None:
+            return
+        if self._root is None:
+            QMessageBox.warning(self, "警告", "请先选择目录")
+            return
+        algorithms = self._selected_algorithms()
+        if not algorithms:
+            QMessageBox.warning(self, "警告", "请至少选择一种算法")
+            return
+        # sha256sum 格式优先使用 SHA256
+        if "SHA256 (256位)" in algorithms:
+            algorithms.remove("SHA256 (256位)")
+            algorithms.insert(0, "SHA256 (256位)")
+        self._algorithms = algorithms
+        self._start(ManifestThread(self._root, algorithms, use_cache=self.cache_check.isChecked()))
+
+    def _verify(self):
+        if self._thread is not None:
+            return
+        if self._root is None:
+            QMessageBox.warning(self, "警告", "请先选择目录")
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "选择清单", "", "清单文件 (*.json *.csv *.sha256 *.txt *sum);;所有文件 (*.*)")
+        if not path:
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            parse_manifest(text)
+        except Exception as e:
+            QMessageBox.warning(self, "错误", f"无法读取清单：{str(e)}")
+            return
+        self._start(ManifestThread(self._root, manifest_text=text, use_cache=self.cache_check.isChecked()))
+
+    def _start(self, thread):
+        self._entries = []
+        self.result_edit.clear()
+        for button in (self.build_btn, self.verify_btn, self.save_btn):
+            button.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.status_label.setText("正在列出文件…")
+        self._started = time.perf_counter()
+
+        self._thread = thread
+        self._thread.progress_signal.connect(self._on_progress)
+        self._thread.finished_signal.connect(self._on_finished)
+        self._thread.error_signal.connect(self._on_error)
+        self._thread.start()
+
+    def _stop(self):
+        if self._thread is not None:
+            self._thread.stop()
+
+    def _reset(self):
+        self._thread = None
+        for button in (self.build_btn, self.verify_btn, self.save_btn):
+            button.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        self.progress_bar.setVisible(False)
+
+    def _on_progress(self, done_bytes, total_bytes, done_files, total_files):
+        if total_bytes:
+            self.progress_bar.setValue(int(done_bytes * 1000 / total_bytes))
+        elif total_files:
+            self.progress_bar.setValue(int(done_files * 1000 / total_files))
+        elapsed = time.perf_counter() - self._started
+        speed = done_bytes / elapsed / (1 << 20) if elapsed > 0 else 0.0
+        self.status_label.setText(f"{done_files}/{total_files} 个文件，{speed:.1f} MB/s")
+
+    def _on_finished(self, result):
+        verifying = isinstance(result, dict)
+        self._reset()
+        elapsed = time.perf_counter() - self._started
+        if verifying:
+            self._show_verify(result, elapsed)
+            return
+        entries, stopped = result
+        self._entries = entries
+        cached = sum(1 for entry in entries if entry['cached'])
+        errors = [entry for entry in entries if entry['error'] is not None]
+        text = f"{len(entries)} 个文件（缓存命中 {cached}），{elapsed:.2f} 秒"
+        if errors:
+            text += f"，{len(errors)} 个读取失败"
+        self.status_label.setText(("已停止，" if stopped else "") + text)
+        self._show_manifest()
+        for entry in errors:
+            self.result_edit.append(f"# 错误: {entry['path']}: {entry['error']}")
+
+    def _show_manifest(self, *args):
+        if not self._entries:
+            return
+        self.result_edit.setPlainText(
+            format_manifest(self._entries, self._algorithms, FORMATS[self.format_combo.currentText()]))
+
+    def _show_verify(self, result, elapsed):
+        lines = []
+        for title, key in (("不匹配", 'failed'), ("缺失", 'missing'), ("清单中没有", 'extra')):
+            lines += [f"{title}: {path}" for path in result[key]]
+        lines += [f"读取失败: {path}: {message}" for path, message in result['errors']]
+        if not lines:
+            lines.append("全部文件校验通过")
+        self.result_edit.setPlainText("\n".join(lines))
+        text = (f"通过 {len(result['ok'])}，不匹配 {len(result['failed'])}，缺失 {len(result['missing'])}，"
+                f"新增 {len(result['extra'])}，{elapsed:.2f} 秒")
+        self.status_label.setText(("已停止，" if result['stopped'] else "") + text)
+
+    def _on_error(self, message):
+        self._reset()
+        self.status_label.setText("")
+        QMessageBox.warning(self, "错误", f"处理失败: {message}")
+
+    def _save(self):
+        if not self._entries:
+            QMessageBox.warning(self, "警告", "请先生成清单")
+            return
+        fmt = FORMATS[self.format_combo.currentText()]
+        # sha256sum 格式按算法命名，如 manifest.sha256、manifest.md5；带标签的行不对应某个 *sum 工具
+        if fmt != 'sum':
+            suffix = fmt
+        elif is_tagged(self._algorithms[0]):
+            suffix = 'txt'
+        else:
+            suffix = short_name(self._algorithms[0]).lower()
+        path, _ = QFileDialog.getSaveFileName(self, "保存清单", f"manifest.{suffix}", "所有文件 (*.*)")
+        if not path:
+            return
+        try:
+            with open(path, 'w', encoding='utf-8', newline="") as f:
+                f.write(format_manifest(self._entries, self._algorithms, fmt))
+            QMessageBox.information(self, "成功", f"清单已保存到 {path}")
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"保存失败：{str(e)}")
+
+    def done(self, result):
+        # Esc 只调用 reject()，不经过 closeEvent；关闭窗口也会走到这里
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread.wait()
+        super().done(result)
@@ -0,0 +1,176 @@
+"""像素数据的向量化文本格式化与流式导出
+
+每个像素按模板拼成定宽字节行：「前缀 + 十进制数字」整体按预先生成的字符串表查表，
+表项按 4 字节对齐存为 uint32，一次 np.take 填满一列；不足宽度的位置用 0 填充，
+最后用布尔掩码一次性去掉填充字节。整个过程没有逐像素的 Python 循环。
+按块处理并在线程池中并行（numpy 的取数和掩码压缩不持有 GIL），按顺序写入文件，
+内存占用与图片大小无关。
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import json
+import os
+import numpy as np
+
+FORMATS = {
+    "文本": 'text',
+    "CSV": 'csv',
+    "JSON": 'json',
+    "NPY": 'npy',
+    "原始字节": 'raw',
+}
+
+EXTENSIONS = {'text': 'txt', 'csv': 'csv', 'json': 'json', 'npy': 'npy', 'raw': 'bin'}
+
+# 每块处理的像素数
+CHUNK_PIXELS = 1 << 18
+
+
+def _pack(data: bytes, slots: int) -> np.ndarray:
+    """字节串右侧补 0 后按 uint32 打包"""
+    buffer = np.zeros(slots * 4, dtype=np.uint8)
+    buffer[:len(data)] = np.frombuffer(data, dtype=np.uint8)
+    return buffer.view(np.uint32)
+
+
+@lru_cache(maxsize=32)
+def token_table(prefix: str, count: int) -> np.ndarray:
+    """prefix + 0..count-1 的十进制字符串表，(count, 槽数) uint32"""
+    width = len(prefix.encode('utf-8')) + len(str(max(count - 1, 0)))
+    slots = -(-width // 4)
+    table = np.empty((count, slots), dtype=np.uint32)
+    for value in range(count):
+        table[value] = _pack(f"{prefix}{value}".encode('utf-8'), slots)
+    table.flags.writeable = False
+    return table
+
+
+def render(tokens: list, suffix: str, count: int, start: int, total: int, row_length: int,
+           sep: str, row_end: str, last: str) -> bytes:
+    """渲染第 start..start+count-1 个条目
+
+    tokens 为 [(前缀, 取值上限, 数值数组), ...]；每个条目以 suffix 结尾，
+    之后行内接 sep，行尾接 row_end，全部条目中的最后一个接 last。
+    """
+    tables = [token_table(prefix, limit) for prefix, limit, _ in tokens]
+    endings = [(suffix + text).encode('utf-8') for text in (sep, row_end, last)]
+    end_slots = max(1, -(-max(len(data) for data in endings) // 4))
+
+    total_slots = sum(table.shape[1] for table in tables) + end_slots
+    matrix = np.empty((count, total_slots), dtype=np.uint32)
+    column = 0
+    for table, (_, _, values) in zip(tables, tokens):
+        slots = table.shape[1]
+        if slots == 1:
+            np.take(table[:, 0], values, out=matrix[:, column])
+        else:
+            matrix[:, column:column + slots] = np.take(table, values, axis=0)
+        column += slots
+
+    # 结尾：先整列填入行内分隔符，再改写行尾和最后一个条目
+    matrix[:, column:] = _pack(endings[0], end_slots)
+    first_row_end = (row_length - 1 - start) % row_length
+    matrix[first_row_end::row_length, column:] = _pack(endings[1], end_slots)
+    if start <= total - 1 < start + count:
+        matrix[total - 1 - start, column:] = _pack(endings[2], end_slots)
+
+    data = matrix.view(np.uint8).reshape(-1)
+    return data[data != 0].tobytes()
+
+
+def pixel_array(image, include_alpha: bool) -> np.ndarray:
+    """(H, W, 3/4) uint8 像素数组"""
+    mode = 'RGBA' if include_alpha else 'RGB'
+    if image.mode != mode:
+        image = image.convert(mode)
+    return np.asarray(image)
+
+
+def _render_chunk(pixels: np.ndarray, fmt: str, separator: str, start: int, stop: int,
+                  total: int) -> bytes:
+    height, width, channels = pixels.shape
+    block = pixels.reshape(-1, channels)[start:stop]
+    count = stop - start
+
+    if fmt == 'csv':
+        y, x = np.divmod(np.arange(start, stop), width)
+        tokens = [("", width, x), (",", height, y)]
+        tokens += [(",", 256, block[:, channel]) for channel in range(channels)]
+        return render(tokens, "", count, start, total, width, "\n", "\n", "\n")
+
+    opening, closing = ("(", ")") if fmt == 'text' else ("[", "]")
+    tokens = [(opening if channel == 0 else ",", 256, block[:, channel])
+              for channel in range(channels)]
+    if fmt == 'text':
+        return render(tokens, closing, count, start, total, width, separator, "\n", "")
+    if fmt == 'json':
+        return render(tokens, closing, count, start, total, width, ",", ",\n", "")
+    raise ValueError(f"不支持的文本格式: {fmt}")
+
+
+def iter_text(pixels: np.ndarray, fmt: str = 'text', separator: str = "\n",
+              limit: int = None, chunk: int = CHUNK_PIXELS, workers: int = None):
+    """按块生成格式化后的字节串（多线程并行，按顺序产出）
+
+    text: 与原输出一致的 (r,g,b) 格式，行内用 separator 分隔、行末换行、最后不换行；
+    csv: x,y,r,g,b[,a] 表头加逐像素一行；json: {"width","height","channels","pixels":[[r,g,b],...]}。
+    limit 不为空时只输出前 limit 个像素（用于预览）。
+    """
+    height, width, channels = pixels.shape
+    total = height * width if limit is None else min(limit, height * width)
+
+    if fmt == 'csv':
+        yield (",".join(['x', 'y', 'r', 'g', 'b', 'a'][:2 + channels]) + "\n").encode('ascii')
+    elif fmt == 'json':
+        yield json.dumps({'width': width, 'height': height, 'channels': channels})[:-1].encode('ascii')
+        yield b', "pixels": [\n'
+
+    starts = range(0, total, chunk)
+    if len(starts) <= 1:
+        for start in starts:
+            yield _render_chunk(pixels, fmt, separator, start, min(start + chunk, total), total)
+    else:
+        workers = workers or min(8, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # 最多预先提交 2×workers 块，限制内存
+            pending = []
+            for start in starts:
+                pending.append(executor.submit(_render_chunk, pixels, fmt, separator,
+                                               start, min(start + chunk, total), total))
+                if len(pending) >= 2 * workers:
+                    yield pending.pop(0).result()
+            for future in pending:
+                yield future.result()
+
+    if fmt == 'json':
+        yield b"\n]}\n"
+
+
+def export(pixels: np.ndarray, path: str, fmt: str, separator: str = "\n", progress=None) -> int:
+    """将像素数组流式写入文件，返回写入的字节数"""
+    height, width, channels = pixels.shape
+    total = height * width
+    with open(path, 'wb') as f:
+        if fmt == 'npy':
+            np.lib.format.write_array(f, np.ascontiguousarray(pixels))
+        elif fmt == 'raw':
+            f.write(np.ascontiguousarray(pixels).tobytes())
+        else:
+            chunks = -(-total // CHUNK_PIXELS)
+            done = 0
+            for data in iter_text(pixels, fmt, separator):
+                f.write(data)
+                if progress is not None and data and chunks:
+                    done += 1
+                    progress(min(99, done * 100 // chunks))
+        if progress is not None:
+            progress(100)
+        return f.tell()
+
+
+def preview(pixels: np.ndarray, fmt: str, separator: str = "\n", limit: int = 2000) -> str:
+    """前 limit 个像素的文本预览（NPY/原始字节显示为十六进制）"""
+    if fmt in ('npy', 'raw'):
+        data = np.ascontiguousarray(pixels).reshape(-1)[:limit * pixels.shape[2]].tobytes()
+        return data.hex(' ')
+    return b"".join(iter_text(pixels, fmt, separator, limit=limit)).decode('utf-8')
@@ -0,0 +1,86 @@
+"""像素数据的宽高推断
+
+枚举像素总数的所有因数对 (宽, 高)，对每种排列在抽样的行上计算上下相邻行的相关系数：
+宽度正确时相邻行是图像中真正相邻的像素，相关性最高；宽度错误时行错位，相关性明显下降。
+很窄的宽度下"相邻行"其实是同一行里相距不远的像素，相关性同样很高，
+因此得分取相邻行相关系数减去错开约半行时的相关系数，只有真正的行宽会出现尖峰。
+每种候选只取固定数量的行和列，总耗时与像素总数基本无关。
+"""
+import math
+import numpy as np
+
+# 每种候选抽样的行数和列数
+SAMPLE_ROWS = 64
+SAMPLE_COLS = 512
+
+
+def factor_pairs(count: int, min_side: int = 2) -> list:
+    """count 的所有因数对 (宽, 高)，两边都不小于 min_side"""
+    if count <= 0:
+        return []
+    divisors = np.arange(1, math.isqrt(count) + 1)
+    divisors = divisors[count % divisors == 0]
+    widths = np.unique(np.concatenate((divisors, count // divisors)))
+    return [(int(w), count // int(w)) for w in widths
+            if w >= min_side and count // w >= min_side]
+
+
+def luminance(pixels: np.ndarray) -> np.ndarray:
+    """(像素数, 通道数) -> float32 亮度，用于打分"""
+    if pixels.ndim == 1 or pixels.shape[1] == 1:
+        return pixels.reshape(-1).astype(np.float32)
+    rgb = pixels[:, :3].astype(np.float32)
+    return rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)[:rgb.shape[1]]
+
+
+def _correlation(upper: np.ndarray, lower: np.ndarray) -> float:
+    upper = upper - upper.mean()
+    lower = lower - lower.mean()
+    denominator = math.sqrt(float(upper @ upper) * float(lower @ lower))
+    if denominator == 0:
+        # 纯色数据无法区分，完全相同时视为完全相关
+        return 1.0 if np.array_equal(upper, lower) else 0.0
+    return float(upper @ lower) / denominator
+
+
+def row_correlation(gray: np.ndarray, width: int) -> float:
+    """按 width 排列时的得分：抽样行与下一行的相关系数减去与错开约半行位置的相关系数"""
+    height = len(gray) // width
+    # 错开半行的位置可能落到下下行，抽样行要留出余量
+    last_row = max(0, height - 3)
+    rows = np.linspace(0, last_row, min(SAMPLE_ROWS, last_row + 1)).round().astype(np.int64)
+    cols = np.linspace(0, width - 1, min(SAMPLE_COLS, width)).round().astype(np.int64)
+    index = (rows[:, None] * width + cols[None, :]).ravel()
+    sample = gray[index]
+    vertical = _correlation(sample, gray[index + width])
+    # 半行偏移若恰好是真实宽度的整数倍会落回同一列，取相邻两个偏移中相关性较高的一个；
+    # 负相关（周期性纹理错开半周期）与无关同等看待
+    shifted = max(
+        0.0,
+        *(_correlation(sample, gray[np.minimum(index + width + offset, len(gray) - 1)])
+          for offset in (max(1, width // 2), width // 2 + 1))
+    )
+    return vertical - shifted
+
+
+def infer_layouts(pixels: np.ndarray, top: int = 8, min_side: int = 2) -> list:
+    """返回按得分降序排列的候选 [{'width', 'height', 'score'}, ...]"""
+    gray = luminance(pixels)
+    candidates = [
+        {'width': width, 'height': height, 'score': row_correlation(gray, width)}
+        for width, height in factor_pairs(len(gray), min_side)
+    ]
+    candidates.sort(key=lambda candidate: -candidate['score'])
+    return candidates[:top]
+
+
+def thumbnail(pixels: np.ndarray, width: int, height: int, size: int = 128) -> np.ndarray:
+    """按候选宽高排列后最近邻缩小的 (h, w, 3) uint8 缩略图"""
+    channels = pixels.shape[1]
+    scale = min(1.0, size / max(width, height))
+    rows = np.linspace(0, height - 1, max(1, round(height * scale))).round().astype(np.int64)
+    cols = np.linspace(0, width - 1, max(1, round(width * scale))).round().astype(np.int64)
+    image = pixels.reshape(height, width, channels)[rows[:, None], cols[None, :]]
+    if channels == 1:
+        image = np.repeat(image, 3, axis=2)
+    return np.ascontiguousarray(image[..., :3])
@@ -0,0 +1,142 @@
+"""像素文本的批量解析
+
+对整个缓冲区做一次数值扫描：用数字掩码的差分找出所有数字串的起止位置，
+最多三轮向量化运算得到数值，分隔符可以是任意非数字字符（换行、分号、空格、制表符……）。
+有括号时按括号分组校验每个像素的通道数，并检查取值范围。
+文件通过 mmap 按块读取，块边界对齐到 ')' 或非数字字符。
+"""
+import mmap
+import numpy as np
+
+# 每块扫描的字节数
+CHUNK_BYTES = 1 << 24
+
+_ZERO, _NINE = ord('0'), ord('9')
+_OPEN, _CLOSE, _MINUS = ord('('), ord(')'), ord('-')
+
+
+class PixelParseError(ValueError):
+    pass
+
+
+def _scan(segment: np.ndarray, offset: int, grouped: bool, channels: int, pixel_base: int):
+    """扫描一块数据，返回数值数组（uint8）"""
+    digit = (segment >= _ZERO) & (segment <= _NINE)
+    edges = np.diff(digit.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+    starts = np.flatnonzero(edges == 1)
+    lengths = np.flatnonzero(edges == -1) - starts
+
+    too_long = np.flatnonzero(lengths > 3)
+    if len(too_long):
+        position = offset + starts[too_long[0]]
+        raise PixelParseError(f"第 {pixel_base + too_long[0] // channels + 1} 个像素的数值超出范围（字节偏移 {position}）")
+
+    negative = np.flatnonzero(segment[np.maximum(starts - 1, 0)] == _MINUS)
+    negative = negative[starts[negative] > 0]
+    if len(negative):
+        position = offset + starts[negative[0]] - 1
+        raise PixelParseError(f"第 {pixel_base + negative[0] // channels + 1} 个像素包含负数（字节偏移 {position}）")
+
+    values = segment[starts].astype(np.uint16) - _ZERO
+    for k in (1, 2):
+        more = lengths > k
+        values[more] = values[more] * 10 + (segment[starts[more] + k] - _ZERO)
+
+    over = np.flatnonzero(values > 255)
+    if len(over):
+        position = offset + starts[over[0]]
+        raise PixelParseError(f"第 {pixel_base + over[0] // channels + 1} 个像素的数值 {values[over[0]]} 超出 0~255（字节偏移 {position}）")
+
+    if grouped:
+        # 每个数值属于它前面最近的 '('，各组的数值个数必须等于通道数
+        opens = np.flatnonzero(segment == _OPEN)
+        group = np.searchsorted(opens, starts)
+        counts = np.bincount(group, minlength=len(opens) + 1)
+        if counts[0]:
+            position = offset + starts[0]
+            raise PixelParseError(f"括号外出现数值（字节偏移 {position}）")
+        bad = np.flatnonzero(counts[1:] != channels)
+        if len(bad):
+            position = offset + opens[bad[0]]
+            raise PixelParseError(
+                f"第 {pixel_base + bad[0] + 1} 个像素有 {counts[bad[0] + 1]} 个数值，"
+                f"期望 {channels} 个（字节偏移 {position}）"
+            )
+
+    return values.astype(np.uint8)
+
+
+def detect_channels(buffer, default: int = 3) -> tuple:
+    """根据开头的数据判断是否带括号以及每个像素的通道数，返回 (grouped, channels)"""
+    head = np.frombuffer(buffer, dtype=np.uint8, count=min(len(buffer), 1 << 16))
+    opens = np.flatnonzero(head == _OPEN)
+    if len(opens) < 2:
+        return False, default
+    first = head[opens[0]:opens[1]]
+    digit = (first >= _ZERO) & (first <= _NINE)
+    count = int(np.count_nonzero(np.diff(digit.view(np.int8), prepend=np.int8(0)) == 1))
+    return True, count if count in (1, 2, 3, 4) else default
+
+
+def parse_buffer(buffer, channels: int = None, progress=None, default_channels: int = 3) -> np.ndarray:
+    """解析整个缓冲区（bytes 或 mmap），返回 (像素数, 通道数) uint8 数组
+
+    channels 为空时由括号分组自动判断，无括号时使用 default_channels。
+    """
+    size = len(buffer)
+    if size == 0:
+        raise PixelParseError("没有像素数据")
+    grouped, detected = detect_channels(buffer, default_channels)
+    channels = channels or detected
+    data = np.frombuffer(buffer, dtype=np.uint8)
+
+    parts = []
+    pixels = 0
+    start = 0
+    while start < size:
+        end = min(start + CHUNK_BYTES, size)
+        if end < size:
+            # 块边界对齐：有括号时切在 ')' 之后，否则切在非数字字符之后
+            if grouped:
+                cut = buffer.rfind(b')', start, end)
+            else:
+                tail = data[start:end]
+                separators = np.flatnonzero((tail < _ZERO) | (tail > _NINE))
+                cut = start + separators[-1] if len(separators) else -1
+            if cut < start:
+                raise PixelParseError(f"字节偏移 {start} 之后找不到像素分隔符")
+            end = cut + 1
+
+        values = _scan(data[start:end], start, grouped, channels, pixels)
+        parts.append(values)
+        pixels += len(values) // channels
+        start = end
+        if progress is not None:
+            progress(int(start * 100 / size))
+
+    values = np.concatenate(parts) if len(parts) > 1 else parts[0]
+    if len(values) == 0:
+        raise PixelParseError("没有有效的像素数据")
+    if len(values) % channels:
+        raise PixelParseError(f"数值个数 {len(values)} 不是通道数 {channels} 的整数倍")
+    return values.reshape(-1, channels)
+
+
+def parse_file(path: str, channels: int = None, progress=None, default_channels: int = 3) -> np.ndarray:
+    """通过 mmap 直接解析文件，不把文件内容读入内存"""
+    with open(path, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            raise PixelParseError("文件为空")
+        message = None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            try:
+                # 结果为新数组，不引用 mmap，可以安全关闭
+                return parse_buffer(mapped, channels, progress, default_channels)
+            except PixelParseError as e:
+                # 异常的回溯会持有 mmap 上的数组视图，先释放再关闭
+                message = str(e)
+    raise PixelParseError(message)
+
+
+def parse_text(text: str, channels: int = None, progress=None, default_channels: int = 3) -> np.ndarray:
+    return parse_buffer(text.encode('utf-8'), channels, progress, default_channels)
@@ -9,63 +9,29 @@ from PIL import Image
 import numpy as np
 import style
 from style import FONTS
-from io import StringIO
+import os
+from . import pixel_format
 
-class PixelConvertThread(QThread):
+class PixelExportThread(QThread):
     progress_signal = Signal(int)  # 进度信号
-    finished_signal = Signal(str)  # 完成信号
+    finished_signal = Signal(int)  # 完成信号，传递写入的字节数
+    error_signal = Signal(str)  # 错误信号
     
-    def __init__(self, image, include_alpha, separator):
+    def __init__(self, pixels, path, fmt, separator):
         super().__init__()
-        self.image = image
-        self.include_alpha = include_alpha
+        self.pixels = pixels
+        self.path = path
+        self.fmt = fmt
         self.separator = separator
         
     def run(self):
-        if self.image is None:
-            self.finished_signal.emit("请先选择一张图片")
-            return
-            
-        # 确保图片是RGBA模式
-        if self.image.mode != 'RGBA':
-            self.image = self.image.convert('RGBA')
-            
-        img_array = np.array(self.image)
-        height, width = img_array.shape[:2]
-        total_pixels = height * width
-        processed_pixels = 0
-        
-        # 使用StringIO来优化字符串拼接
-        output = StringIO()
-        
-        for y in range(height):
-            row_pixels = []
-            for x in range(width):
-                if self.include_alpha:
-                    # 包含alpha通道
-                    p = img_array[y, x]
-                    row_pixels.append(f"({p[0]},{p[1]},{p[2]},{p[3]})")
-                else:
-                    # 不包含alpha通道
-                    p = img_array[y, x]
-                    row_pixels.append(f"({p[0]},{p[1]},{p[2]})")
-                
-                processed_pixels += 1
-                if processed_pixels % width == 0:
-                    progress = int((processed_pixels / total_pixels) * 100)
-                    self.progress_signal.emit(progress)
-            
-            # 使用选定的分隔符连接每行的像素
-            output.write(self.separator.join(row_pixels))
-            output.write("\n")  # 每行末尾添加换行符
-            
-            # 让出一些CPU时间
-            if y % 10 == 0:
-                self.msleep(1)
-        
-        result = output.getvalue().rstrip()  # 移除最后一个换行符
-        output.close()
-        self.finished_signal.emit(result)
+        try:
+            # 向量化格式化并分块直接写入文件，不在内存中拼接完整文本
+            size = pixel_format.export(self.pixels, self.path, self.fmt, self.separator,
+                                       progress=self.progress_signal.emit)
+            self.finished_signal.emit(size)
+        except Exception as e:
+            self.error_signal.emit(str(e))
 
 class PixelExtractPlugin(Plugin):
     # 预定义的分隔符选项
@@ -90,8 +56,11 @@ class PixelExtractPlugin(Plugin):
         self.alpha_checkbox = None
         self.output_text = None
         self.progress_bar = None
-        self.convert_thread = None
+        self.export_thread = None
         self.convert_btn = None
+        self.export_btn = None
+        self.format_combo = None
+        self.file_path = None
 
     @property
     def name(self) -> str:
@@ -132,10 +101,27 @@ class PixelExtractPlugin(Plugin):
         self.convert_btn.setStyleSheet(style.get_button_style())
         self.convert_btn.clicked.connect(self.convert_image)
         
+        # 导出按钮
+        self.export_btn = QPushButton("导出到文件")
+        self.export_btn.setFont(FONTS['default'])
+        self.export_btn.setStyleSheet(style.get_button_style())
+        self.export_btn.clicked.connect(self.export_image)
+        
         control_layout.addWidget(select_btn)
         control_layout.addWidget(self.convert_btn)
+        control_layout.addWidget(self.export_btn)
         settings_layout.addLayout(control_layout)
 
+        # 导出格式
+        format_layout = QHBoxLayout()
+        self.format_combo = QComboBox()
+        self.format_combo.setFont(FONTS['default'])
+        self.format_combo.addItems(pixel_format.FORMATS.keys())
+        self.format_combo.currentTextChanged.connect(self.update_format)
+        format_layout.addWidget(QLabel("格式："))
+        format_layout.addWidget(self.format_combo)
+        settings_layout.addLayout(format_layout)
+
         # 分隔符选项
         separator_layout = QHBoxLayout()
         self.separator_combo = QComboBox()
@@ -181,8 +167,8 @@ class PixelExtractPlugin(Plugin):
         self.image_label.setText("请选择图片")
         preview_layout.addWidget(self.image_label, alignment=Qt.AlignCenter)
 
-        # 3. 输出区域
-        output_group = QGroupBox("像素数据", parent)
+        # 3. 输出区域（只显示预览，完整数据导出到文件）
+        output_group = QGroupBox("像素数据预览", parent)
         output_group.setFont(FONTS['title'])
         output_group.setStyleSheet(style.get_group_box_style())
         output_layout = QVBoxLayout(output_group)
@@ -198,40 +184,87 @@ class PixelExtractPlugin(Plugin):
         layout.addWidget(preview_group)
         layout.addWidget(output_group)
 
+    # 界面中预览的像素数
+    PREVIEW_PIXELS = 2000
+
+    def current_separator(self) -> str:
+        """当前分隔符（自定义时读取输入框）"""
+        if self.separator_combo is not None and self.separator_combo.currentText() == "自定义...":
+            return self.separator_input.text()
+        return self.separator
+
+    def current_format(self) -> str:
+        return pixel_format.FORMATS[self.format_combo.currentText()]
+
     def convert_image(self):
-        """转换图片为像素数据"""
+        """生成像素数据预览"""
         if self.image is None:
             QMessageBox.warning(None, "警告", "请先选择一张图片")
             return
             
-        print(f"开始转换，Alpha通道状态为: {self.include_alpha}")  # 调试信息
+        try:
+            pixels = pixel_format.pixel_array(self.image, self.include_alpha)
+            total = pixels.shape[0] * pixels.shape[1]
+            text = pixel_format.preview(pixels, self.current_format(), self.current_separator(),
+                                        self.PREVIEW_PIXELS)
+            if total > self.PREVIEW_PIXELS:
+                text += f"\n\n... 仅预览前 {self.PREVIEW_PIXELS} 个像素（共 {total} 个），完整数据请导出到文件"
+            self.output_text.setPlainText(text)
+        except Exception as e:
+            QMessageBox.warning(None, "错误", f"转换失败：{str(e)}")
+
+    def export_image(self):
+        """将全部像素数据流式导出到文件"""
+        if self.image is None:
+            QMessageBox.warning(None, "警告", "请先选择一张图片")
+            return
+        if self.export_thread is not None:
+            return
+            
+        fmt = self.current_format()
+        ext = pixel_format.EXTENSIONS[fmt]
+        default_name = ""
+        if self.file_path:
+            default_name = os.path.splitext(self.file_path)[0] + "_pixels." + ext
+        path, _ = QFileDialog.getSaveFileName(
+            None, "导出像素数据", default_name, f"{self.format_combo.currentText()} (*.{ext});;所有文件 (*.*)"
+        )
+        if not path:
+            return
         
-        # 禁用转换按钮，显示进度条
+        # 禁用按钮，显示进度条
         self.convert_btn.setEnabled(False)
+        self.export_btn.setEnabled(False)
         self.progress_bar.setValue(0)
         self.progress_bar.setVisible(True)
-        self.output_text.clear()
         
-        # 创建并启动转换线程
-        self.convert_thread = PixelConvertThread(
-            self.image, 
-            self.include_alpha,  # 传递当前的alpha通道状态
-            self.separator
+        self.export_thread = PixelExportThread(
+            pixel_format.pixel_array(self.image, self.include_alpha),
+            path, fmt, self.current_separator()
         )
-        self.convert_thread.progress_signal.connect(self.update_progress)
-        self.convert_thread.finished_signal.connect(self.conversion_finished)
-        self.convert_thread.start()
+        self.export_thread.progress_signal.connect(self.update_progress)
+        self.export_thread.finished_signal.connect(lambda size, path=path: self.export_finished(path, size))
+        self.export_thread.error_signal.connect(self.export_error)
+        self.export_thread.start()
     
     def update_progress(self, value):
         """更新进度条"""
         self.progress_bar.setValue(value)
     
-    def conversion_finished(self, result):
-        """转换完成的处理"""
-        self.output_text.setText(result)
+    def _export_done(self):
         self.progress_bar.setVisible(False)
         self.convert_btn.setEnabled(True)
-        self.convert_thread = None
+        self.export_btn.setEnabled(True)
+        self.export_thread = None
+    
+    def export_finished(self, path, size):
+        """导出完成的处理"""
+        self._export_done()
+        QMessageBox.information(None, "完成", f"已导出 {size} 字节到\n{path}")
+    
+    def export_error(self, message):
+        self._export_done()
+        QMessageBox.warning(None, "错误", f"导出失败：{message}")
 
     def select_image(self):
         """选择图片"""
@@ -252,6 +285,7 @@ class PixelExtractPlugin(Plugin):
                     print(f"转换后图片模式: {img.mode}")  # 调试信息
                 
                 self.image = img
+                self.file_path = file_path
                 
                 # 检查numpy数组的形状
                 img_array = np.array(self.image)
@@ -268,9 +302,8 @@ class PixelExtractPlugin(Plugin):
                 )
                 self.image_label.setPixmap(scaled_pixmap)
                 
-                # 如果已经勾选了alpha通道，自动转换
-                if self.include_alpha:
-                    self.convert_image()
+                # 预览只格式化少量像素，选择后直接生成
+                self.convert_image()
             except Exception as e:
                 QMessageBox.warning(None, "错误", f"无法打开图片：{str(e)}")
 
@@ -283,6 +316,11 @@ class PixelExtractPlugin(Plugin):
         if self.image is not None:
             self.convert_image()
 
+    def update_format(self, text: str):
+        """切换导出格式时刷新预览"""
+        if self.image is not None:
+            self.convert_image()
+
     def update_separator(self, text: str):
         """更新分隔符选项"""
         if text == "自定义...":
@@ -2,75 +2,48 @@ from .. import Plugin
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, 
                               QLabel, QPushButton, QCheckBox, QLineEdit,
                               QFileDialog, QMessageBox, QTextEdit, QProgressBar,
-                              QSpinBox, QComboBox)
-from PySide6.QtGui import QPixmap, QImage
-from PySide6.QtCore import Qt, QThread, Signal
+                              QSpinBox, QComboBox, QListWidget, QListWidgetItem,
+                              QListView)
+from PySide6.QtGui import QPixmap, QImage, QIcon
+from PySide6.QtCore import Qt, QThread, Signal, QSize
 from PIL import Image
-import numpy as np
-import re
+import os
 import style
 from style import FONTS
-from io import StringIO
-import math
+from . import pixel_parse, pixel_layout
+
+# 自动推断时展示的候选数量和缩略图边长
+LAYOUT_CANDIDATES = 8
+THUMBNAIL_SIZE = 96
 
 class PixelParseThread(QThread):
     progress_signal = Signal(int)  # 进度信号
-    finished_signal = Signal(object)  # 完成信号，传递生成的图片
+    finished_signal = Signal(object, object)  # 完成信号，传递 (像素数, 通道数) 数组和候选宽高列表
     error_signal = Signal(str)  # 错误信号
     
-    def __init__(self, pixels, width, height, has_alpha):
+    def __init__(self, source, default_channels, from_file=False, infer_layout=False):
         super().__init__()
-        self.pixels = pixels  # 直接传入像素列表
-        self.width = width
-        self.height = height
-        self.has_alpha = has_alpha
+        self.source = source  # 像素文本或文件路径
+        self.default_channels = default_channels
+        self.from_file = from_file
+        self.infer_layout = infer_layout  # 是否推断宽高
         
     def run(self):
         try:
-            # 创建numpy数组
-            if self.has_alpha:
-                img_array = np.zeros((self.height, self.width, 4), dtype=np.uint8)
-            else:
-                img_array = np.zeros((self.height, self.width, 3), dtype=np.uint8)
-            
-            # 像素值正则表达式
-            if self.has_alpha:
-                pattern = r'^\((\d+),(\d+),(\d+),(\d+)\)$'
+            # 整个缓冲区一次数值扫描；带括号的数据自动识别通道数
+            if self.from_file:
+                pixels = pixel_parse.parse_file(self.source, progress=self.progress_signal.emit,
+                                                default_channels=self.default_channels)
             else:
-                pattern = r'^\((\d+),(\d+),(\d+)\)$'
-            
-            # 处理每个像素
-            for i, pixel in enumerate(self.pixels):
-                # 计算坐标
-                y = i // self.width
-                x = i % self.width
-                
-                pixel = pixel.strip()
-                match = re.match(pattern, pixel)
-                if not match:
-                    self.error_signal.emit(f"第 {i+1} 个像素格式错误：{pixel}")
-                    return
-                
-                # 提取RGB(A)值
-                values = [int(v) for v in match.groups()]
-                img_array[y, x] = values
-                
-                # 更新进度
-                if i % self.width == 0:
-                    progress = int((y + 1) / self.height * 100)
-                    self.progress_signal.emit(progress)
-                    
-                    # 每处理一行让出一些CPU时间
-                    self.msleep(1)
-            
-            # 创建PIL图片
-            if self.has_alpha:
-                img = Image.fromarray(img_array, 'RGBA')
-            else:
-                img = Image.fromarray(img_array, 'RGB')
-            
-            self.finished_signal.emit(img)
-            
+                pixels = pixel_parse.parse_text(self.source, progress=self.progress_signal.emit,
+                                                default_channels=self.default_channels)
+            layouts = None
+            if self.infer_layout:
+                layouts = pixel_layout.infer_layouts(pixels, LAYOUT_CANDIDATES)
+                for layout in layouts:
+                    layout['thumbnail'] = pixel_layout.thumbnail(
+                        pixels, layout['width'], layout['height'], THUMBNAIL_SIZE)
+            self.finished_signal.emit(pixels, layouts)
         except Exception as e:
             self.error_signal.emit(str(e))
 
@@ -83,12 +56,18 @@ class PixelToImagePlugin(Plugin):
         self.width_spin = None
         self.height_spin = None
         self.alpha_checkbox = None
+        self.auto_checkbox = None
+        self.layout_list = None
+        self.pixels = None
         self.input_text = None
         self.preview_label = None
         self.progress_bar = None
         self.parse_thread = None
         self.convert_btn = None
         self.save_btn = None
+        self.file_path = None
+        self.file_label = None
+        self.image = None
 
     @property
     def name(self) -> str:
@@ -137,6 +116,11 @@ class PixelToImagePlugin(Plugin):
         size_layout.addWidget(self.width_spin)
         size_layout.addWidget(height_label)
         size_layout.addWidget(self.height_spin)
+
+        # 按像素总数的因数对枚举宽高，以相邻行相关性打分
+        self.auto_checkbox = QCheckBox("自动推断宽高")
+        self.auto_checkbox.setFont(FONTS['default'])
+        size_layout.addWidget(self.auto_checkbox)
         settings_layout.addLayout(size_layout)
 
         # Alpha通道选项
@@ -163,9 +147,22 @@ class PixelToImagePlugin(Plugin):
         self.input_text = QTextEdit()
         self.input_text.setFont(FONTS['default'])
         self.input_text.setMinimumHeight(100)
-        self.input_text.setPlaceholderText("请输入像素数据，每行表示一个像素，像素格式为(R,G,B)或(R,G,B,A)")
+        self.input_text.setPlaceholderText("请输入像素数据，像素格式为(R,G,B)或(R,G,B,A)，分隔符不限；也可以直接打开文件")
+        self.input_text.textChanged.connect(self.clear_file)
         input_layout.addWidget(self.input_text)
 
+        # 大文件直接从磁盘解析，不载入文本框
+        file_layout = QHBoxLayout()
+        open_btn = QPushButton("打开文件")
+        open_btn.setFont(FONTS['default'])
+        open_btn.setStyleSheet(style.get_button_style())
+        open_btn.clicked.connect(self.open_file)
+        self.file_label = QLabel("")
+        self.file_label.setFont(FONTS['default'])
+        file_layout.addWidget(open_btn)
+        file_layout.addWidget(self.file_label, 1)
+        input_layout.addLayout(file_layout)
+
         # 3. 预览和控制区域
         preview_group = QGroupBox("预览", parent)
         preview_group.setFont(FONTS['title'])
@@ -181,6 +178,18 @@ class PixelToImagePlugin(Plugin):
         self.preview_label.setText("等待转换")
         preview_layout.addWidget(self.preview_label, alignment=Qt.AlignCenter)
 
+        # 自动推断的候选宽高，点击切换
+        self.layout_list = QListWidget()
+        self.layout_list.setViewMode(QListView.IconMode)
+        self.layout_list.setIconSize(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        self.layout_list.setResizeMode(QListView.Adjust)
+        self.layout_list.setMovement(QListView.Static)
+        self.layout_list.setFixedHeight(THUMBNAIL_SIZE + 60)
+        self.layout_list.setFont(FONTS['default'])
+        self.layout_list.itemClicked.connect(self.apply_layout)
+        self.layout_list.setVisible(False)
+        preview_layout.addWidget(self.layout_list)
+
         # 控制按钮
         button_layout = QHBoxLayout()
         
@@ -218,30 +227,37 @@ class PixelToImagePlugin(Plugin):
         """更新alpha通道选项"""
         self.has_alpha = (state == 2)  # Qt.Checked 的值是 2
 
+    def open_file(self):
+        """选择像素数据文件，解析时通过 mmap 直接读取"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            None, "打开像素数据", "", "文本文件 (*.txt *.csv);;所有文件 (*.*)"
+        )
+        if not file_path:
+            return
+        # 文本框只显示开头部分
+        with open(file_path, 'rb') as f:
+            head = f.read(4096).decode('utf-8', errors='replace')
+        self.input_text.blockSignals(True)
+        self.input_text.setPlainText(head)
+        self.input_text.blockSignals(False)
+        self.file_path = file_path
+        self.file_label.setText(f"{os.path.basename(file_path)}（{os.path.getsize(file_path)} 字节，文本框仅显示开头）")
+
+    def clear_file(self):
+        """手动编辑文本后改为解析文本框内容"""
+        if self.file_path is not None:
+            self.file_path = None
+            self.file_label.setText("")
+
     def convert_pixels(self):
         """转换像素数据为图片"""
-        pixel_text = self.input_text.toPlainText().strip()
-        if not pixel_text:
-            QMessageBox.warning(None, "警告", "请输入像素数据")
-            return
-            
-        # 分割像素数据并移除空行
-        all_pixels = []
-        for p in pixel_text.split('\n'):
-            p = p.strip()
-            if p and p.startswith('(') and p.endswith(')'):
-                all_pixels.append(p)
-        
-        if not all_pixels:
-            QMessageBox.warning(None, "警告", "没有有效的像素数据")
-            return
-            
-        # 检查像素总数是否匹配
-        total_pixels = len(all_pixels)
-        expected_pixels = self.width * self.height
-        if total_pixels != expected_pixels:
-            QMessageBox.warning(None, "警告", f"像素数量不匹配：期望 {expected_pixels} 个，实际 {total_pixels} 个")
-            return
+        if self.file_path is not None:
+            source, from_file = self.file_path, True
+        else:
+            source, from_file = self.input_text.toPlainText().strip(), False
+            if not source:
+                QMessageBox.warning(None, "警告", "请输入像素数据")
+                return
         
         # 禁用转换按钮，显示进度条
         self.convert_btn.setEnabled(False)
@@ -250,16 +266,73 @@ class PixelToImagePlugin(Plugin):
         self.progress_bar.setVisible(True)
         
         # 创建并启动解析线程
-        self.parse_thread = PixelParseThread(
-            all_pixels,
-            self.width,
-            self.height,
-            self.has_alpha
-        )
+        self.parse_thread = PixelParseThread(source, 4 if self.has_alpha else 3, from_file,
+                                             self.auto_checkbox.isChecked())
         self.parse_thread.progress_signal.connect(self.update_progress)
-        self.parse_thread.finished_signal.connect(self.conversion_finished)
+        self.parse_thread.finished_signal.connect(self.parse_finished)
         self.parse_thread.error_signal.connect(self.conversion_error)
         self.parse_thread.start()
+
+    def parse_finished(self, pixels, layouts):
+        """解析完成后检查像素数量并生成图片"""
+        self.parse_thread = None
+        total_pixels, channels = pixels.shape
+        if channels not in (3, 4):
+            self.conversion_error(f"不支持 {channels} 通道的像素数据")
+            return
+
+        self.pixels = pixels
+        self.show_layouts(layouts)
+        if layouts:
+            # 自动采用得分最高的宽高
+            self.set_size(layouts[0]['width'], layouts[0]['height'])
+        elif layouts is not None:
+            self.conversion_error(f"像素数量 {total_pixels} 无法排列为宽高都不小于 2 的图片")
+            return
+
+        expected_pixels = self.width * self.height
+        if total_pixels != expected_pixels:
+            self.conversion_error(f"像素数量不匹配：期望 {expected_pixels} 个，实际 {total_pixels} 个，"
+                                  f"可勾选「自动推断宽高」")
+            return
+        
+        # 带括号的数据以实际通道数为准
+        self.alpha_checkbox.setChecked(channels == 4)
+        image = Image.fromarray(pixels.reshape(self.height, self.width, channels))
+        self.conversion_finished(image)
+
+    def show_layouts(self, layouts):
+        """以缩略图列出候选宽高"""
+        self.layout_list.clear()
+        self.layout_list.setVisible(bool(layouts))
+        for layout in layouts or []:
+            thumbnail = layout['thumbnail']
+            height, width = thumbnail.shape[:2]
+            data = thumbnail.tobytes()
+            qimage = QImage(data, width, height, width * 3, QImage.Format_RGB888)
+            item = QListWidgetItem(QIcon(QPixmap.fromImage(qimage)),
+                                   f"{layout['width']}×{layout['height']}\n{layout['score']:.3f}")
+            item.setData(Qt.UserRole, (layout['width'], layout['height']))
+            item.setToolTip(f"宽 {layout['width']}，高 {layout['height']}，相关性得分 {layout['score']:.4f}")
+            self.layout_list.addItem(item)
+        if layouts:
+            self.layout_list.setCurrentRow(0)
+
+    def set_size(self, width, height):
+        """设置宽高，推断结果可能超出输入框默认范围"""
+        self.width_spin.setMaximum(max(self.width_spin.maximum(), width))
+        self.height_spin.setMaximum(max(self.height_spin.maximum(), height))
+        self.width_spin.setValue(width)
+        self.height_spin.setValue(height)
+
+    def apply_layout(self, item):
+        """按选中的候选宽高重新生成图片"""
+        if self.pixels is None:
+            return
+        width, height = item.data(Qt.UserRole)
+        self.set_size(width, height)
+        channels = self.pixels.shape[1]
+        self.conversion_finished(Image.fromarray(self.pixels.reshape(height, width, channels)))
     
     def update_progress(self, value):
         """更新进度条"""
@@ -282,6 +355,7 @@ class PixelToImagePlugin(Plugin):
         self.convert_btn.setEnabled(True)
         self.save_btn.setEnabled(True)
         self.parse_thread = None
+        self.image = image
     
     def conversion_error(self, error_message):
         """转换错误的处理"""
@@ -0,0 +1,183 @@
+"""LSB 批量嵌入/提取
+
+可在界面中调用，也可以无界面运行：
+
+    python -m plugins.stego.lsb_batch embed 载体目录 载荷 输出目录 [--bits 2 --key 口令]
+    python -m plugins.stego.lsb_batch extract 图片目录 输出目录 [--bits 2 --key 口令]
+
+载荷可以是单个文件（所有载体共用）、目录（按文件名排序循环分配）或 random:N（每张图 N 字节随机数据）。
+"""
+from PIL import Image
+import numpy as np
+import argparse
+import os
+import time
+
+from . import lsb_codec
+from ..batch_common import list_images, output_name, run_tasks, print_progress, report
+
+IMAGE_EXTENSIONS = ('.png', '.bmp', '.jpg', '.jpeg', '.tif', '.tiff', '.webp')
+
+EMBED_FIELDS = ['cover', 'output', 'payload', 'payload_bytes', 'capacity_bytes',
+                'capacity_used', 'seconds', 'error']
+EXTRACT_FIELDS = ['image', 'output', 'payload_bytes', 'seconds', 'error']
+
+
+def resolve_payloads(source, count: int) -> list:
+    """把载荷来源展开为每张载体对应的载荷描述
+
+    描述为 bytes（直接嵌入）、文件路径或 ('random', N)，
+    文件在子进程中读取，避免大载荷在进程间反复序列化。
+    """
+    if isinstance(source, (bytes, bytearray)):
+        return [bytes(source)] * count
+    if source.startswith('random:'):
+        return [('random', int(source.split(':', 1)[1]))] * count
+    if os.path.isdir(source):
+        files = sorted(
+            os.path.join(source, name) for name in os.listdir(source)
+            if os.path.isfile(os.path.join(source, name))
+        )
+        if not files:
+            raise ValueError(f"载荷目录为空: {source}")
+        return [files[i % len(files)] for i in range(count)]
+    if os.path.isfile(source):
+        return [source] * count
+    raise ValueError(f"无效的载荷来源: {source}")
+
+
+def _load_payload(spec) -> tuple:
+    """返回 (载荷数据, 清单中显示的载荷名)"""
+    if isinstance(spec, bytes):
+        return spec, '<text>'
+    if isinstance(spec, tuple):
+        return os.urandom(spec[1]), f'random:{spec[1]}'
+    with open(spec, 'rb') as f:
+        return f.read(), spec
+
+
+def _load_pixels(path: str, use_alpha: bool) -> np.ndarray:
+    with Image.open(path) as img:
+        target_mode = 'RGBA' if use_alpha else 'RGB'
+        if img.mode != target_mode:
+            img = img.convert(target_mode)
+        return np.asarray(img)
+
+
+def _embed_one(task: dict) -> dict:
+    """子进程：嵌入单张图片"""
+    row = {'cover': task['cover'], 'output': task['output'], 'payload': '',
+           'payload_bytes': 0, 'capacity_bytes': 0, 'capacity_used': 0.0,
+           'seconds': 0.0, 'error': ''}
+    start = time.perf_counter()
+    try:
+        payload, row['payload'] = _load_payload(task['payload'])
+        pixels = _load_pixels(task['cover'], task['use_alpha'])
+        capacity = lsb_codec.capacity(pixels, task['bits'])
+        row['payload_bytes'] = len(payload)
+        row['capacity_bytes'] = capacity
+        row['capacity_used'] = round(len(payload) / capacity, 6) if capacity else 0.0
+
+        stego = lsb_codec.embed(pixels, payload, task['bits'], task['key'])
+        Image.fromarray(stego).save(task['output'], format='PNG')
+    except Exception as e:
+        row['error'] = str(e)
+    row['seconds'] = round(time.perf_counter() - start, 6)
+    return row
+
+
+def _extract_one(task: dict) -> dict:
+    """子进程：从单张图片提取载荷"""
+    row = {'image': task['image'], 'output': task['output'], 'payload_bytes': 0,
+           'seconds': 0.0, 'error': ''}
+    start = time.perf_counter()
+    try:
+        pixels = _load_pixels(task['image'], task['use_alpha'])
+        payload = lsb_codec.extract(pixels, task['bits'], task['key'])
+        if payload is None:
+            row['error'] = "未找到隐写信息"
+        else:
+            with open(task['output'], 'wb') as f:
+                f.write(payload)
+            row['payload_bytes'] = len(payload)
+    except Exception as e:
+        row['error'] = str(e)
+    row['seconds'] = round(time.perf_counter() - start, 6)
+    return row
+
+
+def batch_embed(cover_dir: str, payload_source, output_dir: str,
+                template: str = "{stem}_stego.png", bits: int = 1, key: str = None,
+                use_alpha: bool = False, workers: int = None, manifest: str = None,
+                progress=None) -> list:
+    """并行嵌入目录中的所有载体，输出统一保存为PNG并写出CSV清单"""
+    covers = list_images(cover_dir, IMAGE_EXTENSIONS)
+    payloads = resolve_payloads(payload_source, len(covers))
+    os.makedirs(output_dir, exist_ok=True)
+
+    tasks = [{
+        'cover': cover,
+        'payload': payload,
+        'output': os.path.join(output_dir, output_name(template, cover, index)),
+        'bits': bits,
+        'key': key,
+        'use_alpha': use_alpha,
+    } for index, (cover, payload) in enumerate(zip(covers, payloads))]
+
+    manifest = manifest or os.path.join(output_dir, 'manifest.csv')
+    return run_tasks(_embed_one, tasks, EMBED_FIELDS, manifest, workers, progress)
+
+
+def batch_extract(image_dir: str, output_dir: str, template: str = "{stem}.bin",
+                  bits: int = 1, key: str = None, use_alpha: bool = False,
+                  workers: int = None, manifest: str = None, progress=None) -> list:
+    """并行提取目录中所有图片的载荷并写出CSV清单"""
+    images = list_images(image_dir, IMAGE_EXTENSIONS)
+    os.makedirs(output_dir, exist_ok=True)
+
+    tasks = [{
+        'image': image,
+        'output': os.path.join(output_dir, output_name(template, image, index)),
+        'bits': bits,
+        'key': key,
+        'use_alpha': use_alpha,
+    } for index, image in enumerate(images)]
+
+    manifest = manifest or os.path.join(output_dir, 'manifest.csv')
+    return run_tasks(_extract_one, tasks, EXTRACT_FIELDS, manifest, workers, progress)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LSB 批量嵌入/提取")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    embed_parser = subparsers.add_parser('embed', help="批量嵌入")
+    embed_parser.add_argument('cover_dir')
+    embed_parser.add_argument('payload', help="载荷文件、载荷目录或 random:N")
+    embed_parser.add_argument('output_dir')
+    embed_parser.add_argument('--template', default="{stem}_stego.png")
+
+    extract_parser = subparsers.add_parser('extract', help="批量提取")
+    extract_parser.add_argument('image_dir')
+    extract_parser.add_argument('output_dir')
+    extract_parser.add_argument('--template', default="{stem}.bin")
+
+    for sub in (embed_parser, extract_parser):
+        sub.add_argument('--bits', type=int, default=1, choices=range(1, lsb_codec.MAX_BITS + 1))
+        sub.add_argument('--key', default=None)
+        sub.add_argument('--alpha', action='store_true', help="同时使用Alpha通道")
+        sub.add_argument('--workers', type=int, default=None)
+        sub.add_argument('--manifest', default=None)
+
+    args = parser.parse_args(argv)
+    if args.command == 'embed':
+        rows = batch_embed(args.cover_dir, args.payload, args.output_dir, args.template,
+                           args.bits, args.key, args.alpha, args.workers, args.manifest, print_progress)
+    else:
+        rows = batch_extract(args.image_dir, args.output_dir, args.template,
+                             args.bits, args.key, args.alpha, args.workers, args.manifest, print_progress)
+    return report(rows)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
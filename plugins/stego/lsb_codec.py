@@ -0,0 +1,126 @@
+from functools import lru_cache
+import hashlib
+import math
+import numpy as np
+
+# 载荷头：4字节大端长度
+HEADER_BYTES = 4
+HEADER_BITS = HEADER_BYTES * 8
+MAX_BITS = 4
+
+
+def capacity(pixels, bits: int = 1) -> int:
+    """可嵌入的载荷字节数（已扣除长度头）；pixels 可以是像素数组，也可以只给出其形状"""
+    samples = pixels.size if isinstance(pixels, np.ndarray) else math.prod(pixels)
+    return max(0, samples * bits // 8 - HEADER_BYTES)
+
+
+@lru_cache(maxsize=4)
+def _pixel_permutation(key: str, pixel_count: int) -> np.ndarray:
+    """由口令派生的像素置换（预计算并缓存，嵌入和提取共用）"""
+    seed = int.from_bytes(hashlib.sha256(key.encode('utf-8')).digest(), 'big')
+    order = np.random.default_rng(seed).permutation(pixel_count)
+    order = order.astype(np.uint32 if pixel_count <= 0xFFFFFFFF else np.int64)
+    order.flags.writeable = False
+    return order
+
+
+def sample_indices(pixels: np.ndarray, count: int, key: str = None):
+    """前 count 个载体样本在展平数组中的位置
+
+    无口令时按光栅顺序，返回切片；有口令时按置换后的像素顺序，
+    每个像素内依次取各通道，返回索引数组用于花式索引读写。
+    """
+    if not key:
+        return slice(0, count)
+    channels = pixels.shape[2] if pixels.ndim == 3 else 1
+    pixel_count = pixels.size // channels
+    needed = -(-count // channels)
+    order = _pixel_permutation(key, pixel_count)[:needed].astype(np.int64)
+    index = (order[:, None] * channels + np.arange(channels)).ravel()
+    return index[:count]
+
+
+def _bits_to_values(bits: np.ndarray, bits_per_sample: int) -> np.ndarray:
+    """将位流按每样本 bits_per_sample 位分组为整数（高位在前）"""
+    if bits_per_sample == 1:
+        return bits
+    padded = -len(bits) % bits_per_sample
+    if padded:
+        bits = np.concatenate((bits, np.zeros(padded, dtype=np.uint8)))
+    groups = bits.reshape(-1, bits_per_sample)
+    # 逐列移位合并，避免在很短的末维上做归约
+    values = np.zeros(len(groups), dtype=np.uint8)
+    for k in range(bits_per_sample):
+        values |= groups[:, k] << np.uint8(bits_per_sample - 1 - k)
+    return values
+
+
+def _values_to_bits(values: np.ndarray, bits_per_sample: int) -> np.ndarray:
+    """_bits_to_values 的逆运算"""
+    if bits_per_sample == 1:
+        return values
+    stream = np.empty((len(values), bits_per_sample), dtype=np.uint8)
+    for k in range(bits_per_sample):
+        np.right_shift(values, bits_per_sample - 1 - k, out=stream[:, k])
+    stream &= 1
+    return stream.ravel()
+
+
+def embed(pixels: np.ndarray, payload: bytes, bits: int = 1, key: str = None) -> np.ndarray:
+    """将带长度头的载荷写入每个通道的低 bits 位，返回新数组"""
+    if not 1 <= bits <= MAX_BITS:
+        raise ValueError(f"每通道位数必须在 1~{MAX_BITS} 之间")
+    if len(payload) > capacity(pixels, bits):
+        raise ValueError(f"载荷太大，图片容量不足。\n最大可存储{capacity(pixels, bits)}字节，当前载荷{len(payload)}字节")
+
+    data = len(payload).to_bytes(HEADER_BYTES, 'big') + payload
+    values = _bits_to_values(np.unpackbits(np.frombuffer(data, dtype=np.uint8)), bits)
+
+    result = np.array(pixels, dtype=np.uint8, copy=True)
+    flat = result.reshape(-1)
+    index = sample_indices(result, len(values), key)
+    keep = np.uint8(0xFF ^ ((1 << bits) - 1))
+    flat[index] = (flat[index] & keep) | values
+    return result
+
+
+def extract(pixels: np.ndarray, bits: int = 1, key: str = None) -> bytes:
+    """读取长度头后只取出声明长度的位，找不到合法长度头时返回 None"""
+    pixels = np.ascontiguousarray(pixels)
+    if pixels.size * bits < HEADER_BITS:
+        return None
+
+    mask = np.uint8((1 << bits) - 1)
+    flat = pixels.reshape(-1)
+
+    def read(sample_count):
+        index = sample_indices(pixels, sample_count, key)
+        return _values_to_bits(flat[index] & mask, bits)
+
+    header_samples = -(-HEADER_BITS // bits)
+    header = np.packbits(read(header_samples)[:HEADER_BITS]).tobytes()
+    length = int.from_bytes(header, 'big')
+    if length > capacity(pixels, bits):
+        return None
+
+    total_bits = HEADER_BITS + length * 8
+    stream = read(-(-total_bits // bits))
+    return np.packbits(stream[HEADER_BITS:total_bits]).tobytes()
+
+
+def extract_legacy(pixels: np.ndarray) -> bytes:
+    """旧格式：无长度头，以 0x00 字节结尾的文本，找不到结束标记时返回 None"""
+    flat = np.ascontiguousarray(pixels).reshape(-1)
+    usable = flat.size // 8 * 8
+    # 分块读取，找到结束标记即停止
+    chunk_bits = 8 * 65536
+    parts = []
+    for start in range(0, usable, chunk_bits):
+        data = np.packbits(flat[start:min(start + chunk_bits, usable)] & 1).tobytes()
+        end = data.find(b'\0')
+        if end >= 0:
+            parts.append(data[:end])
+            return b''.join(parts)
+        parts.append(data)
+    return None
@@ -1,13 +1,33 @@
 from ..import Plugin
 from PySide6.QtWidgets import (QWidget, QLabel, QFileDialog, QPushButton, 
                               QVBoxLayout, QHBoxLayout, QGroupBox, QTextEdit,
-                              QComboBox)
+                              QComboBox, QSpinBox, QCheckBox, QLineEdit, QProgressBar)
 from PySide6.QtGui import QPixmap, QImage
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QThread, Signal
 from PIL import Image
 import numpy as np
 import os
 import style
+import time
+from . import lsb_codec, lsb_batch
+
+class LSBBatchThread(QThread):
+    progress_signal = Signal(int, int)  # 进度信号 (已完成, 总数)
+    finished_signal = Signal(object)  # 完成信号，传递清单行
+    error_signal = Signal(str)  # 错误信号
+
+    def __init__(self, func, *args, **kwargs):
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            rows = self.func(*self.args, progress=self.progress_signal.emit, **self.kwargs)
+            self.finished_signal.emit(rows)
+        except Exception as e:
+            self.error_signal.emit(str(e))
 
 class LSBStego(Plugin):
     @property
@@ -24,6 +44,8 @@ class LSBStego(Plugin):
 
     def create_ui(self, parent: QWidget, layout: QVBoxLayout) -> None:
         self.image_path = ""
+        self.payload_path = ""
+        self.batch_thread = None
         
         # 上半部分：图片选择和预览
         top_group = QGroupBox("图片", parent)
@@ -79,6 +101,49 @@ class LSBStego(Plugin):
         """)
         mode_layout.addWidget(mode_label)
         mode_layout.addWidget(self.mode_combo)
+
+        # 嵌入参数：每通道位数、Alpha通道、口令置换
+        option_layout = QHBoxLayout()
+        option_layout.addWidget(QLabel("每通道位数:", parent))
+        self.bits_spin = QSpinBox(parent)
+        self.bits_spin.setRange(1, lsb_codec.MAX_BITS)
+        self.bits_spin.setValue(1)
+        self.bits_spin.valueChanged.connect(self._update_capacity)
+        option_layout.addWidget(self.bits_spin)
+
+        self.alpha_check = QCheckBox("使用Alpha通道", parent)
+        self.alpha_check.stateChanged.connect(self._update_capacity)
+        option_layout.addWidget(self.alpha_check)
+
+        option_layout.addWidget(QLabel("口令:", parent))
+        self.key_edit = QLineEdit(parent)
+        self.key_edit.setPlaceholderText("留空则按光栅顺序嵌入")
+        self.key_edit.setEchoMode(QLineEdit.EchoMode.Password)
+        option_layout.addWidget(self.key_edit)
+        mode_layout.addLayout(option_layout)
+
+        # 容量与吞吐评估
+        capacity_layout = QHBoxLayout()
+        self.capacity_label = QLabel("容量：请先选择图片", parent)
+        self.estimate_btn = QPushButton("评估容量/速度", parent)
+        self.estimate_btn.clicked.connect(self._estimate_throughput)
+        capacity_layout.addWidget(self.capacity_label)
+        capacity_layout.addStretch()
+        capacity_layout.addWidget(self.estimate_btn)
+        mode_layout.addLayout(capacity_layout)
+
+        # 目录批量处理（使用上方相同的参数）
+        batch_layout = QHBoxLayout()
+        self.batch_embed_btn = QPushButton("批量嵌入目录", parent)
+        self.batch_embed_btn.clicked.connect(self._batch_embed)
+        self.batch_extract_btn = QPushButton("批量提取目录", parent)
+        self.batch_extract_btn.clicked.connect(self._batch_extract)
+        self.batch_progress = QProgressBar(parent)
+        self.batch_progress.setVisible(False)
+        batch_layout.addWidget(self.batch_embed_btn)
+        batch_layout.addWidget(self.batch_extract_btn)
+        batch_layout.addWidget(self.batch_progress)
+        mode_layout.addLayout(batch_layout)
         
         layout.addWidget(mode_group)
         
@@ -93,7 +158,20 @@ class LSBStego(Plugin):
         self.input_edit.setObjectName("input_edit")
         self.input_edit.setPlaceholderText("在这里输入要隐藏的文本...")
         self.input_edit.setStyleSheet(style.get_text_edit_style())
+        self.input_edit.textChanged.connect(self._update_capacity)
         input_layout.addWidget(self.input_edit)
+
+        # 二进制载荷文件（选择后优先于文本）
+        payload_layout = QHBoxLayout()
+        self.payload_label = QLabel("未选择载荷文件（使用上方文本）", parent)
+        self.payload_btn = QPushButton("选择载荷文件", parent)
+        self.payload_btn.clicked.connect(self._select_payload)
+        self.payload_clear_btn = QPushButton("清除", parent)
+        self.payload_clear_btn.clicked.connect(self._clear_payload)
+        payload_layout.addWidget(self.payload_label)
+        payload_layout.addWidget(self.payload_btn)
+        payload_layout.addWidget(self.payload_clear_btn)
+        input_layout.addLayout(payload_layout)
         layout.addWidget(input_group)
 
         # 运行按钮
@@ -125,6 +203,154 @@ class LSBStego(Plugin):
             "在这里输入要隐藏的文本..." if is_encode else "解码模式下无需输入文本"
         )
         self.input_edit.setEnabled(is_encode)
+        self.payload_btn.setEnabled(is_encode)
+        self.payload_clear_btn.setEnabled(is_encode)
+
+    def _select_payload(self):
+        file_path, _ = QFileDialog.getOpenFileName(None, "选择载荷文件", "", "所有文件 (*.*)")
+        if file_path:
+            self.payload_path = file_path
+            self.payload_label.setText(f"载荷文件：{os.path.basename(file_path)}")
+            self._update_capacity()
+
+    def _clear_payload(self):
+        self.payload_path = ""
+        self.payload_label.setText("未选择载荷文件（使用上方文本）")
+        self._update_capacity()
+
+    def _embed_options(self) -> dict:
+        """当前的嵌入参数，嵌入和提取必须一致"""
+        return {
+            'bits': self.bits_spin.value(),
+            'key': self.key_edit.text() or None,
+        }
+
+    def _load_pixels(self) -> np.ndarray:
+        """按当前设置读取载体像素（RGB，或勾选Alpha时为RGBA）"""
+        img = Image.open(self.image_path)
+        target_mode = 'RGBA' if self.alpha_check.isChecked() else 'RGB'
+        if img.mode != target_mode:
+            img = img.convert(target_mode)
+
+        pixels = np.asarray(img)
+        if pixels.dtype != np.uint8:
+            raise ValueError("图片格式不支持，请使用8位RGB图片")
+        return pixels
+
+    def _payload_size(self) -> int:
+        if self.payload_path:
+            return os.path.getsize(self.payload_path)
+        return len(self.input_edit.toPlainText().encode('utf-8'))
+
+    def _update_capacity(self):
+        """根据图片尺寸和参数计算容量（不读取像素）"""
+        if not self.image_path:
+            return
+        try:
+            with Image.open(self.image_path) as img:
+                width, height = img.size
+        except Exception as e:
+            self.capacity_label.setText(f"容量：无法读取图片（{str(e)}）")
+            return
+        channels = 4 if self.alpha_check.isChecked() else 3
+        cap = lsb_codec.capacity((height, width, channels), self.bits_spin.value())
+        size = self._payload_size()
+        usage = size / cap * 100 if cap else 100.0
+        self.capacity_label.setText(
+            f"容量：{cap} 字节（{width}×{height}×{channels}通道×{self.bits_spin.value()}位），"
+            f"载荷 {size} 字节，占用 {usage:.1f}%"
+        )
+
+    def _estimate_throughput(self):
+        """在内存中试嵌入一次，报告容量与吞吐"""
+        if not self.image_path:
+            self.capacity_label.setText("容量：请先选择图片")
+            return
+        try:
+            pixels = self._load_pixels()
+            options = self._embed_options()
+            cap = lsb_codec.capacity(pixels, options['bits'])
+            size = min(max(self._payload_size(), 1), cap)
+            payload = os.urandom(size)
+
+            start = time.perf_counter()
+            lsb_codec.embed(pixels, payload, **options)
+            elapsed = max(time.perf_counter() - start, 1e-9)
+            self._update_capacity()
+            self.capacity_label.setText(
+                self.capacity_label.text()
+                + f"，嵌入吞吐约 {size / elapsed / 1024 / 1024:.1f} MB/s（{elapsed * 1000:.0f} ms）"
+            )
+        except Exception as e:
+            self.capacity_label.setText(f"评估失败：{str(e)}")
+
+    def _batch_embed(self):
+        """选择载体目录和输出目录，并行批量嵌入"""
+        if not self.payload_path and not self.input_edit.toPlainText():
+            self.output_edit.setText("请输入要隐写的文本或选择载荷文件")
+            return
+        cover_dir = QFileDialog.getExistingDirectory(None, "选择载体图片目录")
+        if not cover_dir:
+            return
+        output_dir = QFileDialog.getExistingDirectory(None, "选择输出目录")
+        if not output_dir:
+            return
+
+        payload = self.payload_path or self.input_edit.toPlainText().encode('utf-8')
+        options = self._embed_options()
+        self._start_batch(lsb_batch.batch_embed, cover_dir, payload, output_dir,
+                          bits=options['bits'], key=options['key'],
+                          use_alpha=self.alpha_check.isChecked())
+
+    def _batch_extract(self):
+        """选择图片目录和输出目录，并行批量提取"""
+        image_dir = QFileDialog.getExistingDirectory(None, "选择隐写图片目录")
+        if not image_dir:
+            return
+        output_dir = QFileDialog.getExistingDirectory(None, "选择输出目录")
+        if not output_dir:
+            return
+
+        options = self._embed_options()
+        self._start_batch(lsb_batch.batch_extract, image_dir, output_dir,
+                          bits=options['bits'], key=options['key'],
+                          use_alpha=self.alpha_check.isChecked())
+
+    def _start_batch(self, func, *args, **kwargs):
+        if self.batch_thread is not None:
+            return
+        self.batch_embed_btn.setEnabled(False)
+        self.batch_extract_btn.setEnabled(False)
+        self.batch_progress.setValue(0)
+        self.batch_progress.setVisible(True)
+
+        self.batch_thread = LSBBatchThread(func, *args, **kwargs)
+        self.batch_thread.progress_signal.connect(self._batch_progress)
+        self.batch_thread.finished_signal.connect(self._batch_finished)
+        self.batch_thread.error_signal.connect(self._batch_error)
+        self.batch_thread.start()
+
+    def _batch_progress(self, done: int, total: int):
+        self.batch_progress.setMaximum(total)
+        self.batch_progress.setValue(done)
+
+    def _batch_finished(self, rows):
+        failed = [row for row in rows if row['error']]
+        lines = [f"批量处理完成：共 {len(rows)} 个，失败 {len(failed)} 个（清单见输出目录 manifest.csv）"]
+        for row in failed[:20]:
+            lines.append(f"{next(iter(row.values()))}: {row['error']}")
+        self.output_edit.setText("\n".join(lines))
+        self._batch_done()
+
+    def _batch_error(self, message: str):
+        self.output_edit.setText(f"批量处理失败：{message}")
+        self._batch_done()
+
+    def _batch_done(self):
+        self.batch_progress.setVisible(False)
+        self.batch_embed_btn.setEnabled(True)
+        self.batch_extract_btn.setEnabled(True)
+        self.batch_thread = None
 
     def _select_file(self):
         file_path, _ = QFileDialog.getOpenFileName(
@@ -136,6 +362,7 @@ class LSBStego(Plugin):
         if file_path:
             self.image_path = file_path
             self.file_label.setText(os.path.basename(file_path))
+            self._update_capacity()
             
             # 更新预览图
             pixmap = QPixmap(file_path)
@@ -154,8 +381,8 @@ class LSBStego(Plugin):
             return False, "请选择图片文件"
         
         mode = self.mode_combo.currentText().split(" - ")[0]
-        if mode == "encode" and not self.input_edit.toPlainText():
-            return False, "请输入要隐写的文本"
+        if mode == "encode" and not self.payload_path and not self.input_edit.toPlainText():
+            return False, "请输入要隐写的文本或选择载荷文件"
             
         return True, ""
 
@@ -163,52 +390,25 @@ class LSBStego(Plugin):
         mode = self.mode_combo.currentText().split(" - ")[0]
         
         if mode == "encode":
-            return self._encode(self.input_edit.toPlainText())
+            if self.payload_path:
+                with open(self.payload_path, 'rb') as f:
+                    return self._encode(f.read())
+            return self._encode(self.input_edit.toPlainText().encode('utf-8'))
         else:
             return self._decode()
 
-    def _encode(self, text: str) -> str:
+    def _encode(self, payload: bytes) -> str:
         try:
-            # 打开图片并进行预处理
-            img = Image.open(self.image_path)
-            
-            # 确保图片是RGB模式
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-                
-            # 获取图片尺寸
-            width, height = img.size
-            
-            # 将图片转换为numpy数组
-            pixels = np.asarray(img)
-            if pixels.dtype != np.uint8:
-                return "错误：图片格式不支持，请使用8位RGB图片"
-                
-            # 检查图片是否是3通道
-            if len(pixels.shape) != 3 or pixels.shape[2] != 3:
-                return "错误：请使用RGB格式的图片"
-            
-            # 将文本转换为二进制
-            binary = ''.join([format(ord(c), '08b') for c in text])
-            binary += '00000000'  # 添加结束标记
+            pixels = self._load_pixels()
+            options = self._embed_options()
             
             # 检查容量
-            max_bytes = pixels.size // 8
-            if len(binary) > pixels.size:
-                return f"错误：文本太长，图片容量不足。\n最大可存储{max_bytes}字节，当前文本需要{len(binary)//8}字节"
-            
-            # 创建副本进行修改
-            pixels_copy = pixels.copy()
-            
-            # 修改像素的最低位
-            idx = 0
-            for h in range(height):
-                for w in range(width):
-                    for c in range(3):  # RGB三个通道
-                        if idx < len(binary):
-                            # 使用位运算修改最低位，使用 254 (0xFE) 代替 ~1
-                            pixels_copy[h, w, c] = (pixels_copy[h, w, c] & 0xFE) | int(binary[idx])
-                            idx += 1
+            cap = lsb_codec.capacity(pixels, options['bits'])
+            if len(payload) > cap:
+                return f"错误：载荷太长，图片容量不足。\n最大可存储{cap}字节，当前载荷{len(payload)}字节"
+
+            # 写入带长度头的载荷
+            pixels_copy = lsb_codec.embed(pixels, payload, **options)
             
             # 让用户选择保存位置
             output_path, _ = QFileDialog.getSaveFileName(
@@ -244,43 +444,37 @@ class LSBStego(Plugin):
 
     def _decode(self) -> str:
         try:
-            # 打开图片并进行预处理
-            img = Image.open(self.image_path)
-            
-            # 确保图片是RGB模式
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # 将图片转换为numpy数组
-            pixels = np.asarray(img)
-            if pixels.dtype != np.uint8:
-                return "错误：图片格式不支持，请使用8位RGB图片"
-                
-            # 检查图片是否是3通道
-            if len(pixels.shape) != 3 or pixels.shape[2] != 3:
-                return "错误：请使用RGB格式的图片"
-            
-            # 提取最低位
-            binary = ""
-            text = ""
-            for h in range(img.height):
-                for w in range(img.width):
-                    for c in range(3):  # RGB三个通道
-                        binary += str(pixels[h, w, c] & 1)
-                        
-                        # 每8位转换为一个字符
-                        if len(binary) >= 8:
-                            try:
-                                char = chr(int(binary[:8], 2))
-                                if char == '\0':  # 检查结束标记
-                                    return text
-                                text += char
-                                binary = binary[8:]
-                            except ValueError:
-                                continue  # 跳过无效的字符
-            
-            return "未找到隐写信息"
+            pixels = self._load_pixels()
+            options = self._embed_options()
             
+            # 按长度头提取，默认参数下兼容旧版以0结尾的文本格式
+            payload = lsb_codec.extract(pixels, **options)
+            legacy = options['bits'] == 1 and not options['key'] and not self.alpha_check.isChecked()
+            if payload is None and legacy:
+                payload = lsb_codec.extract_legacy(pixels)
+            if payload is None:
+                return "未找到隐写信息"
+
+            try:
+                return payload.decode('utf-8')
+            except UnicodeDecodeError:
+                return self._save_binary_payload(payload)
+
         except Exception as e:
             import traceback
             return f"错误：{str(e)}\n{traceback.format_exc()}"
+
+    def _save_binary_payload(self, payload: bytes) -> str:
+        """提取结果不是文本时保存为二进制文件"""
+        preview = payload[:64].hex(' ')
+        output_path, _ = QFileDialog.getSaveFileName(
+            None,
+            "保存提取的二进制数据",
+            os.path.splitext(self.image_path)[0] + "_payload.bin",
+            "二进制文件 (*.bin);;所有文件 (*.*)"
+        )
+        if not output_path:
+            return f"提取到 {len(payload)} 字节二进制数据（未保存）\n前64字节: {preview}"
+        with open(output_path, 'wb') as f:
+            f.write(payload)
+        return f"提取到 {len(payload)} 字节二进制数据，已保存为：{output_path}\n前64字节: {preview}"
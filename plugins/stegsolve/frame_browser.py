@@ -0,0 +1,162 @@
+from PySide6.QtCore import QThread, Signal
+from PIL import Image
+from collections import OrderedDict
+import threading
+
+
+class FrameCache:
+    """按字节数限制容量的LRU帧缓存（线程安全）"""
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._frames = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def frame_bytes(frame: Image.Image) -> int:
+        """估算一帧解码后占用的字节数"""
+        width, height = frame.size
+        return width * height * len(frame.getbands())
+
+    def capacity(self, frame_bytes: int) -> int:
+        """按单帧大小估算缓存能容纳的帧数"""
+        return max(2, self.max_bytes // max(1, frame_bytes))
+
+    def get(self, index: int):
+        with self._lock:
+            frame = self._frames.get(index)
+            if frame is not None:
+                self._frames.move_to_end(index)
+            return frame
+
+    def __contains__(self, index: int) -> bool:
+        with self._lock:
+            return index in self._frames
+
+    def put(self, index: int, frame: Image.Image) -> None:
+        size = self.frame_bytes(frame)
+        with self._lock:
+            old = self._frames.pop(index, None)
+            if old is not None:
+                self._bytes -= self.frame_bytes(old)
+            self._frames[index] = frame
+            self._bytes += size
+            # 淘汰最久未使用的帧，但至少保留刚放入的一帧
+            while self._bytes > self.max_bytes and len(self._frames) > 1:
+                _, evicted = self._frames.popitem(last=False)
+                self._bytes -= self.frame_bytes(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+
+
+class FrameIndex:
+    """动画图片(GIF/APNG)的帧索引
+
+    只解析帧头统计帧数，不解码任何像素数据。
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        with Image.open(file_path) as img:
+            self.format = img.format
+            self.size = img.size
+            # Pillow 统计 n_frames 时只跳过帧数据，不做解码
+            self.n_frames = getattr(img, 'n_frames', 1)
+
+    @property
+    def is_animated(self) -> bool:
+        return self.n_frames > 1
+
+
+class FrameDecodeThread(QThread):
+    """后台按需解码帧的工作线程
+
+    GIF/APNG 只能顺序合成帧，向前跳转时从当前位置继续解码，
+    向后跳转时从第0帧重新解码，途经的帧按缓存容量顺带写入LRU。
+    目标帧就绪后再顺序预取后续若干帧，使逐帧浏览保持流畅。
+    """
+    frame_ready = Signal(int)  # 帧解码完成信号
+    error_signal = Signal(str)  # 错误信号
+
+    def __init__(self, frame_index: FrameIndex, cache: FrameCache, prefetch: int = 4):
+        super().__init__()
+        self.frame_index = frame_index
+        self.cache = cache
+        self.prefetch = prefetch
+        self._target = None
+        self._running = True
+        self._cond = threading.Condition()
+
+    def request(self, index: int) -> None:
+        """请求解码指定帧，覆盖尚未处理的旧请求"""
+        with self._cond:
+            self._target = index
+            self._cond.notify()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self.wait()
+
+    def _next_target(self, block: bool):
+        with self._cond:
+            while block and self._running and self._target is None:
+                self._cond.wait()
+            target, self._target = self._target, None
+            return target if self._running else None
+
+    def _pending(self) -> bool:
+        with self._cond:
+            return self._target is not None or not self._running
+
+    def run(self):
+        try:
+            img = Image.open(self.frame_index.file_path)
+        except Exception as e:
+            self.error_signal.emit(f"无法打开图片：{str(e)}")
+            return
+
+        with img:
+            keep = None
+            while True:
+                target = self._next_target(block=True)
+                if target is None:
+                    return
+                try:
+                    if target not in self.cache:
+                        keep = self._decode_to(img, target, keep)
+                    self.frame_ready.emit(target)
+
+                    # 空闲时顺序预取后续帧
+                    last = min(target + self.prefetch, self.frame_index.n_frames - 1)
+                    for index in range(target + 1, last + 1):
+                        if self._pending():
+                            break
+                        if index not in self.cache:
+                            keep = self._decode_to(img, index, keep)
+                except Exception as e:
+                    self.error_signal.emit(f"解码第 {target} 帧失败：{str(e)}")
+
+    def _decode_to(self, img: Image.Image, target: int, keep):
+        """顺序解码到目标帧，返回缓存可容纳的帧数"""
+        current = img.tell()
+        if target > current:
+            start = current + 1
+        elif target == current:
+            start = target
+        else:
+            start = 0
+        for index in range(start, target + 1):
+            img.seek(index)
+            # 只缓存距离目标足够近的途经帧，避免冲掉有用的缓存
+            if index == target or (keep is not None and target - index < keep):
+                frame = img.copy()
+                self.cache.put(index, frame)
+                if keep is None:
+                    keep = self.cache.capacity(FrameCache.frame_bytes(frame))
+        return keep
@@ -2,6 +2,9 @@ from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                               QComboBox, QPushButton, QFileDialog, QMessageBox,
                               QTextEdit, QCheckBox, QGroupBox, QRadioButton)
 from PySide6.QtCore import Qt
+from .palette import PaletteViews
+from ..file.hex_format import HexFormat
+from ..file.signatures import SignatureScanDialog
 
 class LSBExtractDialog(QDialog):
     def __init__(self, plugin, parent=None):
@@ -31,6 +34,9 @@ class LSBExtractDialog(QDialog):
             ("Blue", range(8)),
             ("Alpha", range(8))
         ]
+        # 调色板图片额外提供索引平面
+        if PaletteViews.supports(getattr(plugin, 'current_image', None)):
+            channels.append(("Index", range(8)))
         
         # 为每个通道创建选择框
         self.bit_checkboxes = {}
@@ -134,12 +140,14 @@ class LSBExtractDialog(QDialog):
         self.save_text_btn = QPushButton("保存文本", self)
         self.save_bin_btn = QPushButton("保存二进制", self)
         self.extract_btn = QPushButton("提取", self)
+        self.scan_btn = QPushButton("扫描签名", self)
         self.close_btn = QPushButton("关闭", self)
         
         button_layout.addWidget(self.preview_btn)
         button_layout.addWidget(self.save_text_btn)
         button_layout.addWidget(self.save_bin_btn)
         button_layout.addWidget(self.extract_btn)
+        button_layout.addWidget(self.scan_btn)
         button_layout.addWidget(self.close_btn)
         
         layout.addLayout(button_layout)
@@ -150,6 +158,7 @@ class LSBExtractDialog(QDialog):
         self.save_bin_btn.clicked.connect(self._save_binary)
         self.close_btn.clicked.connect(self.close)
         self.extract_btn.clicked.connect(self._preview_data)
+        self.scan_btn.clicked.connect(self._scan_signatures)
 
     def closeEvent(self, event):
         event.accept()
@@ -204,6 +213,14 @@ class LSBExtractDialog(QDialog):
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"保存文件时发生错误：{str(e)}")
 
+    def _scan_signatures(self):
+        """在提取出的数据中查找嵌入的文件"""
+        data = self._extract_data()
+        if not data:
+            QMessageBox.warning(self, "警告", "请先预览数据")
+            return
+        SignatureScanDialog(data, self).exec()
+
     def _preview_data(self):
         """预览提取的数据"""
         selected_bits = []
@@ -231,28 +248,7 @@ class LSBExtractDialog(QDialog):
                 
                 if self.preview_check.isChecked():
                     result.append("\nHexdump:")
-                    # 生成hexdump格式输出
-                    hex_bytes = self._last_extracted_data
-                    for i in range(0, len(hex_bytes), 16):
-                        chunk = hex_bytes[i:i+16]
-                        result.append(f"{i:08x}  ")
-                        
-                        hex_line = ""
-                        ascii_line = ""
-                        
-                        for j, byte in enumerate(chunk):
-                            if j == 8:
-                                hex_line += " "
-                            hex_line += f"{byte:02x} "
-                            if 32 <= byte <= 126:
-                                ascii_line += chr(byte)
-                            else:
-                                ascii_line += "."
-                        
-                        hex_line = hex_line.ljust(49)
-                        ascii_line = ascii_line.ljust(16)
-                        
-                        result.append(f"{hex_line} |{ascii_line}|")
+                    result.append(HexFormat('canonical').dump(self._last_extracted_data))
                 
                 self.preview_text.setText("\n".join(result))
             else:
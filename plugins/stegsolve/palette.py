@@ -0,0 +1,84 @@
+from PIL import Image
+import numpy as np
+
+CHANNELS = ["Red", "Green", "Blue"]
+
+# 调色板图片额外的分析模式
+PALETTE_MODES = (
+    ["Palette index"]
+    + [f"Index bit plane {bit}" for bit in range(8)]
+    + [f"Palette {channel} bit plane {bit}" for channel in CHANNELS for bit in range(8)]
+    + [f"Random colour map {seed}" for seed in range(1, 4)]
+    + ["Palette sorted by luminance", "Palette sorted by frequency"]
+)
+
+
+class PaletteViews:
+    """调色板(P模式)图片的分析视图
+
+    索引平面与调色板分开分析：每种视图都是一张 256 项的查找表，
+    用 np.take 一次性映射整幅索引图。查找表按模式缓存，同一图片重复切换不会重算。
+    """
+
+    def __init__(self, image: Image.Image):
+        self.indices = np.asarray(image)
+        palette = np.array(image.getpalette() or [], dtype=np.uint8).reshape(-1, 3)
+        # 补齐到 256 项，越界索引显示为黑色
+        self.palette = np.zeros((256, 3), dtype=np.uint8)
+        self.palette[:len(palette)] = palette[:256]
+        self._luts = {}
+
+    @staticmethod
+    def supports(image) -> bool:
+        return image is not None and image.mode == 'P'
+
+    def lut(self, mode: str) -> np.ndarray:
+        """返回模式对应的 (256, 3) 查找表"""
+        lut = self._luts.get(mode)
+        if lut is None:
+            lut = self._build_lut(mode)
+            self._luts[mode] = lut
+        return lut
+
+    def _build_lut(self, mode: str) -> np.ndarray:
+        entries = np.arange(256)
+        if mode == "Palette index":
+            return np.repeat(entries.astype(np.uint8)[:, None], 3, axis=1)
+        if mode.startswith("Index bit plane"):
+            bit = int(mode.split()[-1])
+            plane = ((entries >> bit) & 1).astype(np.uint8) * 255
+            return np.repeat(plane[:, None], 3, axis=1)
+        if mode.startswith("Palette") and "bit plane" in mode:
+            channel = CHANNELS.index(mode.split()[1])
+            bit = int(mode.split()[-1])
+            plane = ((self.palette[:, channel] >> bit) & 1).astype(np.uint8) * 255
+            return np.repeat(plane[:, None], 3, axis=1)
+        if mode.startswith("Random colour map"):
+            rng = np.random.default_rng(int(mode.split()[-1]))
+            return rng.integers(0, 256, (256, 3), dtype=np.uint8)
+        if mode == "Palette sorted by luminance":
+            luminance = self.palette.astype(np.float64) @ np.array([0.299, 0.587, 0.114])
+            return self._rank_lut(np.argsort(luminance, kind='stable'))
+        if mode == "Palette sorted by frequency":
+            counts = np.bincount(self.indices.ravel(), minlength=256)
+            return self._rank_lut(np.argsort(-counts, kind='stable'))
+        raise ValueError(f"未知的调色板模式: {mode}")
+
+    @staticmethod
+    def _rank_lut(order: np.ndarray) -> np.ndarray:
+        """按新顺序给调色板项分配灰度，使相邻排名的项颜色相近"""
+        rank = np.empty(256, dtype=np.uint8)
+        rank[order] = np.arange(256, dtype=np.uint8)
+        return np.repeat(rank[:, None], 3, axis=1)
+
+    def render(self, mode: str) -> np.ndarray:
+        """将索引图经查找表映射为 (H, W, 3) 的RGB数组"""
+        return np.take(self.lut(mode), self.indices, axis=0)
+
+    def palette_rgb(self) -> np.ndarray:
+        """调色板还原后的 (H, W, 3) RGB数组，即各调色板项的通道值"""
+        rgb = self._luts.get(None)
+        if rgb is None:
+            rgb = np.take(self.palette, self.indices, axis=0)
+            self._luts[None] = rgb
+        return rgb
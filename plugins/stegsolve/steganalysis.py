@@ -0,0 +1,339 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
+                              QPushButton, QTextEdit, QProgressBar, QWidget, QSpinBox)
+from PySide6.QtGui import QPainter, QPen, QColor
+from PySide6.QtCore import QThread, Signal, QPointF
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+import math
+import os
+
+CHANNELS = ["Red", "Green", "Blue"]
+CHANNEL_COLORS = ["#FF3B30", "#34C759", "#007AFF"]
+
+# RS分析的翻转函数查找表：F1 为 2i<->2i+1，F-1 为 2i-1<->2i（允许越界到 -1/256）
+_FLIP_POS = (np.arange(256) ^ 1).astype(np.int16)
+_FLIP_NEG = (((np.arange(256) + 1) ^ 1) - 1).astype(np.int16)
+
+
+def chi_square_pvalue(hist: np.ndarray) -> float:
+    """Westfeld-Pfitzmann 卡方攻击，返回存在LSB嵌入的概率
+
+    LSB 嵌入会使值对 (2k, 2k+1) 的频数趋于相等，
+    以值对均值为期望做卡方检验，p 值越接近 1 越可能被嵌入。
+    """
+    hist = np.asarray(hist, dtype=np.float64)
+    expected = (hist[0::2] + hist[1::2]) / 2
+    observed = hist[0::2]
+    valid = expected > 0
+    categories = int(valid.sum())
+    if categories < 2:
+        return 0.0
+    chi2 = float((((observed - expected) ** 2)[valid] / expected[valid]).sum())
+    return _gamma_q((categories - 1) / 2, chi2 / 2)
+
+
+def _gamma_q(a: float, x: float) -> float:
+    """正则化上不完全伽马函数 Q(a, x)，即卡方分布的生存函数"""
+    if x <= 0:
+        return 1.0
+    log_prefix = -x + a * math.log(x) - math.lgamma(a)
+    if x < a + 1:
+        # 级数展开求 P(a, x)
+        term = total = 1.0 / a
+        ap = a
+        for _ in range(1000):
+            ap += 1
+            term *= x / ap
+            total += term
+            if abs(term) < abs(total) * 1e-12:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+
+    # 连分式（Lentz 算法）求 Q(a, x)
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-12:
+            break
+    return min(1.0, math.exp(log_prefix) * h)
+
+
+def rs_counts(band: np.ndarray) -> np.ndarray:
+    """统计一个行带内的 RS 分组计数
+
+    返回 [R_M, S_M, R_-M, S_-M, R'_M, S'_M, R'_-M, S'_-M, 组数]，
+    带撇的项为整体翻转LSB后的图像上的计数。
+    """
+    width = band.shape[1] // 4 * 4
+    groups = band[:, :width].reshape(-1, 4).astype(np.int16)
+    counts = np.empty(9, dtype=np.int64)
+    counts[8] = len(groups)
+
+    for offset, data in ((0, groups), (4, groups ^ 1)):
+        x0, x1, x2, x3 = data.T
+        smooth = np.abs(x1 - x0) + np.abs(x2 - x1) + np.abs(x3 - x2)
+        for index, lut in enumerate((_FLIP_POS, _FLIP_NEG)):
+            # 掩码 [0,1,1,0]：只翻转每组中间两个像素
+            y1, y2 = np.take(lut, x1), np.take(lut, x2)
+            flipped_smooth = np.abs(y1 - x0) + np.abs(y2 - y1) + np.abs(x3 - y2)
+            counts[offset + index * 2] = np.count_nonzero(flipped_smooth > smooth)
+            counts[offset + index * 2 + 1] = np.count_nonzero(flipped_smooth < smooth)
+    return counts
+
+
+def rs_estimate(counts: np.ndarray) -> float:
+    """由 RS 计数估计嵌入率（占该通道LSB容量的比例）"""
+    total = counts[8]
+    if total == 0:
+        return 0.0
+    r_m, s_m, r_nm, s_nm, r_m1, s_m1, r_nm1, s_nm1 = counts[:8] / total
+    d0, d1 = r_m - s_m, r_m1 - s_m1
+    dn0, dn1 = r_nm - s_nm, r_nm1 - s_nm1
+
+    a = 2 * (d1 + d0)
+    b = dn0 - dn1 - d1 - 3 * d0
+    c = d0 - dn0
+    if abs(a) < 1e-12:
+        if abs(b) < 1e-12:
+            return 0.0
+        x = -c / b
+    else:
+        disc = b * b - 4 * a * c
+        if disc < 0:
+            return 0.0
+        roots = ((-b + math.sqrt(disc)) / (2 * a), (-b - math.sqrt(disc)) / (2 * a))
+        x = min(roots, key=abs)
+    if x == 0.5:
+        return 1.0
+    return float(min(1.0, max(0.0, x / (x - 0.5))))
+
+
+def _analyze_band(band: np.ndarray):
+    """单个行带：各通道直方图与RS计数"""
+    hists = np.stack([np.bincount(band[:, :, c].ravel(), minlength=256)
+                      for c in range(band.shape[2])])
+    rs = np.stack([rs_counts(band[:, :, c]) for c in range(band.shape[2])])
+    return hists, rs
+
+
+def analyze(pixels: np.ndarray, windows: int = 100, workers: int = None, progress=None) -> dict:
+    """对每个通道做卡方攻击和RS分析
+
+    图像按行切分成 windows 个行带，每个行带在线程池中并行计算直方图和RS计数
+    （numpy 的逐元素运算会释放GIL）。按光栅顺序累加行带即得到卡方累积曲线。
+    """
+    height = pixels.shape[0]
+    windows = max(1, min(windows, height))
+    bounds = np.linspace(0, height, windows + 1).astype(np.intp)
+    bands = [pixels[bounds[i]:bounds[i + 1]] for i in range(windows)]
+
+    results = [None] * windows
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = {executor.submit(_analyze_band, band): i for i, band in enumerate(bands)}
+        for done, future in enumerate(as_completed(futures)):
+            results[futures[future]] = future.result()
+            if progress is not None:
+                progress(int((done + 1) / windows * 100))
+
+    hists = np.stack([r[0] for r in results])  # (windows, C, 256)
+    rs = np.stack([r[1] for r in results])  # (windows, C, 9)
+    cumulative = np.cumsum(hists, axis=0)
+    positions = bounds[1:] / height * 100
+
+    channels = {}
+    for c, name in enumerate(CHANNELS[:pixels.shape[2]]):
+        chi_curve = [chi_square_pvalue(cumulative[w, c]) for w in range(windows)]
+        chi_window = [chi_square_pvalue(hists[w, c]) for w in range(windows)]
+        rs_window = [rs_estimate(rs[w, c]) for w in range(windows)]
+        rs_rate = rs_estimate(rs[:, c].sum(axis=0))
+
+        # 顺序嵌入时，从头开始连续高 p 值的窗口即为载荷所在区域
+        embedded = 0
+        for p in chi_window:
+            if p < 0.5:
+                break
+            embedded += 1
+        embedded_pixels = int(bounds[embedded]) * pixels.shape[1]
+
+        channels[name] = {
+            'chi_curve': chi_curve,
+            'chi_window': chi_window,
+            'rs_window': rs_window,
+            'rs_rate': rs_rate,
+            'rs_payload_bytes': int(rs_rate * pixels.shape[0] * pixels.shape[1] / 8),
+            'chi_payload_bytes': embedded_pixels // 8,
+        }
+
+    return {'positions': positions.tolist(), 'channels': channels}
+
+
+class SteganalysisThread(QThread):
+    progress_signal = Signal(int)  # 进度信号
+    finished_signal = Signal(object)  # 完成信号，传递分析结果
+    error_signal = Signal(str)  # 错误信号
+
+    def __init__(self, pixels, windows):
+        super().__init__()
+        self.pixels = pixels
+        self.windows = windows
+
+    def run(self):
+        try:
+            self.finished_signal.emit(analyze(self.pixels, self.windows,
+                                              progress=self.progress_signal.emit))
+        except Exception as e:
+            self.error_signal.emit(str(e))
+
+
+class CurveWidget(QWidget):
+    """简单折线图：横轴为图像位置(%)，纵轴为 0~1"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(200)
+        self._positions = []
+        self._series = []
+
+    def set_data(self, positions, series):
+        """series: [(颜色, 数值列表), ...]"""
+        self._positions = positions
+        self._series = series
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.fillRect(self.rect(), QColor("#FFFFFF"))
+
+        margin = 30
+        width = self.width() - margin * 2
+        height = self.height() - margin * 2
+        painter.setPen(QPen(QColor("#C6C6C8"), 1))
+        painter.drawRect(margin, margin, width, height)
+        painter.drawText(4, margin + 4, "1.0")
+        painter.drawText(4, margin + height, "0.0")
+        painter.drawText(margin + width - 30, margin + height + 18, "100%")
+
+        if not self._positions:
+            return
+        for color, values in self._series:
+            painter.setPen(QPen(QColor(color), 2))
+            points = [QPointF(margin + x / 100 * width, margin + (1 - y) * height)
+                      for x, y in zip(self._positions, values)]
+            for start, end in zip(points, points[1:]):
+                painter.drawLine(start, end)
+
+
+class SteganalysisDialog(QDialog):
+    """统计隐写分析：卡方攻击与RS分析"""
+
+    CURVES = {
+        "卡方累积p值": 'chi_curve',
+        "卡方窗口p值": 'chi_window',
+        "RS窗口嵌入率": 'rs_window',
+    }
+
+    def __init__(self, image, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("隐写分析")
+        self.setMinimumWidth(700)
+        self.setMinimumHeight(550)
+
+        self._pixels = np.ascontiguousarray(np.asarray(image.convert('RGB')))
+        self._result = None
+        self._thread = None
+
+        layout = QVBoxLayout(self)
+
+        control_layout = QHBoxLayout()
+        control_layout.addWidget(QLabel("窗口数:"))
+        self.windows_spin = QSpinBox(self)
+        self.windows_spin.setRange(1, 1000)
+        self.windows_spin.setValue(100)
+        control_layout.addWidget(self.windows_spin)
+
+        control_layout.addWidget(QLabel("曲线:"))
+        self.curve_combo = QComboBox(self)
+        self.curve_combo.addItems(self.CURVES.keys())
+        self.curve_combo.currentTextChanged.connect(self._update_curve)
+        control_layout.addWidget(self.curve_combo)
+
+        self.run_btn = QPushButton("开始分析", self)
+        self.run_btn.clicked.connect(self._start_analysis)
+        control_layout.addWidget(self.run_btn)
+        control_layout.addStretch()
+        layout.addLayout(control_layout)
+
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+
+        self.curve_widget = CurveWidget(self)
+        layout.addWidget(self.curve_widget, 2)
+
+        self.summary_text = QTextEdit(self)
+        self.summary_text.setReadOnly(True)
+        layout.addWidget(self.summary_text, 1)
+
+    def _start_analysis(self):
+        if self._thread is not None:
+            return
+        self.run_btn.setEnabled(False)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self._thread = SteganalysisThread(self._pixels, self.windows_spin.value())
+        self._thread.progress_signal.connect(self.progress_bar.setValue)
+        self._thread.finished_signal.connect(self._analysis_finished)
+        self._thread.error_signal.connect(self._analysis_error)
+        self._thread.start()
+
+    def _analysis_finished(self, result):
+        self._result = result
+        lines = []
+        total = 0
+        for name, data in result['channels'].items():
+            total += data['rs_payload_bytes']
+            lines.append(
+                f"{name}: 卡方最终p值 {data['chi_curve'][-1]:.4f}，"
+                f"顺序嵌入估计 {data['chi_payload_bytes']} 字节；"
+                f"RS嵌入率 {data['rs_rate'] * 100:.2f}%，估计 {data['rs_payload_bytes']} 字节"
+            )
+        lines.append(f"RS估计总载荷: {total} 字节")
+        self.summary_text.setText("\n".join(lines))
+        self._update_curve()
+        self._finish()
+
+    def _analysis_error(self, message):
+        self.summary_text.setText(f"分析失败：{message}")
+        self._finish()
+
+    def _finish(self):
+        self.progress_bar.setVisible(False)
+        self.run_btn.setEnabled(True)
+        self._thread = None
+
+    def _update_curve(self):
+        if self._result is None:
+            return
+        key = self.CURVES[self.curve_combo.currentText()]
+        series = [(CHANNEL_COLORS[i], data[key])
+                  for i, data in enumerate(self._result['channels'].values())]
+        self.curve_widget.set_data(self._result['positions'], series)
+
+    def closeEvent(self, event):
+        if self._thread is not None:
+            self._thread.wait()
+        event.accept()
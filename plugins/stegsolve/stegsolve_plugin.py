@@ -1,7 +1,7 @@
 from .. import Plugin
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                               QComboBox, QPushButton, QFileDialog, QScrollArea,
-                              QMessageBox, QDialog, QTextEdit, QCheckBox, QGroupBox, QRadioButton)
+                              QMessageBox, QSpinBox)
 from PySide6.QtGui import QImage, QPixmap, QKeyEvent
 from PySide6.QtCore import Qt, Signal
 import numpy as np
@@ -10,283 +10,10 @@ import io
 import style
 from style import FONTS
 from .lsb_dialog import LSBExtractDialog
-
-class LSBExtractDialog(QDialog):
-    def __init__(self, plugin, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("数据提取")
-        self.setMinimumWidth(600)
-        self.setMinimumHeight(500)
-        self._plugin = plugin  # 保存插件实例引用
-        
-        layout = QVBoxLayout(self)
-        
-        # 预览设置
-        preview_group = QGroupBox("预览设置", self)
-        preview_layout = QVBoxLayout(preview_group)
-        self.preview_check = QCheckBox("在预览中包含十六进制转储", self)
-        preview_layout.addWidget(self.preview_check)
-        layout.addWidget(preview_group)
-        
-        # 位平面选择
-        bit_group = QGroupBox("位平面选择", self)
-        bit_layout = QVBoxLayout(bit_group)
-        
-        # 创建通道选择网格
-        channels = [
-            ("Red", range(8)),
-            ("Green", range(8)),
-            ("Blue", range(8)),
-            ("Alpha", range(8))
-        ]
-        
-        # 为每个通道创建选择框
-        self.bit_checkboxes = {}
-        for channel, bits in channels:
-            channel_layout = QVBoxLayout()
-            
-            # 顶部布局：通道名称和全选
-            top_layout = QHBoxLayout()
-            top_layout.setContentsMargins(0, 0, 0, 0)  # 移除边距
-            label = QLabel(channel)
-            all_check = QCheckBox("全选", self)
-            
-            # 添加弹性空间使全选靠左
-            top_layout.addWidget(label)
-            top_layout.addWidget(all_check)
-            top_layout.addStretch()  # 添加弹性空间
-            channel_layout.addLayout(top_layout)
-            
-            # 位平面复选框水平布局
-            bits_layout = QHBoxLayout()
-            bits_layout.setContentsMargins(0, 0, 0, 0)  # 移除边距
-            bits_layout.setSpacing(5)  # 减小间距
-            bit_boxes = []
-            for bit in bits:
-                check = QCheckBox(str(bit), self)
-                check.setFixedWidth(40)  # 设置固定宽度使复选框更紧凑
-                bits_layout.addWidget(check)
-                bit_boxes.append(check)
-                self.bit_checkboxes[f"{channel}_{bit}"] = check
-            
-            bits_layout.addStretch()  # 添加弹性空间，使复选框靠左对齐
-            channel_layout.addLayout(bits_layout)
-            
-            # 连接全选复选框
-            def update_checkboxes(state, boxes=bit_boxes):
-                for box in boxes:
-                    box.setChecked(bool(state))
-            
-            all_check.stateChanged.connect(lambda state, b=bit_boxes: update_checkboxes(state, b))
-            
-            # 连接单个复选框的变化到全选框
-            def update_all_check(boxes=bit_boxes, all_check=all_check):
-                all_check.setChecked(all(box.isChecked() for box in boxes))
-            
-            for box in bit_boxes:
-                box.stateChanged.connect(lambda state, b=bit_boxes, a=all_check: update_all_check(b, a))
-            
-            bit_layout.addLayout(channel_layout)
-        
-        layout.addWidget(bit_group)
-        
-        # 提取选项
-        options_group = QGroupBox("提取选项", self)
-        options_layout = QHBoxLayout(options_group)
-        
-        # 提取方向
-        direction_layout = QVBoxLayout()
-        direction_label = QLabel("提取方向:")
-        self.direction_msb = QRadioButton("MSB优先", self)
-        self.direction_lsb = QRadioButton("LSB优先", self)
-        self.direction_lsb.setChecked(True)
-        direction_layout.addWidget(direction_label)
-        direction_layout.addWidget(self.direction_msb)
-        direction_layout.addWidget(self.direction_lsb)
-        options_layout.addLayout(direction_layout)
-        
-        # 位顺序
-        order_layout = QVBoxLayout()
-        order_label = QLabel("位顺序:")
-        self.order_column = QRadioButton("按列", self)
-        self.order_row = QRadioButton("按行", self)
-        self.order_row.setChecked(True)
-        order_layout.addWidget(order_label)
-        order_layout.addWidget(self.order_column)
-        order_layout.addWidget(self.order_row)
-        options_layout.addLayout(order_layout)
-        
-        # RGB顺序
-        rgb_layout = QVBoxLayout()
-        rgb_label = QLabel("RGB顺序:")
-        self.rgb_orders = QComboBox(self)
-        rgb_orders = ["RGB", "RBG", "GRB", "GBR", "BRG", "BGR"]
-        self.rgb_orders.addItems(rgb_orders)
-        rgb_layout.addWidget(rgb_label)
-        rgb_layout.addWidget(self.rgb_orders)
-        options_layout.addLayout(rgb_layout)
-        
-        layout.addWidget(options_group)
-        
-        # 预览区域
-        preview_label = QLabel("预览", self)
-        layout.addWidget(preview_label)
-        
-        self.preview_text = QTextEdit(self)
-        self.preview_text.setReadOnly(True)
-        layout.addWidget(self.preview_text)
-        
-        # 底部按钮
-        button_layout = QHBoxLayout()
-        self.preview_btn = QPushButton("预览", self)
-        self.save_text_btn = QPushButton("保存文本", self)
-        self.save_bin_btn = QPushButton("保存二进制", self)
-        self.extract_btn = QPushButton("提取", self)
-        self.close_btn = QPushButton("关闭", self)
-        
-        button_layout.addWidget(self.preview_btn)
-        button_layout.addWidget(self.save_text_btn)
-        button_layout.addWidget(self.save_bin_btn)
-        button_layout.addWidget(self.extract_btn)
-        button_layout.addWidget(self.close_btn)
-        
-        layout.addLayout(button_layout)
-        
-        # 连接信号
-        self.preview_btn.clicked.connect(self._preview_data)
-        self.save_text_btn.clicked.connect(self._save_text)
-        self.save_bin_btn.clicked.connect(self._save_binary)
-        self.close_btn.clicked.connect(self.close)
-        # 提取按钮现在也执行预览
-        self.extract_btn.clicked.connect(self._preview_data)
-
-    def closeEvent(self, event):
-        # 保存当前设置等清理工作
-        event.accept()
-
-    def _extract_data(self):
-        """提取二进制数据，返回bytes对象"""
-        if not hasattr(self, '_last_extracted_data'):
-            return None
-        return self._last_extracted_data
-
-    def _save_text(self):
-        """保存为文本文件"""
-        data = self._extract_data()
-        if not data:
-            QMessageBox.warning(self, "警告", "请先预览数据")
-            return
-            
-        file_path, _ = QFileDialog.getSaveFileName(
-            self,
-            "保存文本文件",
-            "",
-            "文本文件 (*.txt)"
-        )
-        if file_path:
-            try:
-                # 尝试将二进制数据解码为文本
-                text = data.decode('utf-8', errors='ignore')
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(text)
-                QMessageBox.information(self, "成功", "文本文件保存成功")
-            except Exception as e:
-                QMessageBox.critical(self, "错误", f"保存文件时发生错误：{str(e)}")
-
-    def _save_binary(self):
-        """保存为二进制文件"""
-        data = self._extract_data()
-        if not data:
-            QMessageBox.warning(self, "警告", "请先预览数据")
-            return
-            
-        file_path, _ = QFileDialog.getSaveFileName(
-            self,
-            "保存二进制文件",
-            "",
-            "二进制文件 (*.bin)"
-        )
-        if file_path:
-            try:
-                with open(file_path, 'wb') as f:
-                    f.write(data)
-                QMessageBox.information(self, "成功", "二进制文件保存成功")
-            except Exception as e:
-                QMessageBox.critical(self, "错误", f"保存文件时发生错误：{str(e)}")
-
-    def _preview_data(self):
-        """预览提取的数据"""
-        selected_bits = []
-        for key, checkbox in self.bit_checkboxes.items():
-            if checkbox.isChecked():
-                channel, bit = key.split('_')
-                selected_bits.append((channel, int(bit)))
-        
-        if not selected_bits:
-            QMessageBox.warning(self, "警告", "请至少选择一个位平面")
-            return
-        
-        # 获取设置
-        settings = self.get_extract_settings()
-        
-        try:
-            # 使用插件实例提取二进制数据
-            self._last_extracted_data = self._plugin._extract_lsb(self)
-            
-            if self._last_extracted_data:
-                # 尝试解码为文本
-                text = self._last_extracted_data.decode('utf-8', errors='ignore')
-                result = ["=== LSB Extraction ===\n"]
-                result.append(text)
-                
-                if self.preview_check.isChecked():
-                    result.append("\nHexdump:")
-                    # 生成hexdump格式输出
-                    hex_bytes = self._last_extracted_data
-                    for i in range(0, len(hex_bytes), 16):
-                        chunk = hex_bytes[i:i+16]
-                        result.append(f"{i:08x}  ")
-                        
-                        hex_line = ""
-                        ascii_line = ""
-                        
-                        for j, byte in enumerate(chunk):
-                            if j == 8:
-                                hex_line += " "
-                            hex_line += f"{byte:02x} "
-                            if 32 <= byte <= 126:
-                                ascii_line += chr(byte)
-                            else:
-                                ascii_line += "."
-                        
-                        hex_line = hex_line.ljust(49)
-                        ascii_line = ascii_line.ljust(16)
-                        
-                        result.append(f"{hex_line} |{ascii_line}|")
-                
-                self.preview_text.setText("\n".join(result))
-            else:
-                self.preview_text.setText("无数据")
-                
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"提取数据时发生错误：{str(e)}")
-
-    def get_extract_settings(self):
-        """获取当前的提取设置"""
-        settings = {
-            'selected_bits': [],
-            'msb_first': self.direction_msb.isChecked(),
-            'by_column': self.order_column.isChecked(),
-            'rgb_order': self.rgb_orders.currentText(),
-            'include_hex': self.preview_check.isChecked()
-        }
-        
-        for key, checkbox in self.bit_checkboxes.items():
-            if checkbox.isChecked():
-                channel, bit = key.split('_')
-                settings['selected_bits'].append((channel, int(bit)))
-                
-        return settings
+from .frame_browser import FrameCache, FrameIndex, FrameDecodeThread
+from .stereogram import StereogramDialog
+from .steganalysis import SteganalysisDialog
+from .palette import PaletteViews, PALETTE_MODES
 
 class StegSolvePlugin(Plugin):
     def __init__(self):
@@ -296,6 +23,17 @@ class StegSolvePlugin(Plugin):
         self.image_label = None
         self.mode_combo = None
         self.layout_direction = 'horizontal'
+        # 动画帧浏览相关
+        self.frame_index = None
+        self.frame_cache = FrameCache()
+        self.decode_thread = None
+        self.current_frame = 0
+        # 当前帧（及帧差视图的上一帧）从缓存取出后的引用，预取淘汰缓存时不受影响
+        self.shown_frames = {}
+        self.frame_views = ["当前帧", "帧差(绝对值)", "帧异或"]
+        # 调色板视图按图片缓存
+        self._palette_views = None
+        self._palette_image = None
         self.modes = [
             "Normal", 
             "Red plane", "Green plane", "Blue plane",
@@ -347,6 +85,18 @@ class StegSolvePlugin(Plugin):
         self.lsb_btn.setEnabled(False)  # 初始禁用
         control_layout.addWidget(self.lsb_btn)
 
+        # 添加立体图求解按钮
+        self.stereo_btn = QPushButton("立体图", parent)
+        self.stereo_btn.clicked.connect(self._show_stereogram_dialog)
+        self.stereo_btn.setEnabled(False)
+        control_layout.addWidget(self.stereo_btn)
+
+        # 添加统计隐写分析按钮
+        self.analysis_btn = QPushButton("隐写分析", parent)
+        self.analysis_btn.clicked.connect(self._show_analysis_dialog)
+        self.analysis_btn.setEnabled(False)
+        control_layout.addWidget(self.analysis_btn)
+
         # 添加模式选择下拉框
         mode_label = QLabel("分析模式：", parent)
         mode_label.setFont(FONTS.get("default"))
@@ -360,6 +110,43 @@ class StegSolvePlugin(Plugin):
         control_layout.addStretch()
         main_layout.addWidget(control_widget)
 
+        # 创建帧浏览区域（仅动画图片可见）
+        self.frame_widget = QWidget(parent)
+        frame_layout = QHBoxLayout(self.frame_widget)
+        frame_layout.setContentsMargins(0, 0, 0, 0)
+
+        frame_label = QLabel("帧：", parent)
+        frame_label.setFont(FONTS.get("default"))
+        frame_layout.addWidget(frame_label)
+
+        self.prev_frame_btn = QPushButton("上一帧", parent)
+        self.prev_frame_btn.clicked.connect(lambda: self._step_frame(-1))
+        frame_layout.addWidget(self.prev_frame_btn)
+
+        self.frame_spin = QSpinBox(parent)
+        self.frame_spin.setRange(0, 0)
+        self.frame_spin.valueChanged.connect(self._show_frame)
+        frame_layout.addWidget(self.frame_spin)
+
+        self.frame_count_label = QLabel("/ 0", parent)
+        frame_layout.addWidget(self.frame_count_label)
+
+        self.next_frame_btn = QPushButton("下一帧", parent)
+        self.next_frame_btn.clicked.connect(lambda: self._step_frame(1))
+        frame_layout.addWidget(self.next_frame_btn)
+
+        self.frame_view_combo = QComboBox(parent)
+        self.frame_view_combo.addItems(self.frame_views)
+        self.frame_view_combo.currentTextChanged.connect(lambda: self._show_frame(self.current_frame))
+        frame_layout.addWidget(self.frame_view_combo)
+
+        self.frame_status_label = QLabel("", parent)
+        frame_layout.addWidget(self.frame_status_label)
+
+        frame_layout.addStretch()
+        self.frame_widget.setVisible(False)
+        main_layout.addWidget(self.frame_widget)
+
         # 创建图片显示区域
         scroll_area = QScrollArea(parent)
         scroll_area.setWidgetResizable(True)
@@ -379,11 +166,15 @@ class StegSolvePlugin(Plugin):
             
         current_index = self.mode_combo.currentIndex()
         if event.key() == Qt.Key_Left:
-            new_index = (current_index - 1) % len(self.modes)
+            new_index = (current_index - 1) % self.mode_combo.count()
             self.mode_combo.setCurrentIndex(new_index)
         elif event.key() == Qt.Key_Right:
-            new_index = (current_index + 1) % len(self.modes)
+            new_index = (current_index + 1) % self.mode_combo.count()
             self.mode_combo.setCurrentIndex(new_index)
+        elif event.key() == Qt.Key_Up:
+            self._step_frame(-1)
+        elif event.key() == Qt.Key_Down:
+            self._step_frame(1)
 
     def _show_lsb_dialog(self):
         if not self.current_image:
@@ -395,13 +186,34 @@ class StegSolvePlugin(Plugin):
         dialog.extract_btn.clicked.connect(lambda: self._extract_lsb(dialog))
         dialog.exec_()
 
+    def _show_stereogram_dialog(self):
+        if not self.current_image:
+            return
+
+        dialog = StereogramDialog(self.current_image, self.image_label.window())
+        dialog.exec_()
+
+    def _show_analysis_dialog(self):
+        if not self.current_image:
+            return
+
+        dialog = SteganalysisDialog(self.current_image, self.image_label.window())
+        dialog.exec_()
+
     def _extract_lsb(self, dialog: LSBExtractDialog):
         """提取LSB数据，返回bytes对象"""
         if not self.current_image:
             return None
             
         try:
-            img_array = np.array(self.current_image)
+            # 调色板图片：RGB取自调色板项，索引平面单独作为Index通道
+            palette_views = self._get_palette_views()
+            index_plane = None
+            if palette_views is not None:
+                img_array = palette_views.palette_rgb()
+                index_plane = palette_views.indices
+            else:
+                img_array = np.array(self.current_image)
             if len(img_array.shape) == 2:  # 灰度图
                 img_array = np.stack((img_array,) * 3, axis=-1)
                 
@@ -445,6 +257,11 @@ class StegSolvePlugin(Plugin):
                         if img_array.shape[2] <= 3:
                             continue
                         channel_idx = 3
+                    elif channel == 'Index':
+                        if index_plane is None:
+                            continue
+                        total_bits.append((index_plane[y, x] >> bit) & 1)
+                        continue
                     
                     # 提取位值
                     bit_value = (img_array[y, x, channel_idx] >> bit) & 1
@@ -474,18 +291,148 @@ class StegSolvePlugin(Plugin):
         )
         if file_path:
             try:
+                self._stop_decode_thread()
+                self.frame_cache.clear()
+                self.shown_frames = {}
+                self.frame_index = FrameIndex(file_path)
                 self.current_image = Image.open(file_path)
+                self.current_frame = 0
+                self._refresh_modes()
                 self.lsb_btn.setEnabled(True)  # 启用LSB提取按钮
-                self._update_image()
+                self.stereo_btn.setEnabled(True)
+                self.analysis_btn.setEnabled(True)
+
+                if self.frame_index.is_animated:
+                    # 动画图片：后台按需解码帧
+                    self.decode_thread = FrameDecodeThread(self.frame_index, self.frame_cache)
+                    self.decode_thread.frame_ready.connect(self._on_frame_ready)
+                    self.decode_thread.error_signal.connect(self.frame_status_label.setText)
+                    self.decode_thread.start()
+
+                    self.frame_spin.blockSignals(True)
+                    self.frame_spin.setRange(0, self.frame_index.n_frames - 1)
+                    self.frame_spin.setValue(0)
+                    self.frame_spin.blockSignals(False)
+                    self.frame_count_label.setText(f"/ {self.frame_index.n_frames - 1}")
+                    self.frame_widget.setVisible(True)
+                    self._show_frame(0)
+                else:
+                    self.frame_widget.setVisible(False)
+                    self._update_image()
             except Exception as e:
                 QMessageBox.critical(parent, "错误", f"无法加载图片：{str(e)}")
 
+    def _refresh_modes(self):
+        """调色板图片额外提供索引/调色板相关模式"""
+        modes = list(self.modes)
+        if PaletteViews.supports(self.current_image):
+            modes += PALETTE_MODES
+        current = self.mode_combo.currentText()
+        self.mode_combo.blockSignals(True)
+        self.mode_combo.clear()
+        self.mode_combo.addItems(modes)
+        self.mode_combo.setCurrentIndex(max(0, self.mode_combo.findText(current)))
+        self.mode_combo.blockSignals(False)
+
+    def _get_palette_views(self):
+        """当前图片为调色板模式时返回（缓存的）调色板视图"""
+        if not PaletteViews.supports(self.current_image):
+            return None
+        if self._palette_image is not self.current_image:
+            self._palette_views = PaletteViews(self.current_image)
+            self._palette_image = self.current_image
+        return self._palette_views
+
+    @staticmethod
+    def _pixel_array(image) -> np.ndarray:
+        # 调色板图片先还原颜色，避免索引被当作灰度处理
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        return np.array(image)
+
+    def _stop_decode_thread(self):
+        if self.decode_thread is not None:
+            self.decode_thread.frame_ready.disconnect()
+            self.decode_thread.stop()
+            self.decode_thread = None
+
+    def cleanup(self):
+        """切换插件时停止后台解码线程"""
+        self._stop_decode_thread()
+        self.frame_cache.clear()
+        self.shown_frames = {}
+
+    def _step_frame(self, step: int):
+        if self.frame_index is None or not self.frame_index.is_animated:
+            return
+        new_frame = (self.current_frame + step) % self.frame_index.n_frames
+        self.frame_spin.setValue(new_frame)
+
+    def _show_frame(self, index: int):
+        """显示指定帧，未解码时交给后台线程"""
+        if self.decode_thread is None:
+            return
+        if index != self.current_frame:
+            self.shown_frames = {}
+        self.current_frame = index
+
+        # 帧差视图还需要上一帧
+        needed = [index]
+        if self.frame_view_combo.currentText() != self.frame_views[0] and index > 0:
+            needed.insert(0, index - 1)
+
+        # 每帧只 get 一次并保留引用：先判断在缓存中再取，中间可能被后台预取淘汰
+        for frame_no in needed:
+            if frame_no in self.shown_frames:
+                continue
+            frame = self.frame_cache.get(frame_no)
+            if frame is None:
+                self.frame_status_label.setText("解码中...")
+                self.decode_thread.request(frame_no)
+                return
+            self.shown_frames[frame_no] = frame
+
+        self.frame_status_label.setText("")
+        self.current_image = self.shown_frames[index]
+        self._update_image()
+
+    def _on_frame_ready(self, index: int):
+        if index in (self.current_frame, self.current_frame - 1):
+            self._show_frame(self.current_frame)
+
+    def _image_array(self) -> np.ndarray:
+        """当前帧的像素数组，帧差视图下返回与上一帧的差异"""
+        view = self.frame_view_combo.currentText()
+        if (self.frame_index is None or not self.frame_index.is_animated
+                or view == self.frame_views[0] or self.current_frame == 0):
+            return self._pixel_array(self.current_image)
+
+        previous = self.shown_frames.get(self.current_frame - 1)
+        if previous is None:
+            return self._pixel_array(self.current_image)
+
+        current = np.asarray(self.current_image.convert('RGBA'))
+        previous = np.asarray(previous.convert('RGBA'))
+        if view == "帧异或":
+            return current ^ previous
+        diff = np.abs(current.astype(np.int16) - previous.astype(np.int16)).astype(np.uint8)
+        diff[:, :, 3] = 255  # 保持不透明以便观察颜色差异
+        return diff
+
     def _update_image(self):
         if self.current_image is None:
             return
 
         mode = self.mode_combo.currentText()
-        img_array = np.array(self.current_image)
+        if mode in PALETTE_MODES:
+            palette_views = self._get_palette_views()
+            if palette_views is not None:
+                self._show_array(palette_views.render(mode))
+                return
+            # 当前帧不是调色板模式时按普通图片显示
+            mode = "Normal"
+
+        img_array = self._image_array()
 
         if len(img_array.shape) == 2:  # 灰度图
             img_array = np.stack((img_array,) * 3, axis=-1)
@@ -515,6 +462,9 @@ class StegSolvePlugin(Plugin):
             bit_plane = (img_array[:,:,color_idx] >> bit) & 1
             result[:,:,:] = bit_plane[:,:,np.newaxis] * 255
 
+        self._show_array(result)
+
+    def _show_array(self, result: np.ndarray):
         # 转换为QImage显示
         height, width = result.shape[:2]
         bytes_per_line = 3 * width
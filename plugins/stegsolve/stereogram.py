@@ -0,0 +1,252 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
+                              QPushButton, QSpinBox, QSlider, QListWidget, QListWidgetItem,
+                              QScrollArea, QProgressBar)
+from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtCore import Qt, QThread, Signal
+import numpy as np
+
+OPERATIONS = ["XOR", "相减"]
+METRICS = {"熵": "entropy", "边缘密度": "edges"}
+
+
+def shift_compare(pixels: np.ndarray, offset: int, operation: str = "XOR",
+                  out: np.ndarray = None) -> np.ndarray:
+    """将图像与自身水平循环平移offset后的结果做XOR或相减
+
+    与 np.roll 等价，但用切片直接写入预分配的输出数组，避免每步拷贝。
+    """
+    width = pixels.shape[1]
+    offset %= width
+    if out is None:
+        out = np.empty_like(pixels)
+    if offset == 0:
+        out[...] = 0
+        return out
+
+    left, right = pixels[:, :width - offset], pixels[:, width - offset:]
+    shifted_left, shifted_right = pixels[:, offset:], pixels[:, :offset]
+    if operation == "XOR":
+        np.bitwise_xor(left, shifted_left, out=out[:, :width - offset])
+        np.bitwise_xor(right, shifted_right, out=out[:, width - offset:])
+    else:
+        # 取差的绝对值，uint8 下用 max-min 避免溢出
+        for dst, a, b in ((out[:, :width - offset], left, shifted_left),
+                          (out[:, width - offset:], right, shifted_right)):
+            np.subtract(np.maximum(a, b), np.minimum(a, b), out=dst)
+    return out
+
+
+def scan_offsets(pixels: np.ndarray, operation: str = "XOR", metric: str = "entropy",
+                 max_rows: int = 64, chunk_bytes: int = 64 * 1024 * 1024,
+                 progress=None, should_stop=None) -> np.ndarray:
+    """计算 1...W/2 所有偏移的结构得分，得分越低越可能是正确偏移；被中止时返回 None
+
+    只取均匀抽样的若干行（保留完整宽度，偏移精确到像素）。将抽样行首尾拼接后，
+    用 sliding_window_view 得到所有平移结果的跨步视图，无需逐偏移拷贝；
+    再用 bincount 一次性统计每个偏移的差异直方图。
+    """
+    height, width = pixels.shape[:2]
+    rows = pixels[np.linspace(0, height - 1, min(height, max_rows)).astype(np.intp)]
+    if rows.ndim == 2:
+        rows = rows[:, :, None]
+    rows = rows.transpose(0, 2, 1)  # (rows, C, W)
+    doubled = np.concatenate((rows, rows), axis=2)
+    windows = np.lib.stride_tricks.sliding_window_view(doubled, width, axis=2)  # (rows, C, W+1, W)
+
+    offsets = np.arange(1, width // 2 + 1)
+    scores = np.empty(len(offsets), dtype=np.float64)
+    base = rows[:, :, None, :]
+    chunk = max(1, chunk_bytes // max(1, rows.size))
+    for start in range(0, len(offsets), chunk):
+        if should_stop is not None and should_stop():
+            return None
+        batch = offsets[start:start + chunk]
+        shifted = windows[:, :, batch[0]:batch[-1] + 1]  # (rows, C, n, W)
+        if operation == "XOR":
+            diff = base ^ shifted
+        else:
+            diff = np.maximum(base, shifted) - np.minimum(base, shifted)
+        # 多通道取最大差异作为该像素的差异强度
+        diff = diff.max(axis=1).transpose(1, 0, 2)  # (n, rows, W)
+
+        if metric == "edges":
+            edges = diff[:, :, 1:] != diff[:, :, :-1]
+            scores[start:start + len(batch)] = edges.mean(axis=(1, 2))
+        else:
+            keys = diff.reshape(len(batch), -1).astype(np.int32)
+            keys += (np.arange(len(batch), dtype=np.int32) * 256)[:, None]
+            hist = np.bincount(keys.ravel(), minlength=len(batch) * 256)
+            prob = hist.reshape(len(batch), 256) / keys.shape[1]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                entropy = -np.where(prob > 0, prob * np.log2(prob), 0.0).sum(axis=1)
+            scores[start:start + len(batch)] = entropy
+
+        if progress is not None:
+            progress(int((start + len(batch)) / len(offsets) * 100))
+
+    return np.column_stack((offsets, scores))
+
+
+class OffsetScanThread(QThread):
+    progress_signal = Signal(int)  # 进度信号
+    finished_signal = Signal(object)  # 完成信号，传递 (offset, score) 数组，被中止时为 None
+
+    def __init__(self, pixels, operation, metric):
+        super().__init__()
+        self.pixels = pixels
+        self.operation = operation
+        self.metric = metric
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+
+    def run(self):
+        result = scan_offsets(self.pixels, self.operation, self.metric,
+                              progress=self.progress_signal.emit, should_stop=lambda: self._stop)
+        self.finished_signal.emit(result)
+
+
+class StereogramDialog(QDialog):
+    """立体图求解：图像与自身平移后做XOR/相减，逐步调整偏移"""
+
+    def __init__(self, image, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("立体图求解")
+        self.setMinimumWidth(800)
+        self.setMinimumHeight(600)
+
+        # 只解码一次，之后每步都在缓存的数组上做切片运算
+        self._pixels = np.ascontiguousarray(np.asarray(image.convert('RGB')))
+        self._buffer = np.empty_like(self._pixels)
+        self._scan_thread = None
+        width = self._pixels.shape[1]
+
+        layout = QVBoxLayout(self)
+
+        control_layout = QHBoxLayout()
+        control_layout.addWidget(QLabel("运算:"))
+        self.op_combo = QComboBox(self)
+        self.op_combo.addItems(OPERATIONS)
+        self.op_combo.currentTextChanged.connect(self._update_view)
+        control_layout.addWidget(self.op_combo)
+
+        control_layout.addWidget(QLabel("偏移:"))
+        self.offset_slider = QSlider(Qt.Orientation.Horizontal, self)
+        self.offset_slider.setRange(1, max(1, width - 1))
+        self.offset_slider.valueChanged.connect(self._on_slider_changed)
+        control_layout.addWidget(self.offset_slider)
+
+        self.offset_spin = QSpinBox(self)
+        self.offset_spin.setRange(1, max(1, width - 1))
+        self.offset_spin.valueChanged.connect(self._on_spin_changed)
+        control_layout.addWidget(self.offset_spin)
+        layout.addLayout(control_layout)
+
+        content_layout = QHBoxLayout()
+        scroll_area = QScrollArea(self)
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setStyleSheet("QScrollArea { background-color: #2b2b2b; border: none; }")
+        self.image_label = QLabel(self)
+        self.image_label.setAlignment(Qt.AlignCenter)
+        self.image_label.setStyleSheet("QLabel { background-color: #2b2b2b; }")
+        scroll_area.setWidget(self.image_label)
+        content_layout.addWidget(scroll_area, 4)
+
+        # 批量扫描结果
+        scan_layout = QVBoxLayout()
+        metric_layout = QHBoxLayout()
+        metric_layout.addWidget(QLabel("排序依据:"))
+        self.metric_combo = QComboBox(self)
+        self.metric_combo.addItems(METRICS.keys())
+        metric_layout.addWidget(self.metric_combo)
+        scan_layout.addLayout(metric_layout)
+
+        self.scan_btn = QPushButton("批量扫描偏移", self)
+        self.scan_btn.clicked.connect(self._start_scan)
+        scan_layout.addWidget(self.scan_btn)
+
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setVisible(False)
+        scan_layout.addWidget(self.progress_bar)
+
+        self.result_list = QListWidget(self)
+        self.result_list.itemClicked.connect(self._on_result_clicked)
+        scan_layout.addWidget(self.result_list)
+        content_layout.addLayout(scan_layout, 1)
+        layout.addLayout(content_layout)
+
+        self._update_view()
+
+    def _on_slider_changed(self, value):
+        self.offset_spin.setValue(value)
+
+    def _on_spin_changed(self, value):
+        self.offset_slider.setValue(value)
+        self._update_view()
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Left:
+            self.offset_spin.setValue(self.offset_spin.value() - 1)
+        elif event.key() == Qt.Key_Right:
+            self.offset_spin.setValue(self.offset_spin.value() + 1)
+        else:
+            super().keyPressEvent(event)
+
+    def _update_view(self):
+        result = shift_compare(self._pixels, self.offset_spin.value(),
+                               self.op_combo.currentText(), out=self._buffer)
+        height, width = result.shape[:2]
+        qimg = QImage(result.data, width, height, 3 * width, QImage.Format_RGB888)
+        pixmap = QPixmap.fromImage(qimg)
+        self.image_label.setPixmap(pixmap.scaled(
+            self.image_label.size(),
+            Qt.KeepAspectRatio,
+            Qt.FastTransformation
+        ))
+
+    def _start_scan(self):
+        if self._scan_thread is not None:
+            return
+        self.scan_btn.setEnabled(False)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self._scan_thread = OffsetScanThread(
+            self._pixels,
+            self.op_combo.currentText(),
+            METRICS[self.metric_combo.currentText()]
+        )
+        self._scan_thread.progress_signal.connect(self.progress_bar.setValue)
+        self._scan_thread.finished_signal.connect(self._scan_finished)
+        self._scan_thread.start()
+
+    def _scan_finished(self, result):
+        if result is None:
+            self.progress_bar.setVisible(False)
+            self.scan_btn.setEnabled(True)
+            self._scan_thread = None
+            return
+        self.result_list.clear()
+        order = np.argsort(result[:, 1], kind='stable')
+        for offset, score in result[order[:50]]:
+            item = QListWidgetItem(f"偏移 {int(offset)}  得分 {score:.4f}")
+            item.setData(Qt.ItemDataRole.UserRole, int(offset))
+            self.result_list.addItem(item)
+        self.progress_bar.setVisible(False)
+        self.scan_btn.setEnabled(True)
+        self._scan_thread = None
+
+    def _on_result_clicked(self, item):
+        self.offset_spin.setValue(item.data(Qt.ItemDataRole.UserRole))
+
+    def done(self, result):
+        # Esc 只调用 reject()，不经过 closeEvent；关闭窗口也会走到这里
+        if self._scan_thread is not None:
+            self._scan_thread.finished_signal.disconnect()
+            self._scan_thread.stop()
+            self._scan_thread.wait()
+            self._scan_thread = None
+            self.progress_bar.setVisible(False)
+            self.scan_btn.setEnabled(True)
+        super().done(result)